@@ -15,6 +15,11 @@ const VALIDATION_RULES = {
         default: true,
         description: '进度条显示控制'
     },
+    'extensions.service_worker.enable': {
+        type: 'boolean',
+        default: false,
+        description: 'Service Worker 离线缓存控制'
+    },
     'extensions.cache_menu.enable': {
         type: 'boolean',
         default: true,
@@ -40,6 +45,26 @@ const VALIDATION_RULES = {
         default: [],
         description: '外部文档挂载配置'
     },
+    'document.toc_data': {
+        type: 'boolean',
+        default: false,
+        description: '是否加载预先生成的标题大纲'
+    },
+    'document.link_graph': {
+        type: 'boolean',
+        default: false,
+        description: '是否按链接图预加载文档'
+    },
+    'document.prerender': {
+        type: 'boolean',
+        default: false,
+        description: '是否使用预渲染的 HTML 片段'
+    },
+    'search.index_format': {
+        type: 'string',
+        default: 'list',
+        description: '搜索索引格式'
+    },
     'home.use_file': {
         type: 'boolean',
         default: false,
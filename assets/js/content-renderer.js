@@ -9,6 +9,7 @@ import { initializeMermaid, processMermaidDiagrams } from './mermaid-handler.js'
 import { processKaTeXFormulas } from './katex-handler.js';
 import documentCache from './document-cache.js';
 import { hasSupportedExtension } from './utils.js';
+import { loadPrerenderedDocument } from './prerender.js';
 import { isAnimationEnabled, getAnimationConfig } from './animation-controller.js';
 
 // 全局变量
@@ -546,11 +547,16 @@ async function renderDocument(relativePath, content, contentDiv, tocNav) {
             // Markdown 文件处理
             // console.log('渲染 Markdown 文件:', relativePath);
 
+            // 优先使用构建时预渲染的 HTML 片段（build.py --prerender），无可用片段时在浏览器端解析
+            const prerendered = await loadPrerenderedDocument(relativePath, content);
+
             // 预处理Markdown内容，处理块级数学公式
-            content = preProcessMathContent(content);
+            if (!prerendered) {
+                content = preProcessMathContent(content);
+            }
 
             // 使用 marked 解析 Markdown
-            const markedContent = marked.parse(content, {
+            const markedContent = prerendered ? prerendered.html : marked.parse(content, {
                 gfm: true,
                 breaks: true,
                 headerIds: true,
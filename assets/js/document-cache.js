@@ -20,6 +20,9 @@ const documentCache = {
     // 正在预加载的文档
     loadingDocs: new Set(),
 
+    // links.json 地址 -> 加载中的预加载列表 Promise（build.py --link-graph 生成）
+    prefetchRequests: new Map(),
+
     // 缓存控制开关
     disableCache: false,
     disablePreload: false,
@@ -270,6 +273,53 @@ const documentCache = {
         }
     },
 
+    /**
+     * 预加载用户接下来可能打开的文档：优先使用 links.json 中按站内链接和导航顺序排好的预加载列表，
+     * 未启用链接图或列表中没有该文档时回退到 autoPreloadDocuments（同级文档）
+     * @param {string} currentPath 当前查看的文档路径
+     * @param {Object} pathData 完整的文档结构数据
+     * @param {number} maxPreload 最大预加载数量
+     */
+    async preloadLikelyNext(currentPath, pathData, maxPreload = 5) {
+        if (!currentPath) return;
+
+        const prefetch = await this._loadPrefetchLists();
+        const paths = prefetch ? prefetch[currentPath.replace(/^\/+/, '')] : null;
+        if (!paths) {
+            this.autoPreloadDocuments(currentPath, pathData, maxPreload);
+            return;
+        }
+
+        paths.filter(path =>
+            !this.preloadCache[path] &&
+            !this.cache[path] &&
+            !this.loadingDocs.has(path)
+        ).slice(0, maxPreload).forEach(path => this.preloadDocument(path));
+    },
+
+    /**
+     * 加载当前分支链接图中的预加载列表
+     * @private
+     * @returns {Promise<Object|null>} {文档路径: [目标文档路径, ...]}，未启用或加载失败时返回 null
+     */
+    _loadPrefetchLists() {
+        if (!config.document.link_graph) return Promise.resolve(null);
+
+        const dataRoot = config.document.branch_support ? getBranchDataPath().replace(/\/$/, '') : '';
+        const url = `${dataRoot}/links.json`;
+        if (!this.prefetchRequests.has(url)) {
+            this.prefetchRequests.set(url, fetch(url)
+                .then(response => (response.ok ? response.json() : null))
+                .then(graph => (graph && graph.prefetch) || null)
+                .catch(error => {
+                    console.warn('链接图加载失败:', error);
+                    this.prefetchRequests.delete(url);
+                    return null;
+                }));
+        }
+        return this.prefetchRequests.get(url);
+    },
+
     /**
      * 预加载所有在path.json中定义的文档
      * @param {Object} pathData 完整的文档结构数据
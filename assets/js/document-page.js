@@ -76,11 +76,13 @@ import {
     scrollTocToActiveItem,
     showSidebarLoading,
     showTocLoading,
+    showPrecomputedToc,
     fadeOutLoadingAndShowContent,
     addStaggerAnimation,
     generateSkeletonItems,
     generateTocSkeletonItems
 } from './sidebar-navigation.js';
+import { getDocumentToc } from './toc-data.js';
 import {
     initUtils,
     getBranchDataPath,
@@ -110,6 +112,7 @@ let pathData = null; // 存储文档结构数据
 let currentRoot = null; // 当前根目录
 let currentBranch = null; // 当前分支
 let isLoadingDocument = false; // 是否正在加载文档
+let tocRequestSequence = 0; // 标题大纲请求序号，用于丢弃已切换文档的结果
 
 async function loadPathDataForBranch(branch) {
     const rootDir = config.document.root_dir.replace(/\/$/, '');
@@ -820,6 +823,15 @@ async function loadDocument(relativePath) {
     const contentDiv = document.getElementById('document-content');
     const tocNav = document.getElementById('toc-nav');
     tocNav.innerHTML = '<p class="text-gray-400 text-sm">暂无目录</p>';
+    delete tocNav.dataset.tocKey;
+
+    // 已生成 toc.json（build.py --toc）时，在正文下载前先显示目录；正文已开始渲染时不再显示
+    const tocSequence = ++tocRequestSequence;
+    getDocumentToc(relativePath).then(entries => {
+        if (entries && tocSequence === tocRequestSequence && tocNav.querySelector('.toc-item, .toc-loading') === null) {
+            showPrecomputedToc(entries);
+        }
+    });
     
     // 创建文章加载动画（如果启用，考虑动画总开关）
     if (isAnimationEnabled('article', 'enable_skeleton')) {
@@ -990,8 +1002,8 @@ async function loadDocument(relativePath) {
         }, 100);
         
         setTimeout(() => {
-            // **修改**: 调用新的自动预加载逻辑
-            documentCache.autoPreloadDocuments(relativePath, pathData, 3);
+            // 预加载接下来可能打开的文档（有链接图时按链接图，否则为同级文档）
+            documentCache.preloadLikelyNext(relativePath, pathData, 3);
         }, 1000);
     }
 
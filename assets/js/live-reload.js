@@ -0,0 +1,38 @@
+/**
+ * 本地预览热更新模块
+ * 仅由 build.py serve 注入到预览页面：通过 SSE 接收文档变化通知，
+ * 清除变化文档的缓存后刷新页面，path.json 和搜索索引由服务器在内存中重新生成
+ */
+import documentCache from './document-cache.js';
+
+const EVENTS_URL = '/__easydoc/events';
+
+// 预览时不使用 build.py --service-worker 注册的 Service Worker，避免页面读取缓存的旧文件
+if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.getRegistrations().then(registrations => {
+        registrations.forEach(registration => registration.unregister());
+    });
+}
+
+// 首次连接时服务器的 build_id，重新连接后不同说明服务器已重启（如 config.js 变化）
+let buildId = null;
+
+const events = new EventSource(EVENTS_URL);
+
+events.addEventListener('hello', event => {
+    const { build } = JSON.parse(event.data);
+    if (buildId !== null && build !== buildId) {
+        location.reload();
+        return;
+    }
+    buildId = build;
+});
+
+events.addEventListener('change', event => {
+    const { docs = [] } = JSON.parse(event.data);
+    docs.forEach(path => {
+        documentCache.removeFromCache(path);
+        documentCache.removeFromPreload(path);
+    });
+    location.reload();
+});
@@ -5,7 +5,9 @@
 import { initAnimationController } from './animation-controller.js';
 import documentCache from './document-cache.js';
 import { updateFooterElements, updateHeaderElements } from './navigation.js';
+import { InvertedSearchIndex, ShardedSearchIndex } from './search-index.js';
 import { initDarkMode } from './theme.js';
+import { findMatchingHeading, loadTocData } from './toc-data.js';
 import {
     debounce,
     getBranchDataPath
@@ -17,6 +19,8 @@ export { config };
 
 // 搜索数据
 let searchData = null;
+// 倒排搜索索引（search.index_format 为 inverted 时使用）
+let searchIndex = null;
 
 // 应用初始化
 export async function initApp() {
@@ -32,6 +36,8 @@ export async function initApp() {
     // 初始化主题
     initDarkMode(config);
 
+    registerServiceWorker();
+
     // 应用主题色
     const themeColor = config.appearance.theme_color;
     document.documentElement.style.setProperty('--color-primary', themeColor);
@@ -348,10 +354,26 @@ function bindThemeToggleEvents() {
     });
 }
 
+// 注册 build.py --service-worker 生成的 Service Worker（sw.js 位于站点根目录）
+function registerServiceWorker() {
+    if (!config.extensions.service_worker.enable || !('serviceWorker' in navigator)) {
+        return;
+    }
+    // 本地预览页面由 live-reload.js 注销 Service Worker，始终从预览服务器读取最新文件
+    if (document.querySelector('script[src$="live-reload.js"]')) {
+        return;
+    }
+    navigator.serviceWorker.register(new URL('../../sw.js', import.meta.url)).catch(error => {
+        console.warn('Service Worker 注册失败:', error);
+    });
+}
+
 // 初始化搜索功能
 function initSearch() {
     // 加载搜索数据
     loadSearchData();
+    // 预先加载标题大纲，首次搜索时无需等待
+    loadTocData();
 
     // 绑定搜索相关事件
     bindSearchEvents();
@@ -361,11 +383,32 @@ function initSearch() {
 export async function loadSearchData() {
     try {
         const branchDataPath = getBranchDataPath().replace(/\/$/, '');
-        const searchJsonUrl = config.document.branch_support ? `${branchDataPath}/search.json` : '/search.json';
+        const dataRoot = config.document.branch_support ? branchDataPath : '';
+        const searchJsonUrl = `${dataRoot}/search.json`;
+
+        // 优先加载倒排索引（分片模式只加载清单），加载失败时回退到 search.json
+        searchIndex = null;
+        if (config.search.index_format === 'inverted' || config.search.index_format === 'sharded') {
+            try {
+                searchIndex = config.search.index_format === 'sharded'
+                    ? await ShardedSearchIndex.load(`${dataRoot}/search-shards/manifest.json`)
+                    : await InvertedSearchIndex.load(`${dataRoot}/search-index.json`);
+            } catch (error) {
+                console.warn('倒排搜索索引加载失败，回退到 search.json:', error);
+            }
+            if (searchIndex) {
+                searchData = null;
+                console.log('倒排搜索索引加载成功，共 ' + searchIndex.size + ' 篇文档');
+                return;
+            }
+        }
         
         const response = await fetch(searchJsonUrl);
         if (response.ok) {
             searchData = await response.json();
+            if (searchData.some(item => item.content === undefined && item.hash)) {
+                await fillSharedCorpus(searchData);
+            }
             console.log('搜索数据加载成功，共 ' + searchData.length + ' 条记录');
         } else {
             console.warn('搜索数据加载失败: ' + response.status);
@@ -377,6 +420,31 @@ export async function loadSearchData() {
 
 window.loadSearchData = loadSearchData;
 
+/**
+ * 加载 build.py --search-shared-corpus 生成的共享搜索语料，按内容哈希填回各条目的摘要
+ * @param {Array<Object>} items search.json 条目
+ */
+async function fillSharedCorpus(items) {
+    // 启用分支支持时语料位于文档根目录，由各分支共用；否则与 search.json 位于同一目录
+    const corpusRoot = config.document.branch_support ? config.document.root_dir.replace(/\/$/, '') : '';
+    let corpus = {};
+    try {
+        const response = await fetch(`${corpusRoot}/search-corpus.json`);
+        if (response.ok) {
+            corpus = await response.json();
+        } else {
+            console.warn('共享搜索语料加载失败: ' + response.status);
+        }
+    } catch (error) {
+        console.warn('共享搜索语料加载失败:', error);
+    }
+    items.forEach(item => {
+        if (item.content === undefined) {
+            item.content = corpus[item.hash] || '';
+        }
+    });
+}
+
 // 绑定搜索相关事件
 function bindSearchEvents() {
     // 搜索按钮点击事件
@@ -462,8 +530,11 @@ function closeSearchModal() {
     }
 }
 
+// 搜索序号，用于丢弃异步分片加载完成前已被新查询取代的结果
+let searchSequence = 0;
+
 // 执行搜索
-function performSearch() {
+async function performSearch() {
     const searchInput = document.getElementById('search-input');
     const searchResultsContainer = document.getElementById('search-results');
 
@@ -477,7 +548,7 @@ function performSearch() {
     }
 
     // 检查搜索数据和缓存文档
-    const hasSearchData = searchData && searchData.length > 0;
+    const hasSearchData = (searchIndex && searchIndex.size > 0) || (searchData && searchData.length > 0);
     const persistentCachedPaths = documentCache.getPersistentCachedPaths();
     const preloadedPaths = documentCache.getPreloadedPaths();
     const hasCachedDocs = persistentCachedPaths.length > 0 || preloadedPaths.length > 0;
@@ -491,19 +562,45 @@ function performSearch() {
     let results = [];
 
     // 搜索静态索引
-    if (hasSearchData) {
-        const indexResults = searchData.filter(item => {
+    const sequence = ++searchSequence;
+    if (searchIndex) {
+        // 倒排索引：按查询词项查表，结果已按相关度排序（分片索引需异步下载所需分片）
+        try {
+            results = results.concat(await searchIndex.search(query));
+        } catch (error) {
+            console.error('搜索索引查询出错:', error);
+        }
+        if (sequence !== searchSequence) return;
+    } else if (hasSearchData) {
+        // 标题命中优先，其次是关键词命中（关键词按相关度排序，越靠前越相关），最后是仅内容命中
+        const indexResults = searchData.map((item, index) => {
             const titleMatch = item.title.toLowerCase().includes(query);
             const contentMatch = item.content.toLowerCase().includes(query);
-            const keywordMatch = item.keywords && item.keywords.some(keyword => keyword.toLowerCase().includes(query));
+            const keywordIndex = item.keywords ? item.keywords.findIndex(keyword => keyword.toLowerCase().includes(query)) : -1;
 
-            return titleMatch || contentMatch || keywordMatch;
-        });
+            if (!titleMatch && !contentMatch && keywordIndex === -1) {
+                return null;
+            }
+            const keywordScore = keywordIndex === -1 ? 0 : 1 / (keywordIndex + 1);
+            return { item, index, rank: (titleMatch ? 2 : 0) + keywordScore };
+        }).filter(Boolean)
+            .sort((a, b) => b.rank - a.rank || a.index - b.index)
+            .map(({ item }) => item);
 
         // 将索引结果添加到总结果中
         results = results.concat(indexResults);
     }
 
+    // 已加载标题大纲（build.py --toc）时，未定位到章节的结果链接到标题包含查询文本的章节
+    const tocData = await loadTocData();
+    if (sequence !== searchSequence) return;
+    if (tocData) {
+        results = results.map(result => {
+            const heading = result.anchor ? null : findMatchingHeading(tocData, result.path, query);
+            return heading ? { ...result, anchor: heading[2], section: heading[1] } : result;
+        });
+    }
+
     // 搜索缓存文档（如果有）
     if (hasCachedDocs && config.search.search_cached) {
         // 在页面上显示正在搜索缓存的提示
@@ -681,9 +778,9 @@ function displaySearchResults(results, query, searchResultsContainer) {
 
             html += `
             <li class="border dark:border-gray-700 ${cacheClass} border-l-4 rounded-md shadow-sm hover:shadow-md transition-all duration-200 overflow-hidden">
-                <div class="block hover:bg-gray-50 dark:hover:bg-gray-700 search-result-item p-0" data-path="${result.path}" data-query="${query}">
+                <div class="block hover:bg-gray-50 dark:hover:bg-gray-700 search-result-item p-0" data-path="${result.path}" data-anchor="${result.anchor || ''}" data-query="${query}">
                     <div class="flex items-center p-3 pb-2 border-b border-gray-100 dark:border-gray-700">
-                        <h4 class="text-primary font-medium flex-grow">${highlightText(result.title, query)}</h4>
+                        <h4 class="text-primary font-medium flex-grow">${highlightText(result.title, query)}${result.section ? ` <span class="text-gray-500 dark:text-gray-400 text-sm">› ${highlightText(result.section, query)}</span>` : ''}</h4>
                         ${cacheIcon}
                     </div>
                     <div class="text-gray-600 dark:text-gray-300 text-sm p-3 search-preview">${contentPreview}</div>
@@ -710,6 +807,7 @@ function displaySearchResults(results, query, searchResultsContainer) {
                 e.preventDefault();
 
                 const path = this.getAttribute('data-path');
+                const anchor = this.getAttribute('data-anchor') || '';
                 const query = this.getAttribute('data-query');
 
                 // 检查是否点击了特定的匹配项
@@ -739,8 +837,8 @@ function displaySearchResults(results, query, searchResultsContainer) {
                     }
                 }
 
-                // 生成新格式的URL
-                let targetUrl = generateNewDocumentUrl(path, root);
+                // 生成新格式的URL（全文索引命中章节时跳转到该章节，点击具体匹配项时按匹配项定位）
+                let targetUrl = generateNewDocumentUrl(path, root, occurrenceTarget ? '' : anchor);
 
                 // 添加搜索参数到URL查询参数中
                 // 为相对路径提供base URL，或者确保使用绝对URL
@@ -0,0 +1,88 @@
+/**
+ * 预渲染文档模块
+ * 加载 build.py --prerender 生成的 HTML 片段（prerender/manifest.json），
+ * 文档内容与构建时一致时直接使用片段，跳过浏览器端的 Markdown 解析
+ */
+import config from './validated-config.js';
+import { getBranchDataPath } from './path-utils.js';
+
+// 清单地址 -> 加载中的 Promise，每个分支只请求一次
+const manifestRequests = new Map();
+
+/**
+ * 取得当前分支预渲染目录的地址（与 path.json 位于同一目录）
+ * @returns {string} 目录地址
+ */
+function getPrerenderBase() {
+    const dataRoot = config.document.branch_support ? getBranchDataPath().replace(/\/$/, '') : '';
+    return `${dataRoot}/prerender`;
+}
+
+/**
+ * 请求 JSON 文件
+ * @param {string} url 地址
+ * @returns {Promise<Object|null>} 请求失败返回 null
+ */
+async function fetchJson(url) {
+    const response = await fetch(url);
+    return response.ok ? response.json() : null;
+}
+
+/**
+ * 加载预渲染清单
+ * @param {string} base 预渲染目录地址
+ * @returns {Promise<Object|null>} 清单，未生成时返回 null
+ */
+function loadManifest(base) {
+    const url = `${base}/manifest.json`;
+    if (!manifestRequests.has(url)) {
+        const request = fetchJson(url).catch(error => {
+            // 允许下次加载文档时重试
+            manifestRequests.delete(url);
+            throw error;
+        });
+        manifestRequests.set(url, request);
+    }
+    return manifestRequests.get(url);
+}
+
+/**
+ * 计算文本的 SHA-1（与 build.py 的 source_hash 一致）
+ * @param {string} text 文本
+ * @returns {Promise<string>} 十六进制摘要
+ */
+async function sha1Hex(text) {
+    const digest = await crypto.subtle.digest('SHA-1', new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
+/**
+ * 取得文档的预渲染片段
+ * 未启用、清单中没有该文档、文档在构建后已修改或加载失败时返回 null，由调用方回退到解析 Markdown
+ * @param {string} relativePath 文档相对路径
+ * @param {string} content 文档原始内容
+ * @returns {Promise<{html: string, toc: Array}|null>} 预渲染片段
+ */
+export async function loadPrerenderedDocument(relativePath, content) {
+    // crypto.subtle 只在安全上下文（HTTPS 或 localhost）中可用
+    if (!config.document.prerender || !window.crypto?.subtle) {
+        return null;
+    }
+    try {
+        const base = getPrerenderBase();
+        const manifest = await loadManifest(base);
+        const entry = manifest?.docs?.[relativePath.replace(/^\/+/, '')];
+        if (!entry) {
+            return null;
+        }
+        const [file, sourceHash] = entry;
+        if (await sha1Hex(content) !== sourceHash) {
+            return null;
+        }
+        const fragment = await fetchJson(`${base}/${file}`);
+        return typeof fragment?.html === 'string' ? fragment : null;
+    } catch (error) {
+        console.warn('预渲染片段加载失败，回退到解析 Markdown:', error);
+        return null;
+    }
+}
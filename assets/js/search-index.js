@@ -0,0 +1,329 @@
+/**
+ * 倒排搜索索引模块
+ * 加载 build.py --search-inverted 生成的 search-index.json（或 --search-shards 生成的分片），
+ * 查询时只查找查询词对应的倒排列表，无需逐条扫描全部文档
+ */
+
+// 中日韩统一表意文字范围（与 build.py 中的 CJK_CHARS 保持一致）
+const CJK_CHARS = '\\u3400-\\u4dbf\\u4e00-\\u9fff\\uf900-\\ufaff';
+// 连续的中文字符，或不含中文的连续单词字符
+const TOKEN_PATTERN = new RegExp(`[${CJK_CHARS}]+|(?:(?![${CJK_CHARS}])[\\p{L}\\p{N}_])+`, 'gu');
+const CJK_PATTERN = new RegExp(`^[${CJK_CHARS}]`, 'u');
+
+// 前缀扩展时最多匹配的词项数
+const MAX_PREFIX_TERMS = 50;
+
+/**
+ * 将文本切分为搜索词项（与 build.py 的 tokenize_text 保持一致）
+ * 英文等按单词切分并忽略单个字符，中文按相邻二元组切分，单个汉字保留原样
+ * @param {string} text 文本
+ * @returns {string[]} 词项列表
+ */
+export function tokenize(text) {
+    const tokens = [];
+    for (const match of String(text || '').toLowerCase().matchAll(TOKEN_PATTERN)) {
+        const run = match[0];
+        if (CJK_PATTERN.test(run)) {
+            const chars = Array.from(run);
+            if (chars.length === 1) {
+                tokens.push(run);
+            } else {
+                for (let i = 0; i < chars.length - 1; i++) {
+                    tokens.push(chars[i] + chars[i + 1]);
+                }
+            }
+        } else if (run.length > 1) {
+            tokens.push(run);
+        }
+    }
+    return tokens;
+}
+
+/**
+ * 倒排索引
+ * terms 结构：词项 -> [文档频率, 文档序号, 权重, 文档序号, 权重, ...]；
+ * 全文索引（stride 为 3）时每个文档额外记录章节序号：[文档频率, 文档序号, 权重, 章节序号, ...]
+ */
+export class InvertedSearchIndex {
+    constructor(data) {
+        this.docs = data.docs || [];
+        this.terms = data.terms || {};
+        this.stride = data.stride || 2;
+        this.sortedTerms = null;
+    }
+
+    /**
+     * 加载倒排索引
+     * @param {string} url search-index.json 地址
+     * @returns {Promise<InvertedSearchIndex|null>} 加载失败返回 null
+     */
+    static async load(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            return null;
+        }
+        return new InvertedSearchIndex(await response.json());
+    }
+
+    get size() {
+        return this.docs.length;
+    }
+
+    /**
+     * 查找以 prefix 开头的词项（二分查找有序词表）
+     * @param {string} prefix 前缀
+     * @returns {string[]} 词项列表
+     */
+    expandPrefix(prefix) {
+        if (!this.sortedTerms) {
+            this.sortedTerms = Object.keys(this.terms).sort();
+        }
+        const terms = this.sortedTerms;
+        let low = 0;
+        let high = terms.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (terms[mid] < prefix) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        const result = [];
+        for (let i = low; i < terms.length && result.length < MAX_PREFIX_TERMS; i++) {
+            if (!terms[i].startsWith(prefix)) break;
+            result.push(terms[i]);
+        }
+        return result;
+    }
+
+    /**
+     * 计算单个查询词项在各文档中的得分（权重 × IDF）
+     * @param {string[]} terms 该查询词项对应的索引词项（含前缀扩展结果）
+     * @returns {Map<number, [number, number]>} 文档序号 -> [得分, 章节序号]
+     */
+    scoreTerms(terms) {
+        const scores = new Map();
+        const total = this.size;
+        const stride = this.stride;
+        terms.forEach(term => {
+            const entry = this.terms[term];
+            if (!entry) return;
+            const idf = Math.log(1 + total / entry[0]);
+            for (let i = 1; i < entry.length; i += stride) {
+                const score = entry[i + 1] * idf;
+                const current = scores.get(entry[i]);
+                if (!current || score > current[0]) {
+                    scores.set(entry[i], [score, stride > 2 ? entry[i + 2] : 0]);
+                }
+            }
+        });
+        return scores;
+    }
+
+    /**
+     * 将查询拆分为词项，并标记哪些词项按前缀匹配（最后一个英文词项及单个汉字）
+     * @param {string} query 查询文本
+     * @returns {Array<{token: string, prefix: boolean}>} 查询词项
+     */
+    parseQuery(query) {
+        const tokens = [...new Set(tokenize(query))];
+        return tokens.map((token, index) => ({
+            token,
+            prefix: (index === tokens.length - 1 && !CJK_PATTERN.test(token)) || Array.from(token).length === 1
+        }));
+    }
+
+    /**
+     * 计算文档排名：所有查询词项都需命中，章节取得分最高的查询词项所在章节
+     * @param {Array<{token: string, prefix: boolean}>} queryTerms 查询词项
+     * @returns {Array<[number, number, number]>} 按得分排序的 [文档序号, 得分, 章节序号]
+     */
+    rank(queryTerms) {
+        if (queryTerms.length === 0) {
+            return [];
+        }
+
+        // 文档序号 -> [总得分, 章节序号, 单个查询词项的最高得分]
+        let combined = null;
+        queryTerms.forEach(({ token, prefix }) => {
+            const scores = this.scoreTerms(prefix ? this.expandPrefix(token) : [token]);
+
+            if (combined === null) {
+                combined = new Map();
+                scores.forEach(([score, section], docId) => combined.set(docId, [score, section, score]));
+                return;
+            }
+            const next = new Map();
+            combined.forEach(([total, section, best], docId) => {
+                const match = scores.get(docId);
+                if (match) {
+                    next.set(docId, match[0] > best
+                        ? [total + match[0], match[1], match[0]]
+                        : [total + match[0], section, best]);
+                }
+            });
+            combined = next;
+        });
+
+        return Array.from(combined.entries())
+            .map(([docId, [score, section]]) => [docId, score, section])
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+    }
+
+    /**
+     * 组装搜索结果，全文索引时附带匹配章节的锚点和标题
+     * @param {number} docId 文档序号
+     * @param {number} score 得分
+     * @param {number} section 章节序号（0 表示文档开头）
+     * @returns {Object} 搜索结果
+     */
+    makeResult(docId, score, section) {
+        const doc = this.docs[docId];
+        const { sections, ...fields } = doc;
+        const result = { ...fields, keywords: [], score };
+        const matched = section > 0 && sections ? sections[section - 1] : null;
+        if (matched) {
+            result.anchor = matched[0];
+            result.section = matched[1];
+        }
+        return result;
+    }
+
+    /**
+     * 搜索文档
+     * @param {string} query 查询文本
+     * @returns {Array<Object>} 按得分排序的文档（title、path、content、score，全文索引时另有 anchor、section）
+     */
+    search(query) {
+        return this.rank(this.parseQuery(query))
+            .map(([docId, score, section]) => this.makeResult(docId, score, section));
+    }
+}
+
+/**
+ * 在按起始键升序排列的分片列表中查找包含 key 的分片序号
+ * @param {Array<Object>} shards 分片列表（from 为分片首个键）
+ * @param {string|number} key 词项或文档序号
+ * @returns {number} 分片序号，key 小于所有分片起始键时返回 -1
+ */
+function findShard(shards, key) {
+    let low = 0;
+    let high = shards.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (shards[mid].from <= key) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low - 1;
+}
+
+/**
+ * 分片倒排索引
+ * 加载 build.py --search-shards 生成的 search-shards/manifest.json，
+ * 查询时只下载查询词项所在的词项分片和结果文档所在的文档分片
+ */
+export class ShardedSearchIndex extends InvertedSearchIndex {
+    constructor(manifest, baseUrl) {
+        super({ stride: manifest.stride });
+        this.manifest = manifest;
+        this.baseUrl = baseUrl;
+        // 分片文件名 -> 加载中的 Promise，避免重复下载
+        this.loadedShards = new Map();
+    }
+
+    /**
+     * 加载分片清单
+     * @param {string} url manifest.json 地址
+     * @returns {Promise<ShardedSearchIndex|null>} 加载失败返回 null
+     */
+    static async load(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            return null;
+        }
+        const manifest = await response.json();
+        return new ShardedSearchIndex(manifest, url.substring(0, url.lastIndexOf('/') + 1));
+    }
+
+    get size() {
+        return this.manifest.doc_count || 0;
+    }
+
+    /**
+     * 下载单个分片并合并到已加载的词项或文档中
+     * @param {Object} shard 分片信息
+     * @returns {Promise<void>}
+     */
+    loadShard(shard) {
+        if (!this.loadedShards.has(shard.file)) {
+            const promise = fetch(this.baseUrl + shard.file)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`搜索索引分片加载失败: ${shard.file} (${response.status})`);
+                    }
+                    return response.json();
+                })
+                .then(data => {
+                    if (data.terms) {
+                        Object.assign(this.terms, data.terms);
+                        this.sortedTerms = null;
+                    }
+                    if (data.docs) {
+                        data.docs.forEach((doc, index) => {
+                            this.docs[shard.from + index] = doc;
+                        });
+                    }
+                })
+                .catch(error => {
+                    // 允许下次查询时重试
+                    this.loadedShards.delete(shard.file);
+                    throw error;
+                });
+            this.loadedShards.set(shard.file, promise);
+        }
+        return this.loadedShards.get(shard.file);
+    }
+
+    /**
+     * 计算查询词项所需的词项分片：精确匹配取所在分片，前缀匹配取与前缀区间重叠的全部分片
+     * @param {Array<{token: string, prefix: boolean}>} queryTerms 查询词项
+     * @returns {Set<Object>} 分片集合
+     */
+    termShardsFor(queryTerms) {
+        const shards = this.manifest.terms || [];
+        const needed = new Set();
+        queryTerms.forEach(({ token, prefix }) => {
+            if (shards.length === 0) return;
+            const start = Math.max(findShard(shards, token), 0);
+            needed.add(shards[start]);
+            if (!prefix) return;
+            for (let i = start + 1; i < shards.length && shards[i].from.startsWith(token); i++) {
+                needed.add(shards[i]);
+            }
+        });
+        return needed;
+    }
+
+    /**
+     * 搜索文档（异步：按需下载分片）
+     * @param {string} query 查询文本
+     * @returns {Promise<Array<Object>>} 按得分排序的文档（title、path、content、score）
+     */
+    async search(query) {
+        const queryTerms = this.parseQuery(query);
+        await Promise.all([...this.termShardsFor(queryTerms)].map(shard => this.loadShard(shard)));
+
+        const ranked = this.rank(queryTerms);
+        const docShards = this.manifest.docs || [];
+        const neededDocs = new Set(ranked.map(([docId]) => docShards[findShard(docShards, docId)]));
+        await Promise.all([...neededDocs].filter(Boolean).map(shard => this.loadShard(shard)));
+
+        return ranked
+            .filter(([docId]) => this.docs[docId])
+            .map(([docId, score, section]) => this.makeResult(docId, score, section));
+    }
+}
@@ -0,0 +1,116 @@
+/**
+ * Service Worker 模板
+ * build.py --service-worker 在开头写入预缓存清单 self.__PRECACHE（{version, files: {相对站点根目录的路径: 内容哈希}}），
+ * 输出为站点根目录的 sw.js。清单中的文件按缓存优先返回；新版本安装时只重新下载内容哈希变化的文件，
+ * 其余文件从上一版本的缓存复制，部署后只有实际变化的文件失效
+ */
+const CACHE_PREFIX = 'easydoc-precache-';
+const precache = self.__PRECACHE || { version: 'dev', files: {} };
+const CACHE_NAME = CACHE_PREFIX + precache.version;
+// 缓存中记录已缓存文件及其内容哈希的条目
+const MANIFEST_URL = new URL('__easydoc/precache-manifest.json', self.registration.scope).href;
+// 安装时同时下载的文件数
+const INSTALL_CONCURRENCY = 8;
+
+// 请求路径 -> 缓存键（完整地址），目录地址对应其中的 index.html
+const precachedUrls = new Map();
+Object.keys(precache.files).forEach(path => {
+    const url = new URL(path, self.registration.scope);
+    precachedUrls.set(url.pathname, url.href);
+    if (url.pathname.endsWith('/index.html')) {
+        precachedUrls.set(url.pathname.slice(0, -'index.html'.length), url.href);
+    }
+});
+
+/**
+ * 查找上一版本的预缓存及其记录的内容哈希
+ * @returns {Promise<{cache: Cache, files: Object}|null>}
+ */
+async function findPreviousCache() {
+    const names = (await caches.keys()).filter(name => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME);
+    for (const name of names.reverse()) {
+        const cache = await caches.open(name);
+        const response = await cache.match(MANIFEST_URL);
+        if (response) {
+            return { cache, files: (await response.json()).files || {} };
+        }
+    }
+    return null;
+}
+
+/**
+ * 将单个文件放入新版本缓存：内容哈希未变化时复制上一版本的缓存，否则绕过 HTTP 缓存重新下载
+ * @returns {Promise<boolean>} 是否缓存成功
+ */
+async function cacheFile(cache, previous, path, hash) {
+    const url = new URL(path, self.registration.scope).href;
+    if (previous && previous.files[path] === hash) {
+        const response = await previous.cache.match(url);
+        if (response) {
+            await cache.put(url, response);
+            return true;
+        }
+    }
+    try {
+        const response = await fetch(url, { cache: 'no-cache' });
+        if (!response.ok) {
+            return false;
+        }
+        await cache.put(url, response);
+        return true;
+    } catch (error) {
+        console.warn(`预缓存失败: ${path}`, error);
+        return false;
+    }
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        const previous = await findPreviousCache();
+        const entries = Object.entries(precache.files);
+        // 只记录成功缓存的文件，失败的文件在下次安装时重试，期间从网络加载
+        const cached = {};
+        let next = 0;
+        const worker = async () => {
+            while (next < entries.length) {
+                const [path, hash] = entries[next++];
+                if (await cacheFile(cache, previous, path, hash)) {
+                    cached[path] = hash;
+                }
+            }
+        };
+        await Promise.all(Array.from({ length: INSTALL_CONCURRENCY }, worker));
+        await cache.put(MANIFEST_URL, new Response(JSON.stringify({ version: precache.version, files: cached }), {
+            headers: { 'Content-Type': 'application/json' }
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+    // 忽略查询参数（文档请求带有防缓存的 _t 参数），内容是否更新由清单中的内容哈希决定
+    const cacheKey = precachedUrls.get(url.pathname);
+    if (!cacheKey) return;
+
+    event.respondWith((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        const response = await cache.match(cacheKey);
+        return response || fetch(request);
+    })());
+});
@@ -1121,8 +1121,12 @@ function generateToc(contentElement) {
     const tocNav = document.getElementById('toc-nav');
     if (!tocNav) return;
 
-    // 显示TOC加载动画
-    showTocLoading();
+    // 已显示 toc.json 中的目录时不再显示加载动画，正文标题与目录一致时直接沿用
+    const precomputedKey = tocNav.dataset.tocKey;
+    if (!precomputedKey) {
+        // 显示TOC加载动画
+        showTocLoading();
+    }
 
     // 使用平滑切换动画
     setTimeout(async () => {
@@ -1170,9 +1174,13 @@ function generateToc(contentElement) {
             }
         });
 
-        const headingsArray = Array.from(headings);
+        const entries = Array.from(headings, heading => [parseInt(heading.tagName.substring(1)), heading.textContent, heading.id]);
+        if (precomputedKey && precomputedKey === getTocKey(entries)) {
+            return;
+        }
+        delete tocNav.dataset.tocKey;
 
-        if (headingsArray.length === 0) {
+        if (entries.length === 0) {
             await fadeOutLoadingAndShowContent(tocNav, () => {
                 tocNav.innerHTML = '<p class="text-gray-400 text-sm">暂无目录</p>';
             });
@@ -1180,164 +1188,182 @@ function generateToc(contentElement) {
         }
 
         await fadeOutLoadingAndShowContent(tocNav, () => {
-            // 生成目录
-            const tocDepth = config.document.toc_depth || 3;
-            // 是否显示标题编号
-            const showNumbering = config.document.toc_numbering || false;
-            // 是否忽略h1标题计数
-            const ignoreH1 = config.document.toc_ignore_h1 || false;
-            // 是否启用动态展开功能
-            const dynamicExpand = config.document.toc_dynamic_expand !== false;
-
-            // 用于生成标题编号的计数器
-            const counters = [0, 0, 0, 0, 0, 0];
-            let lastLevel = 0;
-
-            // 记录标题层级结构，用于后续动态展开功能
-            const headingHierarchy = {};
-            let currentParents = [null, null, null, null, null, null]; // 每个级别的当前父级标题
-
-            headingsArray.forEach((heading, index) => { // 使用转换后的数组
-                const level = parseInt(heading.tagName.substring(1));
-
-                // 如果标题没有ID，添加一个
-                if (!heading.id) {
-                    heading.id = `heading-${index}`;
-                }
-                const id = heading.id;
-
-                // 处理标题编号
-                let prefix = '';
-                if (showNumbering) {
-                    // 如果设置了忽略h1并且当前是h1，不生成编号
-                    if (ignoreH1 && level === 1) {
-                        prefix = '';
-                    } else {
-                        // 更新计数器，对h1做特殊处理
-                        if (level > lastLevel) {
-                            // 如果新标题级别比上一个大，将所有更深层级的计数器重置为0
-                            for (let i = lastLevel; i < level; i++) {
-                                // 如果忽略h1，并且是处理h1计数器，则跳过
-                                if (!(ignoreH1 && i === 0)) {
-                                    counters[i]++;
-                                }
-                            }
-                            for (let i = level; i < counters.length; i++) {
-                                counters[i] = 0;
-                            }
-                        } else if (level === lastLevel) {
-                            // 如果新标题与上一个同级，递增计数器
-                            // 如果忽略h1，并且是处理h1计数器，则跳过
-                            if (!(ignoreH1 && level === 1)) {
-                                counters[level - 1]++;
-                            }
-                        } else {
-                            // 如果新标题比上一个小（更高级别），递增当前级别并重置更低级别
-                            // 如果忽略h1，并且是处理h1计数器，则跳过
-                            if (!(ignoreH1 && level === 1)) {
-                                counters[level - 1]++;
-                            }
-                            for (let i = level; i < counters.length; i++) {
-                                counters[i] = 0;
-                            }
-                        }
+            renderTocItems(tocNav, entries);
+        }, true, '.toc-item:not(.toc-beyond-depth)'); // 使用交错动画，排除超出深度的元素
 
-                        // 生成标题编号，注意对h1的特殊处理
-                        prefix = '';
-                        // 如果忽略h1，则从h2开始计数
-                        const startIdx = ignoreH1 ? 1 : 0;
-                        for (let i = startIdx; i < level; i++) {
-                            if (counters[i] > 0) {
-                                prefix += counters[i] + '.';
-                            }
+        // 移除这行，因为动画已经在 fadeOutLoadingAndShowContent 中处理了
+        // addStaggerAnimation(tocNav, '.toc-item');
+    }, precomputedKey ? 0 : getLoadingAnimationMinDuration()); // 根据动画总开关和配置设置加载动画显示时间
+}
+
+// 目录条目的级别和锚点组成的键，用于判断正文标题是否与已显示的目录一致
+function getTocKey(entries) {
+    return entries.map(([level, , id]) => `${level}:${id}`).join('\n');
+}
+
+/**
+ * 在正文下载前显示 build.py --toc 生成的目录，正文渲染后标题一致时 generateToc 不再重新生成
+ * @param {Array<[number, string, string]>} entries 标题大纲 [[级别, 标题, 锚点], ...]
+ */
+function showPrecomputedToc(entries) {
+    const tocNav = document.getElementById('toc-nav');
+    if (!tocNav || !entries || entries.length === 0) return;
+
+    tocNav.innerHTML = '';
+    renderTocItems(tocNav, entries);
+    tocNav.dataset.tocKey = getTocKey(entries);
+}
+
+// 根据标题条目 [[级别, 标题文本, 锚点], ...] 生成目录
+function renderTocItems(tocNav, entries) {
+    // 生成目录
+    const tocDepth = config.document.toc_depth || 3;
+    // 是否显示标题编号
+    const showNumbering = config.document.toc_numbering || false;
+    // 是否忽略h1标题计数
+    const ignoreH1 = config.document.toc_ignore_h1 || false;
+    // 是否启用动态展开功能
+    const dynamicExpand = config.document.toc_dynamic_expand !== false;
+
+    // 用于生成标题编号的计数器
+    const counters = [0, 0, 0, 0, 0, 0];
+    let lastLevel = 0;
+
+    // 记录标题层级结构，用于后续动态展开功能
+    const headingHierarchy = {};
+    let currentParents = [null, null, null, null, null, null]; // 每个级别的当前父级标题
+
+    entries.forEach(([level, text, headingId], index) => {
+        // 如果标题没有ID，使用序号
+        const id = headingId || `heading-${index}`;
+
+        // 处理标题编号
+        let prefix = '';
+        if (showNumbering) {
+            // 如果设置了忽略h1并且当前是h1，不生成编号
+            if (ignoreH1 && level === 1) {
+                prefix = '';
+            } else {
+                // 更新计数器，对h1做特殊处理
+                if (level > lastLevel) {
+                    // 如果新标题级别比上一个大，将所有更深层级的计数器重置为0
+                    for (let i = lastLevel; i < level; i++) {
+                        // 如果忽略h1，并且是处理h1计数器，则跳过
+                        if (!(ignoreH1 && i === 0)) {
+                            counters[i]++;
                         }
-                        prefix = prefix ? `${prefix} ` : '';
+                    }
+                    for (let i = level; i < counters.length; i++) {
+                        counters[i] = 0;
+                    }
+                } else if (level === lastLevel) {
+                    // 如果新标题与上一个同级，递增计数器
+                    // 如果忽略h1，并且是处理h1计数器，则跳过
+                    if (!(ignoreH1 && level === 1)) {
+                        counters[level - 1]++;
+                    }
+                } else {
+                    // 如果新标题比上一个小（更高级别），递增当前级别并重置更低级别
+                    // 如果忽略h1，并且是处理h1计数器，则跳过
+                    if (!(ignoreH1 && level === 1)) {
+                        counters[level - 1]++;
+                    }
+                    for (let i = level; i < counters.length; i++) {
+                        counters[i] = 0;
                     }
                 }
 
-                lastLevel = level;
-
-                const li = document.createElement('li');
-                li.classList.add('toc-item', `toc-level-${level}`);
-                const a = document.createElement('a');
-
-                // 生成新格式的链接：保留当前文档路径，添加锚点
-                const currentParsed = parseUrlPath();
-                const tocUrl = generateNewUrl(currentParsed.path, currentParsed.root, id);
-                a.href = tocUrl;
-
-                a.innerHTML = prefix + heading.textContent;  // 使用innerHTML以支持编号+标题文本
-                a.classList.add('block', 'text-sm', 'py-1', 'hover:text-primary', 'dark:hover:text-primary');
-                a.style.marginLeft = `${(level - 1) * 0.75}rem`; // 缩进
-                a.dataset.headingId = id;
-                a.dataset.level = level;
-
-                // 如果级别大于tocDepth且动态展开功能开启，则隐藏（但仍然生成）
-                if (level > tocDepth && dynamicExpand) {
-                    li.classList.add('hidden');
-                    li.dataset.hidden = 'true';
-                    // 为超出深度的元素添加标记，避免应用动画
-                    li.classList.add('toc-beyond-depth');
+                // 生成标题编号，注意对h1的特殊处理
+                prefix = '';
+                // 如果忽略h1，则从h2开始计数
+                const startIdx = ignoreH1 ? 1 : 0;
+                for (let i = startIdx; i < level; i++) {
+                    if (counters[i] > 0) {
+                        prefix += counters[i] + '.';
+                    }
                 }
+                prefix = prefix ? `${prefix} ` : '';
+            }
+        }
 
-                // 记录当前标题的层级关系，用于后续动态展开
-                currentParents[level - 1] = id;
-                if (level > 1 && currentParents[level - 2]) {
-                    // 记录该标题的父级标题
-                    headingHierarchy[id] = {
-                        parent: currentParents[level - 2],
-                        level: level
-                    };
-                }
+        lastLevel = level;
 
-                // 点击目录条目时滚动到对应标题
-                a.addEventListener('click', (e) => {
-                    e.preventDefault();
-                    e.stopPropagation(); // 阻止冒泡，防止触发document的全局点击事件处理
-                    const targetHeading = document.getElementById(id);
-                    if (targetHeading) {
-                        // 计算目标位置，使标题显示在屏幕上方30%的位置
-                        const targetPosition = targetHeading.getBoundingClientRect().top + window.scrollY;
-                        const offset = window.innerHeight * 0.30; // 屏幕高度的30%
-                        window.scrollTo({
-                            top: targetPosition - offset,
-                            behavior: 'smooth'
-                        });
-
-                        // 更新URL为新格式，包含锚点
-                        const newUrl = generateNewUrl(currentParsed.path, currentParsed.root, id);
-                        history.pushState(null, null, newUrl);
-
-                        // 高亮当前目录项
-                        document.querySelectorAll('#toc-nav a').forEach(link => link.classList.remove('active'));
-                        a.classList.add('active');
-
-                        // 确保当前目录项在视图中
-                        scrollTocToActiveItem(a);
-
-                        // 如果启用了动态展开功能，展开下一级标题
-                        if (dynamicExpand) {
-                            expandChildHeadings(id, level);
-                        }
-                    }
+        const li = document.createElement('li');
+        li.classList.add('toc-item', `toc-level-${level}`);
+        const a = document.createElement('a');
+
+        // 生成新格式的链接：保留当前文档路径，添加锚点
+        const currentParsed = parseUrlPath();
+        const tocUrl = generateNewUrl(currentParsed.path, currentParsed.root, id);
+        a.href = tocUrl;
+
+        a.textContent = prefix + text;
+        a.classList.add('block', 'text-sm', 'py-1', 'hover:text-primary', 'dark:hover:text-primary');
+        a.style.marginLeft = `${(level - 1) * 0.75}rem`; // 缩进
+        a.dataset.headingId = id;
+        a.dataset.level = level;
+
+        // 如果级别大于tocDepth且动态展开功能开启，则隐藏（但仍然生成）
+        if (level > tocDepth && dynamicExpand) {
+            li.classList.add('hidden');
+            li.dataset.hidden = 'true';
+            // 为超出深度的元素添加标记，避免应用动画
+            li.classList.add('toc-beyond-depth');
+        }
+
+        // 记录当前标题的层级关系，用于后续动态展开
+        currentParents[level - 1] = id;
+        if (level > 1 && currentParents[level - 2]) {
+            // 记录该标题的父级标题
+            headingHierarchy[id] = {
+                parent: currentParents[level - 2],
+                level: level
+            };
+        }
+
+        // 点击目录条目时滚动到对应标题
+        a.addEventListener('click', (e) => {
+            e.preventDefault();
+            e.stopPropagation(); // 阻止冒泡，防止触发document的全局点击事件处理
+            const targetHeading = document.getElementById(id);
+            if (targetHeading) {
+                // 计算目标位置，使标题显示在屏幕上方30%的位置
+                const targetPosition = targetHeading.getBoundingClientRect().top + window.scrollY;
+                const offset = window.innerHeight * 0.30; // 屏幕高度的30%
+                window.scrollTo({
+                    top: targetPosition - offset,
+                    behavior: 'smooth'
                 });
 
-                li.appendChild(a);
-                tocNav.appendChild(li);
-            });
+                // 更新URL为新格式，包含锚点
+                const newUrl = generateNewUrl(currentParsed.path, currentParsed.root, id);
+                history.pushState(null, null, newUrl);
 
-            // 保存标题层级结构到window对象，方便其他函数访问
-            window.headingHierarchy = headingHierarchy;
+                // 高亮当前目录项
+                document.querySelectorAll('#toc-nav a').forEach(link => link.classList.remove('active'));
+                a.classList.add('active');
 
-            // 移除旧的滚动监听器（如果有）
-            window.removeEventListener('scroll', handleTocScrollHighlight);
-            // 添加滚动监听，高亮当前章节
-            window.addEventListener('scroll', handleTocScrollHighlight);
-        }, true, '.toc-item:not(.toc-beyond-depth)'); // 使用交错动画，排除超出深度的元素
+                // 确保当前目录项在视图中
+                scrollTocToActiveItem(a);
 
-        // 移除这行，因为动画已经在 fadeOutLoadingAndShowContent 中处理了
-        // addStaggerAnimation(tocNav, '.toc-item');
-    }, getLoadingAnimationMinDuration()); // 根据动画总开关和配置设置加载动画显示时间
+                // 如果启用了动态展开功能，展开下一级标题
+                if (dynamicExpand) {
+                    expandChildHeadings(id, level);
+                }
+            }
+        });
+
+        li.appendChild(a);
+        tocNav.appendChild(li);
+    });
+
+    // 保存标题层级结构到window对象，方便其他函数访问
+    window.headingHierarchy = headingHierarchy;
+
+    // 移除旧的滚动监听器（如果有）
+    window.removeEventListener('scroll', handleTocScrollHighlight);
+    // 添加滚动监听，高亮当前章节
+    window.addEventListener('scroll', handleTocScrollHighlight);
 }
 
 // 展开指定标题的子标题
@@ -1764,6 +1790,7 @@ function showSidebarLoading() {
 
 function showTocLoading() {
     const tocNav = document.getElementById('toc-nav');
+    delete tocNav.dataset.tocKey;
 
     // 检查是否启用骨架屏动画（考虑动画总开关）
     const enableSkeleton = isAnimationEnabled('toc', 'enable_skeleton');
@@ -1942,7 +1969,7 @@ export {
     // 侧边栏相关
     generateSidebar, generateSkeletonItems,
     // 目录(TOC)相关
-    generateToc, generateTocSkeletonItems, getFolderPathFromIndexPath, handleFolderExpandMode, handleTocScrollHighlight, highlightCurrentDocument, highlightParentFolders, navigateToFolderIndex, scrollSidebarToActiveItem, scrollTocToActiveItem, setActiveLink,
+    generateToc, generateTocSkeletonItems, showPrecomputedToc, getFolderPathFromIndexPath, handleFolderExpandMode, handleTocScrollHighlight, highlightCurrentDocument, highlightParentFolders, navigateToFolderIndex, scrollSidebarToActiveItem, scrollTocToActiveItem, setActiveLink,
     // 工具函数
     showSidebarLoading,
     showTocLoading, toggleFolder, updateActiveHeading, updateBackToFullDirectoryLink
@@ -29,7 +29,12 @@ export function initSundryModule(data, root, branch, updateActiveHeadingFn) {
 }
 
 // 导入路径工具
-import { generateNewUrl as pathGenerateNewUrl } from './path-utils.js';
+import { generateNewUrl as pathGenerateNewUrl, getBranchDataPath } from './path-utils.js';
+
+// git 附属文件地址 -> 加载中的 Promise（build.py --git-sidecar）
+const gitSidecarCache = new Map();
+// 最近一次按需加载 git 信息的请求序号，用于丢弃切换文档后才返回的旧结果
+let gitInfoRequest = 0;
 
 /**
  * 生成新格式URL
@@ -350,6 +355,50 @@ export function findDocInfoByPath(node, targetPath) {
     return null; // 未找到
 }
 
+/**
+ * 查找文档所在目录节点引用的 git 附属文件（build.py --git-sidecar 时 path.json 不含 git 字段）
+ * @param {Object} node 目录节点
+ * @param {string} targetPath 文档路径
+ * @returns {string|null} 附属文件路径（相对 path.json 所在目录）
+ */
+function findGitSidecar(node, targetPath) {
+    if (!node) return null;
+    if (node.index && node.index.path === targetPath) {
+        return node.git_meta || null;
+    }
+    for (const child of node.children || []) {
+        if (child.index === undefined && child.path === targetPath) {
+            return node.git_meta || null;
+        }
+        if (child.index !== undefined) {
+            const found = findGitSidecar(child, targetPath);
+            if (found) return found;
+        }
+    }
+    return null;
+}
+
+/**
+ * 加载 git 附属文件（{文档路径: git 字段}），同一文件只请求一次
+ * @param {string} sidecar 附属文件路径
+ * @returns {Promise<Object|null>} 加载失败返回 null
+ */
+function loadGitSidecar(sidecar) {
+    const base = config.document.branch_support ? getBranchDataPath().replace(/\/$/, '') : '';
+    const url = `${base}/${sidecar}`;
+    if (!gitSidecarCache.has(url)) {
+        gitSidecarCache.set(url, fetch(url)
+            .then(response => (response.ok ? response.json() : null))
+            .catch(() => null)
+            .then(data => {
+                // 加载失败时允许下次重试
+                if (!data) gitSidecarCache.delete(url);
+                return data;
+            }));
+    }
+    return gitSidecarCache.get(url);
+}
+
 function hideGitMetaElements() {
     const lastModifiedContainer = document.getElementById('last-modified');
     const contributorsContainer = document.getElementById('contributors-container');
@@ -486,18 +535,46 @@ export function updateGitInfo(relativePath) {
         return;
     }
 
+    const request = ++gitInfoRequest;
     const docInfo = findDocInfoByPath(pathData, relativePath);
     const embedded = docInfo?.git;
-    const hasEmbedded = embedded && (
-        embedded.last_modified ||
-        (Array.isArray(embedded.contributors) && embedded.contributors.length > 0)
-    );
-
-    if (hasEmbedded) {
+    if (hasGitInfo(embedded)) {
         renderGitFromEmbedded(embedded);
         return;
     }
 
+    const sidecar = findGitSidecar(pathData, relativePath);
+    if (sidecar) {
+        void loadGitSidecar(sidecar).then(blocks => {
+            if (request !== gitInfoRequest) return;
+            const info = blocks?.[relativePath];
+            if (hasGitInfo(info)) {
+                renderGitFromEmbedded(info);
+            } else {
+                updateGitInfoFromGitHub(relativePath);
+            }
+        });
+        return;
+    }
+
+    updateGitInfoFromGitHub(relativePath);
+}
+
+/**
+ * 判断构建阶段生成的 git 字段是否包含可显示的信息
+ */
+function hasGitInfo(info) {
+    return Boolean(info && (
+        info.last_modified ||
+        (Array.isArray(info.contributors) && info.contributors.length > 0)
+    ));
+}
+
+/**
+ * 构建阶段没有生成 git 信息时，通过 GitHub API 获取文档的提交记录
+ */
+function updateGitInfoFromGitHub(relativePath) {
+    const githubEnabled = config.extensions?.github?.enable !== false;
     if (!githubEnabled || !config.extensions?.github?.repo_url) {
         hideGitMetaElements();
         return;
@@ -0,0 +1,54 @@
+/**
+ * 标题大纲模块
+ * 加载 build.py --toc 生成的 toc.json（{文档路径: [[级别, 标题, 锚点], ...]}），
+ * 供目录在正文下载前显示，以及搜索结果定位到匹配的章节
+ */
+import config from './validated-config.js';
+import { getBranchDataPath } from './path-utils.js';
+
+// toc.json 地址 -> 加载中的 Promise，每个分支只请求一次
+const tocRequests = new Map();
+
+/**
+ * 加载当前分支的标题大纲
+ * @returns {Promise<Object|null>} {文档路径: [[级别, 标题, 锚点], ...]}，未启用或加载失败时返回 null
+ */
+export function loadTocData() {
+    if (!config.document.toc_data) {
+        return Promise.resolve(null);
+    }
+    const dataRoot = config.document.branch_support ? getBranchDataPath().replace(/\/$/, '') : '';
+    const url = `${dataRoot}/toc.json`;
+    if (!tocRequests.has(url)) {
+        tocRequests.set(url, fetch(url)
+            .then(response => (response.ok ? response.json() : null))
+            .catch(error => {
+                console.warn('标题大纲加载失败:', error);
+                tocRequests.delete(url);
+                return null;
+            }));
+    }
+    return tocRequests.get(url);
+}
+
+/**
+ * 取得文档的标题大纲
+ * @param {string} relativePath 文档相对路径
+ * @returns {Promise<Array<[number, string, string]>|null>} [[级别, 标题, 锚点], ...]，没有记录时返回 null
+ */
+export async function getDocumentToc(relativePath) {
+    const tocData = await loadTocData();
+    return tocData?.[relativePath.replace(/^\/+/, '')] || null;
+}
+
+/**
+ * 查找文档中标题包含查询文本的第一个章节
+ * @param {Object|null} tocData 标题大纲
+ * @param {string} path 文档路径
+ * @param {string} query 小写的查询文本
+ * @returns {[number, string, string]|null} [级别, 标题, 锚点]
+ */
+export function findMatchingHeading(tocData, path, query) {
+    const toc = tocData?.[path];
+    return toc ? toc.find(([, title]) => title.toLowerCase().includes(query)) || null : null;
+}
@@ -14,13 +14,28 @@ import sys
 import datetime
 import urllib.request
 import urllib.error
+import urllib.parse
+import http.client
+import time
 from pathlib import Path
 from html.parser import HTMLParser
 import io
 import zipfile
-import shutil
-import tempfile
 import glob
+import fnmatch
+import posixpath
+import unicodedata
+import hashlib
+import html
+import math
+import threading
+import contextlib
+import gzip
+import queue
+import mimetypes
+import email.utils
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import git
@@ -41,11 +56,19 @@ DEFAULT_CONFIG = {
         "enable": True,
         "show_last_modified": True,
         "show_contributors": True,
+        "follow_renames": False,                        # 贡献者统计是否跨越重命名
     },
     "github": {
         "enable": True,
         "edit_link": True,
         "show_avatar": False,
+        "api_base_url": "https://api.github.com",       # GitHub API 地址（可指向本地替身服务）
+        "author_map": ".easydoc-authors",               # 邮箱到 GitHub 用户名的覆盖文件（.mailmap 格式）
+    },
+    "search": {
+        "tokenizer": "bigram",                          # 关键词分词器：bigram（中文二元组）或 jieba（词典分词，需安装 jieba）
+        "keyword_scoring": "bm25",                      # 关键词评分方式：bm25 或 tfidf
+        "max_keywords": 10,                             # 每篇文档保留的关键词数量
     },
     "site": {
         "title": "",
@@ -62,8 +85,318 @@ DEFAULT_CONFIG = {
 
 # GitHub 用户信息缓存
 GITHUB_USERS_CACHE = {}
+# 提交作者索引缓存（按仓库目录与作者映射文件区分）
+GIT_AUTHOR_INDEXES = {}
+# GitHub 用户解析器（由 main 配置持久化缓存与并发数）
+GITHUB_USER_RESOLVER = None
 # 邮箱到 GitHub 用户名的映射
 EMAIL_TO_USERNAME_MAP = {}
+# Git 历史索引缓存（按仓库目录与是否跟踪重命名区分）
+GIT_HISTORY_INDEXES = {}
+# GitPython 的 Repo 对象不是线程安全的，并行构建时通过此锁串行访问
+GIT_REPO_LOCK = threading.RLock()
+# 持久化构建缓存（由 main 根据 --no-cache / --rebuild 初始化）
+BUILD_CACHE = None
+# 构建性能分析器（由 main 根据 --profile 初始化）
+BUILD_PROFILER = None
+# 性能分析的阶段及显示名称（按报告顺序排列）
+PROFILE_PHASES = {
+    "scan": "扫描目录",
+    "title": "提取标题",
+    "git": "Git 信息",
+    "username": "用户名解析",
+    "github_api": "GitHub API",
+    "merge": "合并结构",
+    "search": "搜索索引",
+    "search_fields": "提取搜索字段",
+    "prerender": "预渲染",
+    "json": "JSON 序列化",
+    "bundle": "脚本打包",
+    "html": "HTML 元数据",
+}
+# 构建缓存格式版本，缓存内容的结构或提取逻辑变化时递增
+BUILD_CACHE_VERSION = 6
+# git 附属文件目录（--git-sidecar，位于 path.json 所在目录下）
+GIT_META_DIR = "git-meta"
+# 预渲染 HTML 片段目录（--prerender，位于 path.json 所在目录下）及清单格式版本
+PRERENDER_DIR = "prerender"
+PRERENDER_VERSION = 1
+# Service Worker 模板及输出位置（--service-worker，相对站点根目录）
+SERVICE_WORKER_TEMPLATE = "assets/js/service-worker.js"
+SERVICE_WORKER_OUTPUT = "sw.js"
+# 不预缓存的文件：只在本地预览中使用的热更新脚本和 Service Worker 模板
+SERVICE_WORKER_EXCLUDES = {"assets/js/live-reload.js", SERVICE_WORKER_TEMPLATE}
+# 脚本打包（--bundle）：打包的源模块目录及输出目录（相对站点根目录），输出目录由构建工具管理
+BUNDLE_SOURCE_DIR = "assets/js"
+BUNDLE_OUTPUT_DIR = "assets/dist"
+# 打包条目的默认时间戳（ZIP 格式可表示的最早时间），未设置 SOURCE_DATE_EPOCH 时使用
+PACKAGE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# 本身已经过压缩的文件类型，打包时直接存储，不再重复压缩
+PACKAGE_STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.woff', '.woff2', '.zip', '.gz', '.br'}
+# 打包时读取源文件的块大小
+PACKAGE_CHUNK_SIZE = 1024 * 1024
+# 初始包中自动创建的 data/README.md 内容
+INITIAL_DATA_README = '# EasyDocument\n\n这是您的文档目录，请在此处添加Markdown或HTML文档。'
+
+# 已解析的配置文件缓存（文件内容哈希 -> 不可修改的配置对象）
+SITE_CONFIG_CACHE = {}
+# config.js 中配置对象的定义位置
+CONFIG_ASSIGNMENT_PATTERN = re.compile(r'\bconfig\s*=\s*(?=\{)|\bexport\s+default\s+(?=\{)')
+
+
+class FrozenDict(dict):
+    """不可修改的字典，用于解析后的配置；仍然是 dict，可以直接序列化为 JSON"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("配置对象不可修改，请使用 thaw_config 获取可修改的副本")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze_config(value):
+    """递归地将配置转换为不可修改的结构（dict -> FrozenDict，list -> tuple）"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze_config(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+
+def thaw_config(value):
+    """递归地复制配置为可修改的结构（FrozenDict -> dict，tuple -> list）"""
+    if isinstance(value, dict):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw_config(item) for item in value]
+    return value
+
+
+class JSLiteralParser:
+    """
+    JavaScript 对象字面量解析器，支持 config.js 中用到的语法：
+    单行/多行注释、单引号/双引号/无插值的反引号字符串、数字、true/false/null/undefined、
+    数组、标识符或字符串作为键的对象以及末尾多余的逗号
+    """
+
+    IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_$][\w$]*')
+    NUMBER_PATTERN = re.compile(r'[+-]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+    INTEGER_PATTERN = re.compile(r'\d+')
+    LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+    ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        line = self.text.count("\n", 0, self.pos) + 1
+        column = self.pos - self.text.rfind("\n", 0, self.pos)
+        return ValueError(f"{message}（第 {line} 行第 {column} 列）")
+
+    def skip_space(self):
+        """跳过空白和注释"""
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos].isspace():
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = len(text) if end < 0 else end
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                if end < 0:
+                    raise self.error("注释未闭合")
+                self.pos = end + 2
+            else:
+                break
+
+    def peek(self):
+        self.skip_space()
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error(f"应为 '{char}'")
+        self.pos += 1
+
+    def parse_value(self):
+        char = self.peek()
+        if char == "{":
+            return self.parse_object()
+        if char == "[":
+            return self.parse_array()
+        if char in "'\"`":
+            return self.parse_string()
+        match = self.NUMBER_PATTERN.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            literal = match.group()
+            if literal.lstrip("+-")[:2] in ("0x", "0X"):
+                return int(literal, 16)
+            number = float(literal)
+            return int(number) if number.is_integer() else number
+        match = self.IDENTIFIER_PATTERN.match(self.text, self.pos)
+        if match and match.group() in self.LITERALS:
+            self.pos = match.end()
+            return self.LITERALS[match.group()]
+        raise self.error("无法解析的值")
+
+    def parse_string(self):
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        parts = []
+        while True:
+            if self.pos >= len(text) or (text[self.pos] == "\n" and quote != "`"):
+                raise self.error("字符串未闭合")
+            char = text[self.pos]
+            if char == quote:
+                self.pos += 1
+                return "".join(parts)
+            if quote == "`" and text.startswith("${", self.pos):
+                raise self.error("不支持模板字符串插值")
+            if char == "\\":
+                self.pos += 1
+                escaped = text[self.pos:self.pos + 1]
+                if escaped in ("u", "x"):
+                    if text.startswith("{", self.pos + 1):
+                        end = text.find("}", self.pos)
+                        code, self.pos = text[self.pos + 2:end], end + 1
+                    else:
+                        size = 4 if escaped == "u" else 2
+                        code, self.pos = text[self.pos + 1:self.pos + 1 + size], self.pos + 1 + size
+                    try:
+                        parts.append(chr(int(code, 16)))
+                    except ValueError:
+                        raise self.error("无效的转义序列")
+                    continue
+                if escaped == "\r" and text.startswith("\n", self.pos + 1):
+                    self.pos += 1
+                if escaped not in ("\n", "\r"):
+                    # 行尾的反斜杠表示续行，其余转义取对应字符
+                    parts.append(self.ESCAPES.get(escaped, escaped))
+                self.pos += 1
+                continue
+            parts.append(char)
+            self.pos += 1
+
+    def parse_key(self):
+        char = self.peek()
+        if char in "'\"":
+            return self.parse_string()
+        match = self.IDENTIFIER_PATTERN.match(self.text, self.pos) or self.INTEGER_PATTERN.match(self.text, self.pos)
+        if not match:
+            raise self.error("无法解析的键名")
+        self.pos = match.end()
+        return match.group()
+
+    def parse_object(self):
+        self.expect("{")
+        result = {}
+        while self.peek() != "}":
+            key = self.parse_key()
+            self.expect(":")
+            result[key] = self.parse_value()
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("}")
+        return result
+
+    def parse_array(self):
+        self.expect("[")
+        result = []
+        while self.peek() != "]":
+            result.append(self.parse_value())
+            if self.peek() != ",":
+                break
+            self.pos += 1
+        self.expect("]")
+        return result
+
+
+def parse_site_config(content):
+    """
+    解析 config.js 内容，返回 config 对象（const config = {...} 或 export default {...}）
+    
+    Raises:
+        ValueError: 找不到配置对象或语法不受支持
+    """
+    # 先跳过注释和字符串再查找赋值语句，避免匹配到注释中的示例代码
+    parser = JSLiteralParser(content)
+    while True:
+        parser.skip_space()
+        if parser.pos >= len(content):
+            raise ValueError("未找到配置对象（const config = {...} 或 export default {...}）")
+        match = CONFIG_ASSIGNMENT_PATTERN.match(content, parser.pos)
+        if match:
+            parser.pos = match.end()
+            value = parser.parse_value()
+            if not isinstance(value, dict):
+                raise ValueError("配置对象不是对象字面量")
+            return value
+        if content[parser.pos] in "'\"`":
+            parser.parse_string()
+        else:
+            word = parser.IDENTIFIER_PATTERN.match(content, parser.pos)
+            parser.pos = word.end() if word else parser.pos + 1
+
+
+def load_site_config(config_path):
+    """
+    读取并解析 config.js，按文件内容哈希缓存解析结果
+    
+    Returns:
+        FrozenDict: 不可修改的完整配置对象；文件不存在时返回空对象
+    
+    Raises:
+        ValueError: 配置文件语法不受支持
+    """
+    try:
+        with open(config_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return FrozenDict()
+    key = hashlib.sha1(data).hexdigest()
+    if key not in SITE_CONFIG_CACHE:
+        SITE_CONFIG_CACHE[key] = freeze_config(parse_site_config(data.decode('utf-8-sig')))
+    return SITE_CONFIG_CACHE[key]
+
+
+def resolve_build_config(site_config):
+    """
+    将 config.js 的配置合并到默认构建配置，返回可修改的新副本（不会改动 DEFAULT_CONFIG）
+    
+    document 中的文档目录、分支、默认页、索引页和扩展名设置映射到顶层字段；
+    extensions.git / extensions.github（兼容顶层 git / github）、search、site、appearance
+    与默认值逐项合并
+    """
+    config = thaw_config(DEFAULT_CONFIG)
+    document = site_config.get("document", {})
+    for key in ("root_dir", "branch_support", "default_page", "index_pages", "supported_extensions"):
+        if key in document:
+            config[key] = thaw_config(document[key])
+
+    extensions = site_config.get("extensions", {})
+    sections = {
+        "git": extensions.get("git", site_config.get("git")),
+        "github": extensions.get("github", site_config.get("github")),
+        "search": site_config.get("search"),
+        "site": site_config.get("site"),
+        "appearance": site_config.get("appearance"),
+    }
+    for name, section in sections.items():
+        if isinstance(section, dict):
+            config[name].update(thaw_config(section))
+    return config
+
 
 
 # HTML解析器，用于从HTML文件中提取文本内容
@@ -90,6 +423,269 @@ class HTMLTextExtractor(HTMLParser):
     def get_text(self):
         return " ".join(self.result)
 
+# Markdown 块级结构匹配规则
+MD_FENCE_PATTERN = re.compile(r' {0,3}(`{3,}|~{3,})')
+MD_ATX_HEADING_PATTERN = re.compile(r' {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+MD_SETEXT_UNDERLINE_PATTERN = re.compile(r' {0,3}(=+|-+)[ \t]*$')
+MD_THEMATIC_BREAK_PATTERN = re.compile(r' {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$')
+MD_TABLE_DELIMITER_PATTERN = re.compile(r'\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+MD_LINK_DEFINITION_PATTERN = re.compile(r' {0,3}\[[^\]]+\]:\s*\S')
+MD_CONTAINER_PATTERN = re.compile(r'\s*(?:>\s?)*(?:(?:[-*+]|\d{1,9}[.)])\s+(?:\[[ xX]\]\s+)?)?')
+MD_HTML_BLOCK_PATTERN = re.compile(r' {0,3}<(!--|/?[A-Za-z][A-Za-z0-9-]*)(?=[\s/>]|$)')
+# 到对应结束标记才结束的 HTML 块，其余 HTML 块到空行结束
+MD_HTML_BLOCK_ENDS = {"!--": "-->", "script": "</script>", "style": "</style>", "pre": "</pre>", "textarea": "</textarea>"}
+
+def markdown_inline_text(text):
+    """将一行 Markdown 行内标记转换为渲染后的纯文本（图片保留替代文本，链接保留链接文本）"""
+    text = re.sub(r'!\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    text = re.sub(r'\[([^\]]*)\]\([^)]*\)', r'\1', text)
+    # 自动链接保留地址，其余 HTML 标签移除
+    text = re.sub(r'<((?:https?|ftp|mailto):[^>\s]+)>', r'\1', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'(\*\*|__|~~|`)', '', text)
+    text = re.sub(r'(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])', r'\2', text)
+    return html.unescape(text).strip()
+
+def heading_slug(text, index, used_slugs):
+    """
+    生成标题锚点，与前端目录（sidebar-navigation.js 的 generateToc）为标题生成的 id 一致：
+    小写、空白替换为连字符、只保留字母数字/中文/连字符/下划线，为空时使用 heading-序号，重复时追加 -计数
+    """
+    base = re.sub(r'\s+', '-', text.strip().lower())
+    base = re.sub(r'[^a-z0-9\u4e00-\u9fff\-_]', '', base).strip('-')
+    if not base:
+        base = f"heading-{index}"
+    slug = base
+    counter = 1
+    while slug in used_slugs:
+        slug = f"{base}-{counter}"
+        counter += 1
+    used_slugs.add(slug)
+    return slug
+
+# Markdown解析器，逐行提取标题、各级标题和正文纯文本
+class MarkdownTextExtractor:
+    """
+    单遍逐行解析 Markdown：跳过前置元数据（--- 或 +++ 包围）和围栏代码块，
+    表格只保留单元格文本，HTML 块只保留其中的文本，并按标题将正文划分为章节
+    """
+
+    def __init__(self):
+        # 第一个一级或二级标题的原始文本
+        self.title = None
+        # [锚点, 标题, 正文片段列表]，第一项为首个标题之前的内容
+        self.sections = [["", "", []]]
+        # 各标题的级别，与 sections[1:] 一一对应
+        self.levels = []
+        self.used_slugs = set()
+        self.line_count = 0
+        # 前置元数据：(结束标记, 已读取的行)，未闭合时在 close 中按正文重新处理
+        self.front_matter = None
+        self.fence = None
+        # 当前 HTML 块的结束标记（None 表示到空行结束）及其文本解析器
+        self.html_end = None
+        self.html_parser = None
+        # 尚未确定是否为 Setext 标题或表头的段落行
+        self.pending = None
+        self.in_table = False
+
+    def feed(self, line):
+        """处理一行 Markdown"""
+        self.line_count += 1
+        line = line.rstrip('\r\n')
+        stripped = line.strip()
+
+        if self.line_count == 1 and stripped in ("---", "+++"):
+            self.front_matter = (stripped, [line])
+            return
+        if self.front_matter:
+            if stripped == self.front_matter[0]:
+                self.front_matter = None
+            else:
+                self.front_matter[1].append(line)
+            return
+
+        if self.fence:
+            if stripped.startswith(self.fence) and not stripped.strip(self.fence[0]):
+                self.fence = None
+            return
+
+        if self.html_parser:
+            self.feed_html(line)
+            return
+
+        if not stripped:
+            self.flush_pending()
+            self.in_table = False
+            return
+
+        match = MD_FENCE_PATTERN.match(line)
+        if match:
+            self.flush_pending()
+            self.fence = match.group(1)
+            return
+
+        if self.pending is not None:
+            match = MD_SETEXT_UNDERLINE_PATTERN.match(line)
+            if match:
+                text, self.pending = self.pending, None
+                self.add_heading(1 if match.group(1)[0] == "=" else 2, text)
+                return
+            if '|' in stripped and '|' in self.pending and MD_TABLE_DELIMITER_PATTERN.match(stripped):
+                text, self.pending = self.pending, None
+                self.add_table_row(text)
+                self.in_table = True
+                return
+
+        match = MD_ATX_HEADING_PATTERN.match(line)
+        if match:
+            self.flush_pending()
+            self.add_heading(len(match.group(1)), match.group(2) or "")
+            return
+
+        if MD_THEMATIC_BREAK_PATTERN.match(line):
+            self.flush_pending()
+            return
+
+        if self.in_table and '|' in stripped:
+            self.add_table_row(stripped)
+            return
+        self.in_table = False
+
+        match = MD_HTML_BLOCK_PATTERN.match(line)
+        if match:
+            self.flush_pending()
+            self.html_end = MD_HTML_BLOCK_ENDS.get(match.group(1).lower())
+            self.html_parser = HTMLTextExtractor()
+            self.feed_html(line)
+            return
+
+        if self.pending is None and MD_LINK_DEFINITION_PATTERN.match(line):
+            return
+
+        container = MD_CONTAINER_PATTERN.match(line).group(0)
+        if container.strip():
+            # 引用和列表项不会成为 Setext 标题或表头
+            self.flush_pending()
+            self.add_text(markdown_inline_text(line[len(container):]))
+            return
+
+        self.flush_pending()
+        self.pending = stripped
+
+    def feed_html(self, line):
+        """向当前 HTML 块输入一行，遇到结束条件时输出其中的文本"""
+        if self.html_end is None and not line.strip():
+            self.close_html()
+            return
+        self.html_parser.feed(line + "\n")
+        if self.html_end and self.html_end in line.lower():
+            self.close_html()
+
+    def close_html(self):
+        self.html_parser.close()
+        self.add_text(self.html_parser.get_text())
+        self.html_parser = None
+        self.html_end = None
+
+    def flush_pending(self):
+        if self.pending is not None:
+            self.add_text(markdown_inline_text(self.pending))
+            self.pending = None
+
+    def add_text(self, text):
+        if text:
+            self.sections[-1][2].append(text)
+
+    def add_table_row(self, row):
+        cells = re.split(r'(?<!\\)\|', row.strip().strip('|'))
+        self.add_text(" ".join(filter(None, (markdown_inline_text(cell) for cell in cells))))
+
+    def add_heading(self, level, text):
+        text = text.strip()
+        if self.title is None and level <= 2 and text:
+            self.title = text
+        title = markdown_inline_text(text)
+        self.sections.append([heading_slug(title, len(self.sections) - 1, self.used_slugs), title, []])
+        self.levels.append(level)
+
+    def close(self):
+        """结束输入：输出未处理的段落行，未闭合的前置元数据按正文重新处理"""
+        if self.front_matter:
+            lines = self.front_matter[1]
+            self.front_matter = None
+            for line in lines:
+                self.feed(line)
+        if self.html_parser:
+            self.close_html()
+        self.flush_pending()
+
+    def get_sections(self):
+        """返回 [[锚点, 标题, 正文], ...]"""
+        return [[slug, title, " ".join(" ".join(parts).split())] for slug, title, parts in self.sections]
+
+    def get_toc(self):
+        """返回标题大纲 [[级别, 标题, 锚点], ...]"""
+        return [[level, title, slug] for level, (slug, title, _) in zip(self.levels, self.sections[1:])]
+
+
+def get_html_title(content):
+    """从 HTML 内容中提取 <title> 或第一个 <h1> 的文本"""
+    for start_tag, end_tag in (('<title>', '</title>'), ('<h1>', '</h1>')):
+        start_pos = content.find(start_tag)
+        if start_pos > -1:
+            end_pos = content.find(end_tag, start_pos)
+            if end_pos > -1:
+                return content[start_pos + len(start_tag):end_pos].strip()
+    return None
+
+def read_document(file_path):
+    """
+    读取一次文档，同时提取标题、各级标题、标题大纲和按章节划分的正文，返回
+    {"title": 标题或 None, "headings": [各级标题], "toc": [[级别, 标题, 锚点], ...], "sections": [[锚点, 标题, 正文], ...]}。
+    HTML 文档在 iframe 中显示，目录由页面加载后生成，toc 为空
+    """
+    document = {"title": None, "headings": [], "toc": [], "sections": [["", "", ""]]}
+    try:
+        ext = os.path.splitext(file_path)[1].lower()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if ext == ".md":
+                extractor = MarkdownTextExtractor()
+                for line in f:
+                    extractor.feed(line)
+                extractor.close()
+                sections = extractor.get_sections()
+                document = {
+                    "title": extractor.title,
+                    "headings": [title for _, title, _ in sections[1:] if title],
+                    "toc": extractor.get_toc(),
+                    "sections": sections,
+                }
+            elif ext == ".html":
+                content = f.read()
+                parser = HTMLTextExtractor()
+                parser.feed(content)
+                headings = []
+                for match in re.finditer(r'<h[1-6][^>]*>(.*?)</h[1-6]>', content, re.IGNORECASE | re.DOTALL):
+                    text = ' '.join(re.sub(r'<[^>]+>', '', match.group(1)).split())
+                    if text:
+                        headings.append(text)
+                # HTML 文档在 iframe 中显示，无法跳转到内部锚点，全文作为一个章节
+                document = {
+                    "title": get_html_title(content),
+                    "headings": headings,
+                    "toc": [],
+                    "sections": [["", "", parser.get_text()]],
+                }
+    except Exception as e:
+        print(f"读取文件 {file_path} 失败: {e}")
+    return document
+
+def get_document(file_path):
+    """读取解析后的文档，优先使用构建缓存，同一文件在一次构建中只读取一次"""
+    return cache_fetch(file_path, "document", lambda: read_document(file_path))
+
+
 def is_supported_file(filename, config):
     """检查文件是否为支持的文档文件"""
     ext = os.path.splitext(filename)[1].lower()
@@ -100,89 +696,546 @@ def is_index_file(filename, config):
     return filename in config["index_pages"]
 
 
-def get_github_username_by_email(email, repo):
+def parse_noreply_username(email):
+    """从 GitHub noreply 邮箱中解析用户名，不是 noreply 邮箱时返回 None"""
+    match = (
+        re.match(r"(\d+)\+(.+)@users\.noreply\.github\.com", email)
+        or re.match(r"(.+)@users\.noreply\.github\.com", email)
+    )
+    if not match:
+        return None
+    username = match.group(match.lastindex)
+    if "+" in username:
+        username = username.split("+")[-1]
+    return username
+
+
+class GitAuthorIndex:
+    """
+    提交作者索引：一次遍历完整提交历史，记录 邮箱 -> 作者名 与 作者名 -> GitHub 用户名，
+    并合并 .mailmap 格式的覆盖文件，使邮箱到用户名的查询为 O(1)。
+    """
+
+    # Proper Name <proper@email> [Commit Name] [<commit@email>]
+    MAILMAP_LINE = re.compile(r"^\s*([^<]*?)\s*<([^>]*)>(?:\s*([^<]*?)\s*<([^>]*)>)?")
+
+    def __init__(self, repo, override_path=None):
+        self.repo = repo
+        self.override_path = override_path
+        # 邮箱 -> 最近一次使用该邮箱提交的作者名
+        self.email_to_name = {}
+        # 作者名 -> 该作者最近一次使用 noreply 邮箱提交时对应的 GitHub 用户名
+        self.name_to_username = {}
+        # 覆盖文件中的 邮箱（小写） -> GitHub 用户名
+        self.overrides = {}
+
+    def build(self):
+        """遍历提交历史并读取覆盖文件"""
+        if self.override_path and os.path.exists(self.override_path):
+            self.load_overrides(self.override_path)
+
+        output = self.repo.git.log(
+            "HEAD",
+            "--no-color",
+            "--encoding=UTF-8",
+            "--format=%an%x1f%ae",
+            stdout_as_string=False,
+        )
+        for line in output.decode("utf-8", errors="replace").split("\n"):
+            name, sep, email = line.partition("\x1f")
+            if not sep:
+                continue
+            self.email_to_name.setdefault(email, name)
+            if name not in self.name_to_username:
+                username = parse_noreply_username(email)
+                if username:
+                    self.name_to_username[name] = username
+        return self
+
+    def load_overrides(self, path):
+        """
+        读取 .mailmap 格式的覆盖文件，名字部分为 GitHub 用户名：
+            octocat <octocat@example.com>
+            octocat <octocat@example.com> Commit Name <commit@example.com>
+            <123+octocat@users.noreply.github.com> <commit@example.com>
+        名字省略时从第一个 noreply 邮箱中解析用户名。
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.split("#", 1)[0]
+                    match = self.MAILMAP_LINE.match(line)
+                    if not match:
+                        continue
+                    proper_name, proper_email, _, commit_email = match.groups()
+                    username = proper_name or parse_noreply_username(proper_email)
+                    if username:
+                        self.overrides[(commit_email or proper_email).lower()] = username
+        except Exception as e:
+            print(f"读取作者映射文件 {path} 失败: {e}")
+
+    def lookup(self, email):
+        """根据提交邮箱查找 GitHub 用户名"""
+        username = self.overrides.get(email.lower())
+        if username:
+            return username
+        username = parse_noreply_username(email)
+        if username:
+            return username
+        name = self.email_to_name.get(email)
+        if name is None:
+            return None
+        return self.name_to_username.get(name)
+
+
+def get_git_author_index(repo, config=None):
+    """获取（必要时构建）仓库的提交作者索引"""
+    override_path = (config or DEFAULT_CONFIG).get("github", {}).get("author_map")
+    key = (repo.working_dir, override_path)
+    with GIT_REPO_LOCK:
+        if key not in GIT_AUTHOR_INDEXES:
+            index = GitAuthorIndex(repo, override_path)
+            try:
+                index.build()
+            except Exception as e:
+                print(f"查找 GitHub 用户名失败: {e}")
+            GIT_AUTHOR_INDEXES[key] = index
+        return GIT_AUTHOR_INDEXES[key]
+
+
+def get_github_username_by_email(email, repo, config=None):
     """根据邮箱从本地提交历史推断 GitHub 用户名。"""
     if email in EMAIL_TO_USERNAME_MAP:
         return EMAIL_TO_USERNAME_MAP[email]
 
-    noreply_match = re.match(r"(\d+)\+(.+)@users\.noreply\.github\.com", email)
-    if noreply_match:
-        username = noreply_match.group(2)
-        if "+" in username:
-            username = username.split("+")[-1]
-        EMAIL_TO_USERNAME_MAP[email] = username
-        return username
-
-    noreply_match2 = re.match(r"(.+)@users\.noreply\.github\.com", email)
-    if noreply_match2:
-        username = noreply_match2.group(1)
-        if "+" in username:
-            username = username.split("+")[-1]
-        EMAIL_TO_USERNAME_MAP[email] = username
-        return username
+    with profile_phase("username", email=email):
+        username = get_git_author_index(repo, config).lookup(email)
+    EMAIL_TO_USERNAME_MAP[email] = username
+    return username
 
-    try:
-        all_commits = list(repo.iter_commits(max_count=500))
-        for commit in all_commits:
-            if commit.author.email == email:
-                for other_commit in all_commits:
-                    if (
-                        other_commit.author.name == commit.author.name
-                        and "@users.noreply.github.com" in other_commit.author.email
-                    ):
-                        om = re.match(
-                            r"(\d+)\+(.+)@users\.noreply\.github\.com",
-                            other_commit.author.email,
-                        )
-                        if om:
-                            username = om.group(2)
-                            if "+" in username:
-                                username = username.split("+")[-1]
-                            EMAIL_TO_USERNAME_MAP[email] = username
-                            return username
-
-                        om2 = re.match(
-                            r"(.+)@users\.noreply\.github\.com",
-                            other_commit.author.email,
-                        )
-                        if om2:
-                            username = om2.group(1)
-                            if "+" in username:
-                                username = username.split("+")[-1]
-                            EMAIL_TO_USERNAME_MAP[email] = username
-                            return username
-    except Exception as e:
-        print(f"查找 GitHub 用户名失败: {e}")
 
-    EMAIL_TO_USERNAME_MAP[email] = None
-    return None
+class GitHubUserResolver:
+    """
+    批量并发解析 GitHub 用户信息（头像）。
+    每个工作线程复用一条 HTTP 连接，遵守速率限制响应头，
+    结果带时间戳写入持久化 JSON 缓存，过期（TTL）后重新请求。
+    """
+
+    # 被限流时最多等待的秒数，超过则放弃本次构建中剩余的请求
+    MAX_RETRY_WAIT = 10
+
+    def __init__(self, api_base_url="https://api.github.com", cache_path=None,
+                 ttl=7 * 24 * 3600, max_workers=4, timeout=5):
+        parts = urllib.parse.urlsplit(api_base_url.rstrip("/"))
+        self.scheme = parts.scheme or "https"
+        self.netloc = parts.netloc
+        self.base_path = parts.path
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.users = GITHUB_USERS_CACHE
+        # 本次运行中已请求过的用户，不受 TTL 影响
+        self.fetched = set()
+        self.blocked_until = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.connections = []
+
+    def load(self):
+        """读取持久化的用户缓存"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return self
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for username, info in data.get("users", {}).items():
+                self.users.setdefault(username, info)
+        except Exception as e:
+            print(f"读取 GitHub 用户缓存失败: {e}")
+        return self
+
+    def save(self):
+        """写回持久化的用户缓存"""
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"users": self.users}, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            print(f"写入 GitHub 用户缓存失败: {e}")
+
+    def resolve(self, usernames):
+        """解析一组用户名，返回 {用户名: 头像 URL}；缓存未命中的用户并发请求"""
+        now = time.time()
+        avatars = {}
+        missing = []
+        for username in dict.fromkeys(u for u in usernames if u):
+            cached = self.users.get(username)
+            if cached and (username in self.fetched or now - cached.get("fetched_at", now) < self.ttl):
+                avatars[username] = cached.get("avatar_url")
+            else:
+                missing.append(username)
+
+        if not missing:
+            return avatars
+
+        print(f"请求 GitHub 用户信息: {len(missing)} 个用户")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+            fetched = list(pool.map(self._fetch, missing))
+        self._close_connections()
+
+        for username, info in zip(missing, fetched):
+            self.fetched.add(username)
+            if info is not None:
+                self.users[username] = info
+            # 请求失败时退回到已过期的缓存
+            if username in self.users:
+                avatars[username] = self.users[username].get("avatar_url")
+        return avatars
+
+    def _connection(self):
+        """取得当前线程复用的连接"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(self.netloc, timeout=self.timeout)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def _close_connections(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+    def _rate_limited(self):
+        with self.lock:
+            return time.time() < self.blocked_until
+
+    def _block_until(self, reset_at, reason):
+        with self.lock:
+            if reset_at > self.blocked_until:
+                if time.time() >= self.blocked_until:
+                    print(f"GitHub API {reason}，跳过剩余的头像请求")
+                self.blocked_until = reset_at
+
+    def _fetch(self, username):
+        """请求单个用户信息；返回缓存条目，请求失败返回 None"""
+        headers = {
+            "User-Agent": "EasyDocument-Build-Script",
+            "Accept": "application/vnd.github+json",
+        }
+        token = os.environ.get("GITHUB_TOKEN")
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        path = f"{self.base_path}/users/{urllib.parse.quote(username)}"
+
+        with profile_phase("github_api", username=username):
+            return self._request(username, path, headers)
+
+    def _request(self, username, path, headers):
+        """发送用户信息请求，连接失败或被短暂限流时重试一次"""
+        for attempt in range(2):
+            if self._rate_limited():
+                return None
+            try:
+                conn = self._connection()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                # 复用的连接可能已被服务端关闭，重建连接后重试一次
+                self._reset_connection()
+                if attempt == 0:
+                    continue
+                print(f"获取 GitHub 用户 {username} 头像失败: {e}")
+                return None
+
+            remaining = response.getheader("X-RateLimit-Remaining")
+            reset_at = response.getheader("X-RateLimit-Reset")
+            if remaining == "0" and reset_at and reset_at.isdigit():
+                self._block_until(int(reset_at), "速率限制已用尽")
+
+            if response.status == 200:
+                try:
+                    data = json.loads(body.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    print(f"获取 GitHub 用户 {username} 头像失败: {e}")
+                    return None
+                return {
+                    "avatar_url": data.get("avatar_url"),
+                    "login": data.get("login"),
+                    "html_url": data.get("html_url"),
+                    "fetched_at": int(time.time()),
+                }
+            if response.status == 404:
+                # 用户不存在同样缓存，避免每次构建重复请求
+                return {"avatar_url": None, "login": None, "html_url": None, "fetched_at": int(time.time())}
+            if response.status in (403, 429):
+                retry_after = response.getheader("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    wait = int(retry_after)
+                    if attempt == 0 and wait <= self.MAX_RETRY_WAIT:
+                        time.sleep(wait)
+                        continue
+                    self._block_until(time.time() + wait, "请求被限流")
+                elif remaining != "0":
+                    # 次级速率限制可能不带 Retry-After，此时暂停一分钟
+                    self._block_until(time.time() + 60, "请求被限流")
+            print(f"获取 GitHub 用户 {username} 头像失败: HTTP {response.status}")
+            return None
+
+        return None
+
+
+def get_github_user_resolver():
+    """取得全局 GitHub 用户解析器，未配置时使用不持久化的默认解析器"""
+    global GITHUB_USER_RESOLVER
+    if GITHUB_USER_RESOLVER is None:
+        GITHUB_USER_RESOLVER = GitHubUserResolver()
+    return GITHUB_USER_RESOLVER
 
 
 def get_github_avatar_url(username):
     """通过 GitHub API 获取用户头像 URL。"""
     if not username:
         return None
+    return get_github_user_resolver().resolve([username]).get(username)
 
-    if username in GITHUB_USERS_CACHE:
-        return GITHUB_USERS_CACHE[username].get("avatar_url")
 
-    try:
-        request = urllib.request.Request(f"https://api.github.com/users/{username}")
-        request.add_header("User-Agent", "EasyDocument-Build-Script")
+def collect_git_blocks(structure, result=None):
+    """收集结构中所有节点的 git 字段"""
+    if result is None:
+        result = []
+    if isinstance(structure, list):
+        for item in structure:
+            collect_git_blocks(item, result)
+    elif isinstance(structure, dict):
+        if structure.get("git"):
+            result.append(structure["git"])
+        if structure.get("index"):
+            collect_git_blocks(structure["index"], result)
+        for child in structure.get("children") or []:
+            collect_git_blocks(child, result)
+    return result
 
-        with urllib.request.urlopen(request, timeout=5) as response:
-            if response.getcode() == 200:
-                data = json.loads(response.read().decode("utf-8"))
-                GITHUB_USERS_CACHE[username] = {
-                    "avatar_url": data.get("avatar_url"),
-                    "login": data.get("login"),
-                    "html_url": data.get("html_url"),
+
+def fill_github_avatars(structure, *more_structures):
+    """扫描完成后统一解析结构（可同时传入多个分支的结构）中出现的 GitHub 用户，并回填头像 URL"""
+    people = []
+    for git_info in collect_git_blocks([structure, *more_structures]):
+        if git_info.get("last_modified"):
+            people.append(git_info["last_modified"])
+        people.extend(git_info.get("contributors") or [])
+
+    avatars = get_github_user_resolver().resolve(p.get("github_username") for p in people)
+    for person in people:
+        avatar = avatars.get(person.get("github_username"))
+        if avatar:
+            person["github_avatar"] = avatar
+    return structure
+
+
+class GitHistoryIndex:
+    """
+    Git 历史索引：一次遍历 git log --name-status，按文件路径汇总
+    最后一次提交和各作者的提交统计，代替逐文件调用 iter_commits。
+
+    git log -- 文件 会做历史简化：合并提交与某个父提交的该文件相同时只沿这个父提交继续，
+    另一侧分支上的提交（如以 ours 策略合并时被丢弃的修改、先 cherry-pick 再合并的原提交）
+    不计入该文件的历史。整库遍历无法按文件做这种简化，因此只对历史简化不影响结果的文件使用索引：
+    没有被 HEAD 第一父提交链之外的提交修改过、且链上的合并提交与其第一父提交相比未修改过的文件。
+    其余文件（见 covers）由调用方逐文件读取。
+    """
+
+    RECORD_SEP = "\x1e"
+    FIELD_SEP = "\x1f"
+
+    def __init__(self, repo, follow_renames=False):
+        self.repo = repo
+        self.follow_renames = follow_renames
+        # 路径 -> {"last": 最后一次提交, "authors": {作者名: [邮箱, 提交数, 最新提交时间]}}
+        self.files = {}
+        # 重命名前的旧路径 -> 当前路径（仅 follow_renames 时使用）
+        self.aliases = {}
+        # 历史简化可能影响结果、需逐文件读取的路径
+        self.inexact = set()
+
+    def build(self):
+        """执行 git log 并建立索引"""
+        first_parents = set(self.repo.git.rev_list("HEAD", "--first-parent").split())
+        merge_changes = self._first_parent_merge_changes()
+
+        output = self.repo.git.log(
+            "HEAD",
+            "-z",
+            "-M",
+            "-c",
+            "--name-status",
+            "--no-color",
+            "--encoding=UTF-8",
+            f"--format={self.RECORD_SEP}%H{self.FIELD_SEP}%ct{self.FIELD_SEP}%an"
+            f"{self.FIELD_SEP}%ae{self.FIELD_SEP}%B{self.FIELD_SEP}",
+            stdout_as_string=False,
+        )
+        text = output.decode("utf-8", errors="replace")
+
+        for record in text.split(self.RECORD_SEP)[1:]:
+            fields = record.split(self.FIELD_SEP, 5)
+            if len(fields) < 6:
+                continue
+            sha, timestamp, author_name, author_email, message, changes = fields
+            commit = {
+                "timestamp": int(timestamp),
+                "author": author_name,
+                "email": author_email,
+                "message": message.strip(),
+            }
+            # 链上的合并提交相对第一父提交修改的文件，历史可能来自另一侧分支
+            if sha in merge_changes:
+                self.inexact.update(self._touched_paths(merge_changes[sha], update_aliases=False))
+            touched = self._touched_paths(changes.lstrip("\0\n").split("\0"))
+            if sha not in first_parents:
+                self.inexact.update(touched)
+            self._add_commit(commit, touched)
+
+        return self
+
+    def _first_parent_merge_changes(self):
+        """返回 {合并提交: name-status 片段}，列出第一父提交链上的合并提交相对第一父提交修改的文件"""
+        output = self.repo.git.log(
+            "HEAD",
+            "--first-parent",
+            "--merges",
+            "-m",
+            "-z",
+            "-M",
+            "--name-status",
+            "--no-color",
+            f"--format={self.RECORD_SEP}%H{self.FIELD_SEP}",
+            stdout_as_string=False,
+        )
+        text = output.decode("utf-8", errors="replace")
+
+        changes = {}
+        for record in text.split(self.RECORD_SEP)[1:]:
+            sha, _, tokens = record.partition(self.FIELD_SEP)
+            changes[sha] = tokens.lstrip("\0\n").split("\0")
+        return changes
+
+    def _touched_paths(self, tokens, update_aliases=True):
+        """解析 name-status 片段，返回提交修改的（重命名后的当前）路径"""
+        touched = []
+        i = 0
+        while i < len(tokens):
+            status = tokens[i].strip()
+            if not status:
+                i += 1
+                continue
+            if status[0] in "RC" and status[1:].isdigit() and i + 2 < len(tokens):
+                old_path, new_path = tokens[i + 1], tokens[i + 2]
+                i += 3
+                if self.follow_renames:
+                    target = self.aliases.get(new_path, new_path)
+                    touched.append(target)
+                    if status[0] == "R" and update_aliases:
+                        self.aliases[old_path] = target
+                else:
+                    touched.extend([old_path, new_path])
+            else:
+                path = tokens[i + 1] if i + 1 < len(tokens) else ""
+                i += 2
+                if path:
+                    touched.append(self.aliases.get(path, path) if self.follow_renames else path)
+        return touched
+
+    def _add_commit(self, commit, touched):
+        """将一个提交计入它所修改的每个文件"""
+        # 同一提交对同一路径只计一次
+        for path in dict.fromkeys(touched):
+            entry = self.files.get(path)
+            if entry is None:
+                entry = self.files[path] = {"last": commit, "authors": {}}
+            stats = entry["authors"].get(commit["author"])
+            if stats is None:
+                stats = entry["authors"][commit["author"]] = [commit["email"], 0, commit["timestamp"]]
+            stats[1] += 1
+            if commit["timestamp"] > stats[2]:
+                stats[2] = commit["timestamp"]
+
+    def covers(self, file_rel_path):
+        """文件的历史不受合并时历史简化影响、可以直接使用索引结果时返回 True"""
+        return file_rel_path.replace("\\", "/") not in self.inexact
+
+    def lookup(self, file_rel_path):
+        """返回 (最后一次提交, 作者统计列表)，作者按首次出现（最新）顺序排列"""
+        entry = self.files.get(file_rel_path.replace("\\", "/"))
+        if entry is None:
+            return None, []
+        authors = [
+            {"name": name, "email": email, "commits": count, "last_commit_timestamp": latest}
+            for name, (email, count, latest) in entry["authors"].items()
+        ]
+        return entry["last"], authors
+
+
+def get_git_history_index(repo, config):
+    """获取（必要时构建）仓库的 Git 历史索引，失败时返回 None"""
+    follow_renames = config.get("git", {}).get("follow_renames", False)
+    key = (repo.working_dir, follow_renames)
+    with GIT_REPO_LOCK:
+        if key not in GIT_HISTORY_INDEXES:
+            try:
+                GIT_HISTORY_INDEXES[key] = GitHistoryIndex(repo, follow_renames).build()
+            except Exception as e:
+                print(f"构建 Git 历史索引失败，将逐文件读取 Git 信息: {e}")
+                GIT_HISTORY_INDEXES[key] = None
+        return GIT_HISTORY_INDEXES[key]
+
+
+def get_file_history(repo, file_rel_path, config):
+    """逐文件遍历提交历史，返回与 GitHistoryIndex.lookup 相同结构的结果"""
+    last_commit = None
+    authors = {}
+
+    if config.get("git", {}).get("show_last_modified", True):
+        commits = list(repo.iter_commits(paths=file_rel_path, max_count=1))
+        if commits:
+            last_commit = {
+                "timestamp": commits[0].committed_date,
+                "author": commits[0].author.name,
+                "email": commits[0].author.email,
+                "message": commits[0].message.strip(),
+            }
+
+    if config.get("git", {}).get("show_contributors", True):
+        for commit in repo.iter_commits(paths=file_rel_path):
+            author_name = commit.author.name
+            if author_name not in authors:
+                authors[author_name] = {
+                    "name": author_name,
+                    "email": commit.author.email,
+                    "commits": 0,
+                    "last_commit_timestamp": commit.committed_date,
                 }
-                return data.get("avatar_url")
-    except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError, json.JSONDecodeError) as e:
-        print(f"获取 GitHub 用户 {username} 头像失败: {e}")
+            authors[author_name]["commits"] += 1
+            if commit.committed_date > authors[author_name]["last_commit_timestamp"]:
+                authors[author_name]["last_commit_timestamp"] = commit.committed_date
 
-    return None
+    return last_commit, list(authors.values())
 
 
 def get_git_info(repo, file_path, config, allow_github_api=True):
@@ -201,48 +1254,47 @@ def get_git_info(repo, file_path, config, allow_github_api=True):
         else:
             file_rel_path = file_path
 
-        if config.get("git", {}).get("show_last_modified", True):
-            commits = list(repo.iter_commits(paths=file_rel_path, max_count=1))
-            if commits:
-                last_commit = commits[0]
-                github_username = get_github_username_by_email(last_commit.author.email, repo)
-                github_avatar = None
-                if allow_github_api and github_username and config.get("github", {}).get("enable", True):
-                    github_avatar = get_github_avatar_url(github_username)
-                git_info["last_modified"] = {
-                    "timestamp": last_commit.committed_date,
-                    "author": last_commit.author.name,
-                    "email": last_commit.author.email,
-                    "message": last_commit.message.strip(),
-                    "github_username": github_username,
-                    "github_avatar": github_avatar,
-                }
+        history = get_git_history_index(repo, config)
+        index_path = os.path.relpath(os.path.abspath(file_path), repo.working_dir)
+        if history is not None and history.covers(index_path):
+            last_commit, authors = history.lookup(index_path)
+        else:
+            with GIT_REPO_LOCK:
+                last_commit, authors = get_file_history(repo, file_rel_path, config)
+
+        def resolve_github(email):
+            github_username = get_github_username_by_email(email, repo, config)
+            github_avatar = None
+            if allow_github_api and github_username and config.get("github", {}).get("enable", True):
+                github_avatar = get_github_avatar_url(github_username)
+            return github_username, github_avatar
+
+        if config.get("git", {}).get("show_last_modified", True) and last_commit:
+            github_username, github_avatar = resolve_github(last_commit["email"])
+            git_info["last_modified"] = {
+                "timestamp": last_commit["timestamp"],
+                "author": last_commit["author"],
+                "email": last_commit["email"],
+                "message": last_commit["message"],
+                "github_username": github_username,
+                "github_avatar": github_avatar,
+            }
 
         if config.get("git", {}).get("show_contributors", True):
-            authors = {}
-            for commit in repo.iter_commits(paths=file_rel_path):
-                author_name = commit.author.name
-                author_email = commit.author.email
-
-                if author_name not in authors:
-                    github_username = get_github_username_by_email(author_email, repo)
-                    github_avatar = None
-                    if allow_github_api and github_username and config.get("github", {}).get("enable", True):
-                        github_avatar = get_github_avatar_url(github_username)
-                    authors[author_name] = {
-                        "name": author_name,
-                        "email": author_email,
-                        "commits": 0,
-                        "github_username": github_username,
-                        "github_avatar": github_avatar,
-                        "last_commit_timestamp": commit.committed_date,
-                    }
-                authors[author_name]["commits"] += 1
-                if commit.committed_date > authors[author_name]["last_commit_timestamp"]:
-                    authors[author_name]["last_commit_timestamp"] = commit.committed_date
+            contributors = []
+            for author in authors:
+                github_username, github_avatar = resolve_github(author["email"])
+                contributors.append({
+                    "name": author["name"],
+                    "email": author["email"],
+                    "commits": author["commits"],
+                    "github_username": github_username,
+                    "github_avatar": github_avatar,
+                    "last_commit_timestamp": author["last_commit_timestamp"],
+                })
 
             git_info["contributors"] = sorted(
-                authors.values(),
+                contributors,
                 key=lambda x: x["commits"],
                 reverse=True,
             )
@@ -253,8 +1305,367 @@ def get_git_info(repo, file_path, config, allow_github_api=True):
     return git_info
 
 
-def scan_directory(directory, config, relative_path="", repo=None):
-    """扫描目录并生成目录结构"""
+class BuildCache:
+    """
+    持久化构建缓存：按文件路径保存内容哈希和 Git 信息，按内容哈希保存解析后的文档内容。
+    文件的 mtime/大小（或内容哈希）未变时复用内容字段，HEAD 未变时复用 Git 字段；
+    内容相同的文件（如各版本分支目录中未修改的文档）共用同一份内容字段，只提取一次。
+    cache_dir 为 None 时只在本次运行的内存中缓存，保证每份内容只提取一次。
+    """
+
+    FILENAME = "build-cache.json"
+
+    def __init__(self, cache_dir, fingerprint, head=None):
+        self.path = os.path.join(cache_dir, self.FILENAME) if cache_dir else None
+        self.fingerprint = fingerprint
+        self.head = head
+        self.entries = {}
+        # 本次运行中已校验过的条目
+        self.checked = {}
+        # 内容哈希 + 扩展名 -> 内容字段，路径不同但内容相同的文件共用
+        self.blobs = {}
+        # 输出文件（path.json）-> 上次构建时的输入指纹及写出文件的 (mtime, 大小)
+        self.outputs = {}
+        self.checked_outputs = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """读取缓存文件，格式版本或配置指纹不一致时丢弃全部条目"""
+        if not self.path:
+            return self
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != BUILD_CACHE_VERSION or data.get("fingerprint") != self.fingerprint:
+                    print("构建配置或构建脚本已变化，构建缓存失效")
+                else:
+                    self.entries = data.get("entries", {})
+                    self.blobs = data.get("blobs", {})
+                    self.outputs = data.get("outputs", {})
+        except Exception as e:
+            print(f"读取构建缓存失败: {e}")
+        return self
+
+    def save(self):
+        """写回缓存文件，只保留本次运行涉及的文件"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            entries = {}
+            blobs = {}
+            for key, entry in self.checked.items():
+                entries[key] = {field: value for field, value in entry.items() if field != "fields"}
+                blobs[self.blob_key(key, entry)] = entry["fields"]
+            data = {
+                "version": BUILD_CACHE_VERSION,
+                "fingerprint": self.fingerprint,
+                "entries": entries,
+                "blobs": blobs,
+                "outputs": self.checked_outputs,
+            }
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"写入构建缓存失败: {e}")
+
+    def _entry(self, file_path):
+        """取得文件的缓存条目，内容变化时清空内容相关字段"""
+        key = file_path.replace("\\", "/")
+        if key in self.checked:
+            return self.checked[key]
+
+        stat = os.stat(file_path)
+        file_stat = [stat.st_mtime_ns, stat.st_size]
+        entry = self.entries.get(key)
+        if entry is None or entry.get("stat") != file_stat:
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            if entry is None or entry.get("hash") != digest:
+                # Git 信息只与提交历史有关，内容变化时保留，由 HEAD 判断是否有效
+                entry = {"hash": digest, "git": entry.get("git") if entry else None}
+            entry["stat"] = file_stat
+
+        with self.lock:
+            if key not in self.checked:
+                entry["fields"] = self.blobs.setdefault(self.blob_key(key, entry), {})
+                self.checked[key] = entry
+            return self.checked[key]
+
+    @staticmethod
+    def blob_key(key, entry):
+        """内容字段的键：内容哈希加扩展名（同样的内容按 Markdown 和 HTML 解析结果不同）"""
+        return entry["hash"] + os.path.splitext(key)[1].lower()
+
+    def count_duplicates(self):
+        """本次构建中与其他文件内容相同、复用了提取结果的文件数"""
+        blobs = [self.blob_key(key, entry) for key, entry in self.checked.items()]
+        return len(blobs) - len(set(blobs))
+
+    def revalidate(self):
+        """监听模式下文件可能已变化：已校验的条目在下次读取时重新比较 mtime/大小"""
+        with self.lock:
+            self.entries.update(self.checked)
+            self.checked = {}
+
+    def unchanged_outputs(self, key, inputs):
+        """输入指纹与上次构建一致且写出的文件未被修改时返回上次写出的文件列表，否则返回 None"""
+        record = self.outputs.get(key)
+        if not self.path or not record or record.get("inputs") != inputs:
+            return None
+        for path, file_stat in record.get("files", {}).items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            if [stat.st_mtime_ns, stat.st_size] != file_stat:
+                return None
+        with self.lock:
+            self.checked_outputs[key] = record
+        return list(record.get("files", {}))
+
+    def record_outputs(self, key, inputs, paths):
+        """记录本次构建的输入指纹和写出文件的状态"""
+        files = {}
+        for path in paths:
+            stat = os.stat(path)
+            files[path] = [stat.st_mtime_ns, stat.st_size]
+        with self.lock:
+            self.checked_outputs[key] = {"inputs": inputs, "files": files}
+
+    def retain(self, directory):
+        """目录被跳过时保留其中文件的缓存条目，供之后的增量构建使用"""
+        prefix = directory.replace("\\", "/").rstrip("/") + "/"
+        with self.lock:
+            for key, entry in self.entries.items():
+                if key.startswith(prefix) and key not in self.checked:
+                    entry["fields"] = self.blobs.setdefault(self.blob_key(key, entry), {})
+                    self.checked[key] = entry
+
+    def count(self, hit):
+        """统计缓存命中情况"""
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def fetch(self, file_path, field, compute):
+        """读取内容相关字段，未命中时调用 compute 计算并缓存"""
+        try:
+            entry = self._entry(file_path)
+        except OSError:
+            return compute()
+
+        if field in entry["fields"]:
+            self.count(hit=True)
+            return entry["fields"][field]
+
+        self.count(hit=False)
+        value = compute()
+        entry["fields"][field] = value
+        return value
+
+    def fetch_git(self, file_path, compute):
+        """读取 Git 信息，仅当缓存时的 HEAD 与当前一致时命中"""
+        if not self.head:
+            return compute()
+        try:
+            entry = self._entry(file_path)
+        except OSError:
+            return compute()
+
+        cached = entry.get("git")
+        if cached and cached.get("head") == self.head:
+            self.count(hit=True)
+            return cached["info"]
+
+        self.count(hit=False)
+        value = compute()
+        entry["git"] = {"head": self.head, "info": value}
+        return value
+
+
+def get_config_fingerprint(config):
+    """计算影响构建输出的配置指纹（生效配置、构建脚本和作者映射文件）"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    # 构建脚本与作者映射文件的内容同样影响输出
+    for path in (os.path.abspath(__file__), config.get("github", {}).get("author_map")):
+        if not path:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    return digest.hexdigest()
+
+
+def cache_fetch(file_path, field, compute):
+    """从构建缓存读取字段，未启用缓存时直接计算"""
+    if BUILD_CACHE is None:
+        return compute()
+    return BUILD_CACHE.fetch(file_path, field, compute)
+
+
+def cache_fetch_git(file_path, compute):
+    """从构建缓存读取 Git 信息，未启用缓存时直接计算"""
+    if BUILD_CACHE is None:
+        return compute()
+    return BUILD_CACHE.fetch_git(file_path, compute)
+
+
+class BuildProfiler:
+    """
+    构建性能分析器：记录各阶段的次数和累计耗时以及每个文件的累计耗时，
+    可选记录 Chrome 跟踪格式（chrome://tracing、Perfetto 可直接打开）的事件
+    """
+
+    def __init__(self, trace=False):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        # 阶段 -> [次数, 累计秒数]
+        self.phases = {}
+        # 文件路径 -> 累计秒数
+        self.files = {}
+        self.events = [] if trace else None
+        self.threads = {}
+
+    @contextlib.contextmanager
+    def phase(self, name, file=None, **args):
+        """记录一个阶段；提供 file 时耗时同时计入该文件"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, begin, time.perf_counter(), file, args)
+
+    def record(self, name, begin, end, file=None, args=None):
+        elapsed = end - begin
+        with self.lock:
+            stats = self.phases.setdefault(name, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            if file:
+                self.files[file] = self.files.get(file, 0.0) + elapsed
+            if self.events is not None:
+                thread = threading.current_thread()
+                self.threads[thread.ident] = thread.name
+                event_args = dict(args or {})
+                if file:
+                    event_args["file"] = file
+                self.events.append({
+                    "name": PROFILE_PHASES.get(name, name),
+                    "cat": name,
+                    "ph": "X",
+                    "ts": round((begin - self.started) * 1e6, 1),
+                    "dur": round(elapsed * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                    "args": event_args,
+                })
+
+    def report(self, top=10):
+        """打印各阶段耗时和最慢的文件"""
+        total = time.perf_counter() - self.started
+        print(f"性能分析 (总耗时 {total * 1000:.0f} ms):")
+        print(f"  {pad_text('阶段', 16)}{'次数':>6}{'累计 (ms)':>11}{'平均 (ms)':>11}")
+        names = [name for name in PROFILE_PHASES if name in self.phases]
+        names += sorted(name for name in self.phases if name not in PROFILE_PHASES)
+        for name in names:
+            count, elapsed = self.phases[name]
+            print(f"  {pad_text(PROFILE_PHASES.get(name, name), 16)}{count:>8} "
+                  f"{elapsed * 1000:>12.1f} {elapsed * 1000 / count:>12.2f}")
+        print("  (多线程或嵌套阶段的累计耗时可能超过总耗时)")
+        slowest = sorted(self.files.items(), key=lambda item: item[1], reverse=True)[:top]
+        if slowest:
+            print(f"最慢的 {len(slowest)} 个文件:")
+            for file, elapsed in slowest:
+                print(f"  {elapsed * 1000:>9.1f} ms  {file.replace(os.sep, '/')}")
+
+    def write_trace(self, path):
+        """写出 Chrome 跟踪格式的 JSON"""
+        with self.lock:
+            events = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": ident, "args": {"name": name}}
+                      for ident, name in self.threads.items()]
+            events.extend(self.events or [])
+        data = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "phases": {name: {"count": count, "seconds": round(elapsed, 6)}
+                           for name, (count, elapsed) in self.phases.items()},
+            },
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"性能跟踪已写入: {path}")
+
+
+def profile_phase(name, file=None, **args):
+    """启用 --profile 时记录一个阶段，否则返回空的上下文管理器"""
+    if BUILD_PROFILER is None:
+        return contextlib.nullcontext()
+    return BUILD_PROFILER.phase(name, file, **args)
+
+
+def pad_text(text, width):
+    """按显示宽度（中文字符占两列）在文本后补空格"""
+    return text + " " * max(1, width - sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text))
+
+
+def scan_document(directory, relative_path, item, config, repo, is_index):
+    """生成单个文档节点：提取标题，并在有仓库时附加 Git 信息"""
+    item_path = os.path.join(relative_path, item)
+    file_path = os.path.join(directory, item)
+    with profile_phase("title", file_path):
+        title = get_file_title(file_path, item)
+
+    if is_index:
+        node = {
+            "title": title or "文档首页",
+            "path": item_path,
+        }
+    else:
+        node = {
+            "title": title,
+            "path": item_path,
+            "children": []
+        }
+
+    if repo:
+        # 头像在整个目录扫描完成后由 fill_github_avatars 统一并发解析
+        with profile_phase("git", file_path):
+            git_info = cache_fetch_git(file_path, lambda: get_git_info(
+                repo,
+                file_path,
+                config,
+                allow_github_api=False,
+            ))
+        if git_info["last_modified"] or git_info["contributors"]:
+            node["git"] = git_info
+
+    return node
+
+def scan_directory(directory, config, relative_path="", repo=None, executor=None):
+    """扫描目录并生成目录结构，提供 executor 时并行处理各文档"""
+    pending = []
+    result = _scan_directory(directory, config, relative_path, repo, executor, pending)
+
+    # 按提交顺序回填并行处理的结果，目录结构与串行扫描完全一致
+    for container, key, future in pending:
+        container[key] = future.result()
+
+    return result
+
+def _scan_directory(directory, config, relative_path, repo, executor, pending):
+    """递归扫描目录；并行模式下文档节点先以 Future 占位"""
     result = {
         "title": os.path.basename(directory) if relative_path else "首页",
         "path": relative_path,
@@ -280,58 +1691,37 @@ def scan_directory(directory, config, relative_path="", repo=None):
             files.append(item)
         elif os.path.isdir(item_path) and not item.startswith('.'):
             dirs.append(item)
+
+    def add_document(container, key, item, is_index):
+        args = (directory, relative_path, item, config, repo, is_index)
+        if executor is None:
+            node = scan_document(*args)
+        else:
+            node = executor.submit(scan_document, *args)
+        if key is None:
+            key = len(container)
+            container.append(node)
+        else:
+            container[key] = node
+        if executor is not None:
+            pending.append((container, key, node))
     
     # 首先处理索引文件
     for item in files:
         if is_index_file(item, config):
-            item_path = os.path.join(relative_path, item)
-            file_path = os.path.join(directory, item)
-            index_data = {
-                "title": get_file_title(file_path, item) or "文档首页",
-                "path": item_path,
-            }
-
-            if repo:
-                git_info = get_git_info(
-                    repo,
-                    file_path,
-                    config,
-                    allow_github_api=config.get("github", {}).get("enable", True),
-                )
-                if git_info["last_modified"] or git_info["contributors"]:
-                    index_data["git"] = git_info
-
-            result["index"] = index_data
+            add_document(result, "index", item, True)
             break
     
     # 处理其他文件
     for item in sorted(files):
         if not is_index_file(item, config):
-            item_path = os.path.join(relative_path, item)
-            file_path = os.path.join(directory, item)
-            file_data = {
-                "title": get_file_title(file_path, item),
-                "path": item_path,
-                "children": []
-            }
-
-            if repo:
-                git_info = get_git_info(
-                    repo,
-                    file_path,
-                    config,
-                    allow_github_api=config.get("github", {}).get("enable", True),
-                )
-                if git_info["last_modified"] or git_info["contributors"]:
-                    file_data["git"] = git_info
-
-            result["children"].append(file_data)
+            add_document(result["children"], None, item, False)
     
     # 处理子目录
     for item in sorted(dirs):
         sub_dir_path = os.path.join(directory, item)
         sub_rel_path = os.path.join(relative_path, item)
-        sub_result = scan_directory(sub_dir_path, config, sub_rel_path, repo)
+        sub_result = _scan_directory(sub_dir_path, config, sub_rel_path, repo, executor, pending)
         
         # 只添加非空的子目录
         if sub_result["children"] or sub_result["index"]:
@@ -341,45 +1731,10 @@ def scan_directory(directory, config, relative_path="", repo=None):
 
 def get_file_title(file_path, fallback_name):
     """尝试从文件内容中提取标题，如果失败则使用文件名作为标题"""
-    try:
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        if ext == ".md":
-            # 从Markdown文件中提取标题
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    # 寻找第一个标题行
-                    if line.startswith('# '):
-                        return line[2:].strip()
-                    elif line.startswith('## '):
-                        return line[3:].strip()
-        
-        elif ext == ".html":
-            # 从HTML文件中提取标题
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # 简单查找<title>标签
-                start_tag = '<title>'
-                end_tag = '</title>'
-                start_pos = content.find(start_tag)
-                if start_pos > -1:
-                    end_pos = content.find(end_tag, start_pos)
-                    if end_pos > -1:
-                        return content[start_pos + len(start_tag):end_pos].strip()
-                
-                # 或者寻找第一个<h1>标签
-                start_tag = '<h1>'
-                end_tag = '</h1>'
-                start_pos = content.find(start_tag)
-                if start_pos > -1:
-                    end_pos = content.find(end_tag, start_pos)
-                    if end_pos > -1:
-                        return content[start_pos + len(start_tag):end_pos].strip()
-    
-    except Exception as e:
-        print(f"读取文件 {file_path} 失败: {e}")
-    
+    title = get_document(file_path)["title"]
+    if title:
+        return title
+
     # 如果没有找到标题，使用文件名（去除扩展名）
     filename = os.path.basename(fallback_name)
     return os.path.splitext(filename)[0]
@@ -414,6 +1769,61 @@ def strip_git_fields(structure):
                 strip_git_fields(child)
     return structure
 
+def split_git_metadata(structure):
+    """
+    将结构中的 git 字段按目录拆分为附属文件，返回 (结构副本, {文件名: 内容})。
+    副本中不含 git 字段，有 Git 信息的目录节点增加 git_meta 字段指向附属文件（相对 path.json 所在目录）；
+    附属文件记录该目录索引文件和直接子文件的 {文档路径: git 字段}，文件名包含内容哈希
+    """
+    files = {}
+
+    def visit(node):
+        node = dict(node)
+        node.pop("git_meta", None)
+        blocks = {}
+        if node.get("index"):
+            node["index"] = dict(node["index"])
+            git_info = node["index"].pop("git", None)
+            if git_info:
+                blocks[node["index"]["path"]] = git_info
+        children = []
+        for child in node.get("children") or []:
+            if "index" in child:
+                children.append(visit(child))
+            else:
+                child = dict(child)
+                git_info = child.pop("git", None)
+                if git_info:
+                    blocks[child["path"]] = git_info
+                children.append(child)
+        if "children" in node:
+            node["children"] = children
+        if blocks:
+            content = json.dumps(blocks, ensure_ascii=False, separators=(',', ':'))
+            filename = f"{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}.json"
+            files[filename] = content
+            node["git_meta"] = f"{GIT_META_DIR}/{filename}"
+        return node
+
+    return visit(structure), files
+
+def restore_git_metadata(structure, base_dir):
+    """读取 git_meta 引用的附属文件，将 git 字段填回结构（split_git_metadata 的逆操作），附属文件缺失时返回 None"""
+    def visit(node):
+        reference = node.pop("git_meta", None)
+        if reference:
+            blocks = load_existing_structure(os.path.join(base_dir, *reference.split("/")))
+            if not isinstance(blocks, dict):
+                return False
+            if node.get("index") and node["index"].get("path") in blocks:
+                node["index"]["git"] = blocks[node["index"]["path"]]
+            for child in node.get("children") or []:
+                if "index" not in child and child.get("path") in blocks:
+                    child["git"] = blocks[child["path"]]
+        return all(visit(child) for child in node.get("children") or [] if "index" in child)
+
+    return structure if visit(structure) else None
+
 def load_existing_structure(filepath):
     """加载已存在的path.json文件结构"""
     try:
@@ -506,115 +1916,875 @@ def merge_structures(existing, new_structure, config):
     return result
 
 def extract_content(file_path, max_chars=1000):
-    """提取文件内容，用于搜索索引"""
-    try:
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        if ext == ".md":
-            # 从Markdown文件中提取内容
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # 移除Markdown标记
-                # 移除代码块
-                content = re.sub(r'```.*?```', '', content, flags=re.DOTALL)
-                # 移除行内代码
-                content = re.sub(r'`.*?`', '', content)
-                # 移除链接，保留链接文本
-                content = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', content)
-                # 移除图片
-                content = re.sub(r'!\[.*?\]\(.*?\)', '', content)
-                # 移除HTML标签
-                content = re.sub(r'<[^>]+>', '', content)
-                # 移除标题标记
-                content = re.sub(r'#+\s', '', content)
-                # 移除空行和多余空格
-                content = re.sub(r'\n+', ' ', content)
-                content = re.sub(r'\s+', ' ', content)
-                
-                # 截取一部分内容
-                return content[:max_chars]
-        
-        elif ext == ".html":
-            # 从HTML文件中提取内容
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                parser = HTMLTextExtractor()
-                parser.feed(content)
-                text = parser.get_text()
-                return text[:max_chars]
-        
-        return ""
-    except Exception as e:
-        print(f"读取文件 {file_path} 内容失败: {e}")
-        return ""
+    """提取文件内容（各级标题和正文的纯文本），用于搜索索引"""
+    parts = []
+    for _, title, body in get_document(file_path)["sections"]:
+        parts.extend(part for part in (title, body) if part)
+    return " ".join(parts)[:max_chars]
 
-def extract_keywords(content, max_keywords=10):
-    """从内容中提取关键词"""
-    if not content:
-        return []
-    
-    # 定义停用词
-    stopwords = set(['的', '了', '和', '是', '在', '我', '有', '个', '与', '这', '你', '们',
-                     'the', 'and', 'is', 'in', 'to', 'of', 'a', 'for', 'on', 'that', 'by', 'this', 'with'])
-    
-    # 分词并统计频率
-    words = re.findall(r'\b\w+\b|[\u4e00-\u9fa5]+', content.lower())
-    word_freq = {}
-    
-    for word in words:
-        if len(word) > 1 and word not in stopwords:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    # 按频率排序并返回前N个关键词
-    sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, freq in sorted_words[:max_keywords]]
+def extract_headings(file_path):
+    """提取文档中的各级标题文本"""
+    return get_document(file_path)["headings"]
+
+def extract_toc(file_path):
+    """提取 Markdown 文档的标题大纲 [[级别, 标题, 锚点], ...]，锚点与前端目录生成的标题 id 一致"""
+    return get_document(file_path)["toc"]
+
+def extract_sections(file_path):
+    """
+    按标题将文档全文切分为章节，返回 [[锚点, 标题, 正文], ...]；
+    第一项为首个标题之前的内容，锚点和标题为空。代码块不计入正文
+    """
+    return get_document(file_path)["sections"]
+
+# 中日韩统一表意文字范围，搜索分词时按二元组切分
+CJK_CHARS = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# 连续的中文字符，或不含中文的连续单词字符
+TOKEN_PATTERN = re.compile(f"[{CJK_CHARS}]+|[^\\W{CJK_CHARS}]+")
+CJK_PATTERN = re.compile(f"[{CJK_CHARS}]")
+# 倒排索引中各字段的权重
+SEARCH_FIELD_WEIGHTS = {"title": 5, "headings": 3, "keywords": 2, "body": 1}
+# 倒排索引格式版本
+SEARCH_INDEX_VERSION = 1
+
+def tokenize_text(text):
+    """
+    将文本切分为搜索词项（与 assets/js/search-index.js 的 tokenize 保持一致）：
+    英文等按单词切分并忽略单个字符，中文按相邻二元组切分，单个汉字保留原样
+    """
+    tokens = []
+    for run in TOKEN_PATTERN.findall(text.lower()):
+        if CJK_PATTERN.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) > 1:
+            tokens.append(run)
+    return tokens
+
+# 关键词停用词：英文常见虚词，以及含中文虚词的二元组
+KEYWORD_STOPWORDS = set(['the', 'and', 'is', 'in', 'to', 'of', 'for', 'on', 'that', 'by', 'this', 'with',
+                         'are', 'be', 'as', 'it', 'or', 'an', 'at', 'from', 'can', 'if', 'you', 'will',
+                         'not', 'we', 'your', 'use', 'all', 'has', 'have', 'but', 'their', 'which'])
+KEYWORD_STOP_CHARS = set('的了和是在我有个与这你们也就都而及或被把让从对将为以其于之中等可会要该上下不')
+# 中文二元组作为关键词所需的左右邻字信息熵下限：跨词边界的片段（如"支持静态"中的"持静"）
+# 总是夹在同一个词的两部分之间，相邻的字几乎固定，信息熵接近 0
+KEYWORD_MIN_BRANCHING_ENTROPY = 1.0
+
+class BigramTokenizer:
+    """
+    不依赖第三方库的分词器：英文等按单词切分，中文按相邻二元组切分（与前端搜索一致）。
+    关键词候选同样只取中文二元组，更长的词由前端查询时的二元组组合匹配；
+    跨词边界的二元组由 find_word_bigrams 按整个文档集合的左右邻字信息熵过滤
+    """
+
+    name = "bigram"
+    # 关键词候选是否需要按词边界过滤（见 find_word_bigrams）
+    boundary_filter = True
+
+    def tokenize(self, text):
+        return tokenize_text(text)
+
+    def keyword_terms(self, text):
+        terms = []
+        for run in TOKEN_PATTERN.findall(text.lower()):
+            if CJK_PATTERN.match(run):
+                terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+            elif len(run) > 1:
+                terms.append(run)
+        return terms
+
+    def keyword_contexts(self, text):
+        """返回中文二元组及其左右相邻的字 [(二元组, 左邻字, 右邻字)]，位于连续中文的开头或结尾时相邻字为空字符串"""
+        contexts = []
+        for run in TOKEN_PATTERN.findall(text.lower()):
+            if CJK_PATTERN.match(run):
+                contexts.extend((run[i:i + 2], run[i - 1:i], run[i + 2:i + 3]) for i in range(len(run) - 1))
+        return contexts
+
+
+class JiebaTokenizer:
+    """基于 jieba 词典的中文分词器（可选依赖，需执行 pip install jieba）"""
+
+    name = "jieba"
+    boundary_filter = False
+    # 词典只加载一次；--jobs 下多个线程可能同时创建实例，锁为类级别
+    init_lock = threading.Lock()
+
+    def __init__(self):
+        import jieba
+        self.jieba = jieba
+        # 创建时加载词典，之后各线程的 lcut 只读词典，无需加锁
+        with self.init_lock:
+            jieba.initialize()
+
+    def tokenize(self, text):
+        words = self.jieba.lcut(text.lower())
+        return [word for word in words if TOKEN_PATTERN.fullmatch(word)]
+
+    def keyword_terms(self, text):
+        return self.tokenize(text)
+
+
+# 可用的关键词分词器
+SEARCH_TOKENIZERS = {
+    BigramTokenizer.name: BigramTokenizer,
+    JiebaTokenizer.name: JiebaTokenizer,
+}
+# 已创建的分词器实例
+TOKENIZER_INSTANCES = {}
+
+def get_tokenizer(name):
+    """取得指定名称的分词器，词典分词器不可用时回退到二元组分词"""
+    if name not in TOKENIZER_INSTANCES:
+        tokenizer_class = SEARCH_TOKENIZERS.get(name)
+        if tokenizer_class is None:
+            print(f"警告: 未知的分词器 {name}，使用 bigram")
+            tokenizer_class = BigramTokenizer
+        try:
+            TOKENIZER_INSTANCES[name] = tokenizer_class()
+        except ImportError:
+            print(f"警告: 分词器 {name} 依赖的库未安装，使用 bigram")
+            TOKENIZER_INSTANCES[name] = BigramTokenizer()
+    return TOKENIZER_INSTANCES[name]
+
+def is_keyword_candidate(term):
+    """过滤不适合作为关键词的词项：单字、纯数字、停用词及含中文虚词的词项"""
+    if len(term) < 2 or term.isdigit() or term in KEYWORD_STOPWORDS:
+        return False
+    return not (CJK_PATTERN.match(term) and any(char in KEYWORD_STOP_CHARS for char in term))
+
+def count_keyword_terms(file_path, tokenizer):
+    """
+    统计文档全文（标题、各级标题和正文）中候选关键词的词频
+    """
+    def compute():
+        counts = {}
+        for _, title, body in extract_sections(file_path):
+            for term in tokenizer.keyword_terms(f"{title} {body}"):
+                if is_keyword_candidate(term):
+                    counts[term] = counts.get(term, 0) + 1
+        return counts
+    return cache_fetch(file_path, f"keyword_terms:{tokenizer.name}", compute)
+
+def count_bigram_contexts(file_path, tokenizer):
+    """
+    统计文档全文中每个候选中文二元组左右相邻的字及次数 {二元组: [{左邻字: 次数}, {右邻字: 次数}]}，
+    空字符串表示连续中文的开头或结尾
+    """
+    def compute():
+        contexts = {}
+        for _, title, body in extract_sections(file_path):
+            for term, left, right in tokenizer.keyword_contexts(f"{title} {body}"):
+                if not is_keyword_candidate(term):
+                    continue
+                sides = contexts.setdefault(term, [{}, {}])
+                sides[0][left] = sides[0].get(left, 0) + 1
+                sides[1][right] = sides[1].get(right, 0) + 1
+        return contexts
+    return cache_fetch(file_path, f"bigram_contexts:{tokenizer.name}", compute)
+
+def branching_entropy(neighbours):
+    """邻字分布 {邻字: 次数} 的信息熵，连续中文的边界（空字符串）每次出现都视为不同的邻字"""
+    total = sum(neighbours.values())
+    if not total:
+        return 0.0
+    entropy = -sum(count / total * math.log(count / total) for char, count in neighbours.items() if char)
+    return entropy + neighbours.get("", 0) / total * math.log(total)
 
-def build_search_tree(structure, config, result=None):
-    """构建搜索树"""
+def find_word_bigrams(doc_contexts):
+    """
+    合并各文档的二元组邻字统计，返回成词的中文二元组：左右邻字信息熵都不低于 KEYWORD_MIN_BRANCHING_ENTROPY。
+    词在不同的上下文中出现，两侧相邻的字多种多样；跨词边界的片段（如"任何支持"中的"何支"）
+    只出现在固定的词组中，左邻字或右邻字几乎总是同一个
+    """
+    merged = {}
+    for contexts in doc_contexts:
+        for term, sides in contexts.items():
+            merged_sides = merged.setdefault(term, [{}, {}])
+            for merged_side, side in zip(merged_sides, sides):
+                for char, count in side.items():
+                    merged_side[char] = merged_side.get(char, 0) + count
+    return {term for term, (left, right) in merged.items()
+            if min(branching_entropy(left), branching_entropy(right)) >= KEYWORD_MIN_BRANCHING_ENTROPY}
+
+def score_keywords(term_counts, method="bm25", max_keywords=10, k1=1.2, b=0.75):
+    """
+    基于整个文档集合为每篇文档的词项评分并取前 max_keywords 个作为关键词。
+    term_counts 为各文档的 词项 -> 词频，method 为 bm25 或 tfidf
+    """
+    total = len(term_counts)
+    doc_freq = {}
+    for counts in term_counts:
+        for term in counts:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+    lengths = [sum(counts.values()) for counts in term_counts]
+    avg_length = (sum(lengths) / total) if total else 0
+
+    result = []
+    for counts, length in zip(term_counts, lengths):
+        scores = {}
+        for term, freq in counts.items():
+            df = doc_freq[term]
+            if method == "tfidf":
+                idf = math.log((1 + total) / (1 + df)) + 1
+                scores[term] = freq / length * idf
+            else:
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                norm = k1 * (1 - b + b * length / avg_length) if avg_length else k1
+                scores[term] = idf * freq * (k1 + 1) / (freq + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        result.append([term for term, _ in ranked[:max_keywords]])
+    return result
+
+def build_inverted_index(search_tree, config, executor=None, full_text=False):
+    """
+    根据搜索树构建倒排索引：
+    docs 保存文档标题、路径和摘要，terms 为 词项 -> [文档频率, 文档序号, 权重, ...]，
+    权重为词项在标题、各级标题和正文中出现次数按 SEARCH_FIELD_WEIGHTS 加权之和。
+    full_text 为 True 时索引文档全文，docs 额外保存各章节的 [锚点, 标题]，
+    倒排列表变为 [文档频率, 文档序号, 权重, 章节序号, ...]，章节序号为该词项权重最高的章节（0 表示文档开头）
+    """
+    file_paths = [os.path.join(config["root_dir"], item["path"]) for item in search_tree]
+
+    def index_fields(file_path):
+        if full_text:
+            return extract_sections(file_path)
+        headings = extract_headings(file_path)
+        body = extract_content(file_path)
+        # 截断模式下不区分章节，全部计入文档开头
+        return [["", "", body]] + [["", heading, ""] for heading in headings]
+
+    extracted = executor.map(index_fields, file_paths) if executor else map(index_fields, file_paths)
+
+    stride = 3 if full_text else 2
+    postings = {}
+    docs = []
+    for doc_id, (item, sections) in enumerate(zip(search_tree, extracted)):
+        doc = {"title": item["title"], "path": item["path"], "content": item["content"]}
+        if full_text:
+            doc["sections"] = [[slug, title] for slug, title, _ in sections[1:]]
+        docs.append(doc)
+
+        # 词项 -> {章节序号: 权重}，关键词不属于任何章节，章节序号记为 None
+        weights = {}
+        fields = [(0, "title", item["title"]), (None, "keywords", " ".join(item.get("keywords", [])))]
+        for section_id, (_, title, body) in enumerate(sections):
+            section_id = section_id if full_text else 0
+            fields.append((section_id, "headings", title))
+            fields.append((section_id, "body", body))
+        for section_id, field, text in fields:
+            for token in tokenize_text(text):
+                section_weights = weights.setdefault(token, {})
+                section_weights[section_id] = section_weights.get(section_id, 0) + SEARCH_FIELD_WEIGHTS[field]
+        for token, section_weights in weights.items():
+            entry = [doc_id, sum(section_weights.values())]
+            if full_text:
+                # 权重相同时取靠前的章节
+                section_weights = {k: v for k, v in section_weights.items() if k is not None} or {0: 0}
+                entry.append(max(section_weights, key=lambda section_id: (section_weights[section_id], -section_id)))
+            postings.setdefault(token, []).extend(entry)
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "weights": SEARCH_FIELD_WEIGHTS,
+        "stride": stride,
+        "docs": docs,
+        "terms": {
+            term: [len(entries) // stride] + entries
+            # 按 UTF-16 编码排序，与前端字符串比较顺序一致
+            for term, entries in sorted(postings.items(), key=lambda item: item[0].encode('utf-16-be'))
+        },
+    }
+
+def pack_search_shards(entries, shard_size):
+    """
+    将有序的 (键, JSON 片段) 按顺序打包为多个分片，每个分片的 JSON 大小尽量不超过 shard_size 字节，
+    返回 [(首个键, [JSON 片段, ...]), ...]
+    """
+    shards = []
+    current = []
+    current_size = 0
+    for key, fragment in entries:
+        fragment_size = len(fragment.encode('utf-8')) + 1
+        if current and current_size + fragment_size > shard_size:
+            shards.append(current)
+            current = []
+            current_size = 0
+        current.append((key, fragment))
+        current_size += fragment_size
+    if current:
+        shards.append(current)
+    return [(shard[0][0], [fragment for _, fragment in shard]) for shard in shards]
+
+def render_search_shards(inverted_index, shard_size, minify=False):
+    """
+    将倒排索引按词项前缀（有序词表的连续区间）和文档序号区间拆分为分片，
+    并生成 manifest.json 记录每个分片的起始词项/文档序号、文件名和内容哈希。
+    分片文件名包含内容哈希，内容不变时文件名不变，可长期缓存；minify 时 manifest.json 不缩进。
+    返回 (manifest, {文件名: 内容})，文件中包含 manifest.json
+    """
+    files = {}
+
+    def add_shard(kind, fragments, wrapper):
+        content = wrapper % ','.join(fragments)
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]
+        filename = f"{kind}.{digest}.json"
+        files[filename] = content
+        return filename, digest
+
+    def dump(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+    term_entries = ((term, f"{dump(term)}:{dump(entry)}") for term, entry in inverted_index["terms"].items())
+    term_shards = []
+    for first_term, fragments in pack_search_shards(term_entries, shard_size):
+        filename, digest = add_shard("terms", fragments, '{"terms":{%s}}')
+        term_shards.append({"from": first_term, "file": filename, "hash": digest, "count": len(fragments)})
+
+    doc_entries = ((doc_id, dump(doc)) for doc_id, doc in enumerate(inverted_index["docs"]))
+    doc_shards = []
+    for first_doc, fragments in pack_search_shards(doc_entries, shard_size):
+        filename, digest = add_shard("docs", fragments, '{"docs":[%s]}')
+        doc_shards.append({"from": first_doc, "file": filename, "hash": digest, "count": len(fragments)})
+
+    manifest = {
+        "version": inverted_index["version"],
+        "weights": inverted_index["weights"],
+        "stride": inverted_index["stride"],
+        "doc_count": len(inverted_index["docs"]),
+        "term_count": len(inverted_index["terms"]),
+        "terms": term_shards,
+        "docs": doc_shards,
+    }
+    files["manifest.json"] = dump(manifest) if minify else json.dumps(manifest, ensure_ascii=False, indent=4)
+    return manifest, files
+
+def write_hashed_files(output_dir, files, precompress=False, brotli=None, extension=".json"):
+    """
+    写出文件名包含内容哈希的一组文件（搜索索引分片、git 附属文件、打包的脚本），已存在的文件不重复写入
+    （manifest.json 除外），并删除目录中扩展名为 extension、不再引用的旧文件。
+    precompress 时同时写出 .gz/.br 压缩文件（见 write_artifact）
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for filename, content in files.items():
+        file_path = os.path.join(output_dir, filename)
+        if (filename == "manifest.json" or not os.path.exists(file_path)
+                or (precompress and not os.path.exists(file_path + ".gz"))):
+            write_artifact(file_path, content, precompress, brotli)
+
+    # 清理上次构建遗留、已不再引用的文件及不再需要的压缩文件
+    kept_suffixes = ("",) + ((".gz", ".br") if precompress and brotli else (".gz",) if precompress else ())
+    for filename in os.listdir(output_dir):
+        name, suffix = filename, ""
+        if filename.endswith((".gz", ".br")):
+            name, suffix = filename[:-3], filename[-3:]
+        if name.endswith(extension) and (name not in files or suffix not in kept_suffixes):
+            os.remove(os.path.join(output_dir, filename))
+
+def write_artifact(path, content, precompress=False, brotli=None):
+    """
+    写出文本构建产物。precompress 时同时写出供静态服务器直接返回的 .gz（及安装 brotli 时的 .br）压缩文件；
+    否则删除已有的压缩文件，避免服务器返回过期的内容
+    """
+    data = content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    for suffix, enabled in ((".gz", precompress), (".br", precompress and brotli is not None)):
+        if enabled:
+            with open(path + suffix, 'wb') as f:
+                f.write(compress_artifact(data, suffix, brotli))
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def compress_artifact(data, suffix, brotli=None):
+    """按最高压缩率压缩构建产物，gzip 不写入时间戳，相同内容的压缩结果保持一致"""
+    if suffix == ".br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def artifact_sizes(path, brotli=None):
+    """返回构建产物的 (原始大小, gzip 大小, brotli 大小)，已有压缩文件时直接读取其大小，未安装 brotli 时 brotli 大小为 None"""
+    sizes = [os.path.getsize(path)]
+    data = None
+    for suffix in (".gz", ".br"):
+        if suffix == ".br" and brotli is None:
+            sizes.append(None)
+        elif os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= os.path.getmtime(path):
+            sizes.append(os.path.getsize(path + suffix))
+        else:
+            if data is None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            sizes.append(len(compress_artifact(data, suffix, brotli)))
+    return tuple(sizes)
+
+def parse_size_budgets(specs):
+    """解析 --size-budget 的 名称=KB 参数，返回 [(名称模式, 字节数)]；格式错误时抛出 ValueError"""
+    budgets = []
+    for spec in specs or []:
+        name, separator, limit = spec.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"大小预算格式应为 名称=KB: {spec}")
+        budgets.append((name.strip(), float(limit) * 1024))
+    return budgets
+
+def report_artifact_sizes(groups, budgets, brotli=None):
+    """
+    打印构建产物大小报告。groups 为 [(目录, [(名称, 显示名称, [文件路径, ...]), ...]), ...]，
+    多个文件（如搜索索引分片）合并为一行。预算按 gzip 压缩后的大小检查，
+    名称按通配符匹配产物名称，total 表示每个目录的合计。返回超出预算的说明列表
+    """
+    def kb(size):
+        return "-" if size is None else f"{size / 1024:.1f}"
+
+    def pad(text, width=44):
+        return pad_text(text, width)
+
+    violations = []
+
+    def check(label, name, gzip_size):
+        for pattern, limit in budgets:
+            if fnmatch.fnmatch(name, pattern) and gzip_size > limit:
+                violations.append(f"{label}: gzip 后 {gzip_size / 1024:.1f} KB，超出预算 {limit / 1024:g} KB ({pattern})")
+
+    print("构建产物大小 (KB):")
+    print(f"  {pad('产物')}{'原始':>8} {'gzip':>10} {'brotli':>10}")
+    for directory, artifacts in groups:
+        totals = [0, 0, None if brotli is None else 0]
+        for name, label, paths in artifacts:
+            sizes = [0, 0, None if brotli is None else 0]
+            for path in paths:
+                for i, size in enumerate(artifact_sizes(path, brotli)):
+                    if size is not None:
+                        sizes[i] += size
+            for i, size in enumerate(sizes):
+                if size is not None:
+                    totals[i] += size
+            if len(paths) > 1:
+                label += f" ({len(paths)} 个文件)"
+            print(f"  {pad(label)}{kb(sizes[0]):>10} {kb(sizes[1]):>10} {kb(sizes[2]):>10}")
+            check(label, name, sizes[1])
+        label = f"{directory} 合计"
+        print(f"  {pad(label)}{kb(totals[0]):>10} {kb(totals[1]):>10} {kb(totals[2]):>10}")
+        check(label, "total", totals[1])
+    return violations
+
+def extract_search_fields(file_path, tokenizer):
+    """提取文档的搜索内容、候选关键词词频，以及需要按词边界过滤时的二元组邻字统计"""
+    contexts = count_bigram_contexts(file_path, tokenizer) if tokenizer.boundary_filter else None
+    return extract_content(file_path), count_keyword_terms(file_path, tokenizer), contexts
+
+def collect_search_documents(structure, config, result=None):
+    """按导航顺序收集需要写入搜索索引的文档 (标题, 相对路径, 文件路径)"""
     if result is None:
         result = []
-    
+
     # 处理索引文档
     if structure.get("index"):
         file_path = os.path.join(config["root_dir"], structure["index"]["path"])
         if os.path.exists(file_path):
-            content = extract_content(file_path)
-            keywords = extract_keywords(content)
-            
-            search_item = {
-                "title": structure["index"]["title"],
-                "path": structure["index"]["path"],
-                "content": content[:200] + "..." if len(content) > 200 else content,
-                "keywords": keywords
-            }
-            result.append(search_item)
-    
+            result.append((structure["index"]["title"], structure["index"]["path"], file_path))
+
     # 处理文件
     for child in structure.get("children", []):
         if not child.get("children"):
             # 这是一个文件
             file_path = os.path.join(config["root_dir"], child["path"])
             if os.path.exists(file_path):
-                content = extract_content(file_path)
-                keywords = extract_keywords(content)
-                
-                search_item = {
-                    "title": child["title"],
-                    "path": child["path"],
-                    "content": content[:200] + "..." if len(content) > 200 else content,
-                    "keywords": keywords
-                }
-                result.append(search_item)
+                result.append((child["title"], child["path"], file_path))
+        else:
+            # 这是一个目录，递归处理
+            collect_search_documents(child, config, result)
+
+    return result
+
+def build_search_tree(structure, config, result=None, executor=None):
+    """
+    构建搜索树，提供 executor 时并行提取文档内容。
+    关键词在提取完全部文档后按整个文档集合的 BM25（或 TF-IDF）评分选出
+    """
+    if result is None:
+        result = []
+
+    search_config = config.get("search", DEFAULT_CONFIG["search"])
+    tokenizer = get_tokenizer(search_config.get("tokenizer", "bigram"))
+    documents = collect_search_documents(structure, config)
+    file_paths = [file_path for _, _, file_path in documents]
+    # executor.map 按输入顺序返回结果，搜索索引顺序与串行构建一致
+    def extract(file_path):
+        with profile_phase("search_fields", file_path):
+            return extract_search_fields(file_path, tokenizer)
+    extracted = list(executor.map(extract, file_paths) if executor else map(extract, file_paths))
+
+    term_counts = [counts for _, counts, _ in extracted]
+    if tokenizer.boundary_filter:
+        words = find_word_bigrams([contexts for _, _, contexts in extracted])
+        term_counts = [{term: freq for term, freq in counts.items() if term in words or not CJK_PATTERN.match(term)}
+                       for counts in term_counts]
+    # 只出现一次的词项不作为候选（文档过短时除外）
+    term_counts = [{term: freq for term, freq in counts.items() if freq >= 2} or counts for counts in term_counts]
+    keywords_list = score_keywords(
+        term_counts,
+        method=search_config.get("keyword_scoring", "bm25"),
+        max_keywords=search_config.get("max_keywords", 10),
+    )
+
+    for (title, path, _), (content, _, _), keywords in zip(documents, extracted, keywords_list):
+        search_item = {
+            "title": title,
+            "path": path,
+            "content": content[:200] + "..." if len(content) > 200 else content,
+            "keywords": keywords
+        }
+        result.append(search_item)
+    
+    return result
+
+def build_toc_index(structure, config):
+    """按导航顺序收集目录中各 Markdown 文档的标题大纲 {文档路径: [[级别, 标题, 锚点], ...]}，没有标题的文档不写入"""
+    toc_index = {}
+    for _, path, file_path in collect_search_documents(structure, config):
+        toc = extract_toc(file_path)
+        if toc:
+            toc_index[path] = toc
+    return toc_index
+
+# Markdown 行内链接和引用链接定义（图片链接以 ! 开头，不计入文档链接）
+MD_INLINE_LINK_PATTERN = re.compile(r'(?<!!)\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*(<[^>]*>|[^\s)]+)(?:\s+(?:"[^"]*"|\'[^\']*\'))?\s*\)')
+MD_REFERENCE_DEFINITION_PATTERN = re.compile(r' {0,3}\[[^\]]+\]:\s*(<[^>]*>|\S+)')
+MD_INLINE_CODE_PATTERN = re.compile(r'(`+).*?\1')
+# 文档页的 hash 路由链接（main/#路径#锚点）
+DOCUMENT_ROUTE_PATTERN = re.compile(r'(?:\.{0,2}/)*main/(?:index\.html)?')
+# 旧版按序号生成的标题锚点，前端仍然支持
+LEGACY_HEADING_ANCHOR_PATTERN = re.compile(r'heading-\d+')
+
+# HTML解析器，用于提取链接地址
+class HTMLLinkExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+
+def read_links(file_path):
+    """按出现顺序读取文档中的链接地址（Markdown 跳过代码块和行内代码，图片不计入）"""
+    links = []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except Exception as e:
+        print(f"读取文件 {file_path} 失败: {e}")
+        return links
+
+    if os.path.splitext(file_path)[1].lower() != ".md":
+        parser = HTMLLinkExtractor()
+        parser.feed(content)
+        parser.close()
+        return parser.links
+
+    fence = None
+    html_lines = []
+    for line in content.splitlines():
+        stripped = line.strip()
+        if fence:
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            continue
+        match = MD_FENCE_PATTERN.match(line)
+        if match:
+            fence = match.group(1)
+            continue
+        line = MD_INLINE_CODE_PATTERN.sub('', line)
+        match = MD_REFERENCE_DEFINITION_PATTERN.match(line)
+        if match:
+            links.append(match.group(1).strip('<>'))
+            continue
+        links.extend(match.group(1).strip('<>') for match in MD_INLINE_LINK_PATTERN.finditer(line))
+        if '<a' in line.lower():
+            html_lines.append(line)
+    if html_lines:
+        # Markdown 中的 HTML 链接，出现顺序排在 Markdown 链接之后
+        parser = HTMLLinkExtractor()
+        parser.feed("\n".join(html_lines))
+        parser.close()
+        links.extend(parser.links)
+    return links
+
+def extract_links(file_path):
+    """提取文档中的链接地址，优先使用构建缓存"""
+    return cache_fetch(file_path, "links", lambda: read_links(file_path))
+
+def collect_link_targets(structure, result=None):
+    """收集结构中可作为链接目标的路径：{文档路径: 文档路径, 目录路径: 目录索引文档路径或 None}"""
+    if result is None:
+        result = {}
+    if structure.get("index"):
+        result[structure["index"]["path"]] = structure["index"]["path"]
+    if structure.get("path") and (structure.get("children") or structure.get("index")):
+        result[structure["path"]] = structure["index"]["path"] if structure.get("index") else None
+    for child in structure.get("children", []):
+        if child.get("children") or child.get("index"):
+            collect_link_targets(child, result)
+        else:
+            result[child["path"]] = child["path"]
+    return result
+
+def resolve_document_link(href, source, targets, config):
+    """
+    将文档中的链接地址解析为 (目标文档路径, 锚点)，按 path.json 查找：
+    先按前端的方式相对文档根目录解析，再相对当前文档所在目录解析；省略扩展名时依次尝试支持的扩展名，
+    目录解析为其索引文档（没有索引文档时目标为 None）。
+    外部链接、非文档文件和其他分支的链接返回 None；无法解析时返回 (False, 锚点)
+    """
+    if re.match(r'[a-zA-Z][a-zA-Z0-9+.-]*:|//', href):
+        return None
+    path, _, anchor = href.partition('#')
+    path = path.split('?', 1)[0]
+    if DOCUMENT_ROUTE_PATTERN.fullmatch(path) and anchor:
+        # hash 路由：main/#路径#锚点，带 /#/ 的为其他分支的链接
+        if '/#/' in anchor:
+            return None
+        path, _, anchor = anchor.partition('#')
+        path = path.lstrip('/')
+    path = urllib.parse.unquote(path)
+    anchor = urllib.parse.unquote(anchor)
+    if not path:
+        return source, anchor
+
+    ext = os.path.splitext(path.rstrip('/'))[1].lower()
+    extensions = config.get("supported_extensions", DEFAULT_CONFIG["supported_extensions"])
+    if ext and ext not in extensions:
+        return None
+
+    candidates = [posixpath.normpath(path.lstrip('/'))]
+    if not path.startswith('/'):
+        candidates.append(posixpath.normpath(posixpath.join(posixpath.dirname(source), path)))
+    for candidate in candidates:
+        if candidate in ('.', ''):
+            candidate = ''
+        if candidate in targets:
+            return targets[candidate], anchor
+        if not ext:
+            for extension in extensions:
+                if candidate + extension in targets:
+                    return targets[candidate + extension], anchor
+    return False, anchor
+
+def build_link_graph(structure, config, prefetch_count=5):
+    """
+    解析目录中各文档的站内链接，返回 (链接图, 断开的链接)：
+    链接图为 {"outbound": {文档: [目标, ...]}, "inbound": {文档: [来源, ...]}, "prefetch": {文档: [目标, ...]}}，
+    断开的链接为 [(来源文档, 链接地址, 原因), ...]。
+    预加载列表按文档中指向目标的链接数（越靠前越优先）、导航中的下一篇/上一篇和目标被引用的次数排序
+    """
+    documents = collect_search_documents(structure, config)
+    targets = collect_link_targets(structure)
+    order = [path for _, path, _ in documents]
+    outbound = {}
+    inbound = {}
+    broken = []
+    scores = {}
+
+    for _, source, file_path in documents:
+        links = []
+        for position, href in enumerate(extract_links(file_path)):
+            resolved = resolve_document_link(href, source, targets, config)
+            if resolved is None:
+                continue
+            target, anchor = resolved
+            if target is False:
+                broken.append((source, href, "文档不存在"))
+                continue
+            if target is None:
+                continue
+            if anchor and target.lower().endswith('.md') and not LEGACY_HEADING_ANCHOR_PATTERN.fullmatch(anchor):
+                target_file = os.path.join(config["root_dir"], target)
+                if anchor not in {slug for _, _, slug in extract_toc(target_file)}:
+                    broken.append((source, href, "锚点不存在"))
+            if target == source:
+                continue
+            if target not in links:
+                links.append(target)
+            score = scores.setdefault(source, {})
+            score[target] = score.get(target, 0) + 3 + 1 / (position + 1)
+        outbound[source] = links
+        for target in links:
+            inbound.setdefault(target, []).append(source)
+
+    positions = {path: index for index, path in enumerate(order)}
+    prefetch = {}
+    for index, source in enumerate(order):
+        score = dict(scores.get(source, {}))
+        for offset, weight in ((1, 2), (-1, 1)):
+            if 0 <= index + offset < len(order) and order[index + offset] != source:
+                neighbor = order[index + offset]
+                score[neighbor] = score.get(neighbor, 0) + weight
+        ranked = sorted(score, key=lambda target: (-(score[target] + 0.1 * len(inbound.get(target, []))),
+                                                   positions.get(target, len(order))))
+        if ranked[:prefetch_count]:
+            prefetch[source] = ranked[:prefetch_count]
+
+    graph = {
+        "outbound": {source: links for source, links in outbound.items() if links},
+        "inbound": inbound,
+        "prefetch": prefetch,
+    }
+    return graph, broken
+
+def split_search_corpus(search_tree):
+    """
+    将搜索树中各文档的摘要移入共享语料：条目的 content 替换为摘要的内容哈希 hash，
+    返回 (新的搜索树, {哈希: 摘要})
+    """
+    corpus = {}
+    result = []
+    for item in search_tree:
+        shared = {}
+        for field, value in item.items():
+            if field == "content":
+                digest = hashlib.sha1(value.encode('utf-8')).hexdigest()[:12]
+                corpus[digest] = value
+                shared["hash"] = digest
+            else:
+                shared[field] = value
+        result.append(shared)
+    return result, corpus
+
+def restore_search_corpus(search_json, corpus):
+    """取出已有 search.json 引用的摘要 {哈希: 摘要}，文件无效或任一摘要在语料中缺失时返回 None"""
+    search_tree = load_existing_structure(search_json)
+    if not isinstance(search_tree, list):
+        return None
+    part = {}
+    for item in search_tree:
+        digest = item.get("hash")
+        if digest not in corpus:
+            return None
+        part[digest] = corpus[digest]
+    return part
+
+def load_markdown_renderer():
+    """
+    创建预渲染使用的 Markdown 解析器（可选依赖 markdown-it-py，pip install markdown-it-py），未安装时返回 None。
+    选项与前端 marked 一致：允许 HTML、换行即 <br>、GFM 表格和删除线，安装 linkify-it-py 时识别裸链接
+    """
+    try:
+        from markdown_it import MarkdownIt
+    except ImportError:
+        return None
+    try:
+        import linkify_it  # noqa: F401
+        linkify = True
+    except ImportError:
+        linkify = False
+    renderer = MarkdownIt("commonmark", {"html": True, "breaks": True, "linkify": linkify})
+    renderer.enable(["table", "strikethrough"] + (["linkify"] if linkify else []))
+    renderer.core.ruler.push("task_lists", markdown_task_lists)
+    return renderer
+
+def markdown_task_lists(state):
+    """将以 [ ] / [x] 开头的列表项渲染为与 marked 相同的禁用复选框"""
+    from markdown_it.token import Token
+    tokens = state.tokens
+    for i in range(2, len(tokens)):
+        token = tokens[i]
+        if token.type != "inline" or tokens[i - 1].type != "paragraph_open" or tokens[i - 2].type != "list_item_open":
+            continue
+        children = token.children or []
+        match = re.match(r'\[([ xX])\][ \t]', children[0].content) if children and children[0].type == "text" else None
+        if not match:
+            continue
+        checked = ' checked=""' if match.group(1) != " " else ""
+        checkbox = Token("html_inline", "", 0)
+        checkbox.content = f'<input{checked} disabled="" type="checkbox"> '
+        children[0].content = children[0].content[match.end():]
+        children.insert(0, checkbox)
+
+def preprocess_math_content(content):
+    """与前端 preProcessMathContent 一致：将代码块之外的 $$...$$ 包装为 math-block，避免被 Markdown 解析"""
+    segments = []
+    current = []
+    in_code = False
+    for line in content.split('\n'):
+        if line.strip().startswith('```'):
+            if current:
+                segments.append((in_code, '\n'.join(current)))
+                current = []
+            in_code = not in_code
+            segments.append((True, line))
         else:
-            # 这是一个目录，递归处理
-            build_search_tree(child, config, result)
-    
-    return result
+            current.append(line)
+    if current:
+        segments.append((in_code, '\n'.join(current)))
+    return '\n'.join(
+        text if is_code else re.sub(r'\$\$([\s\S]*?)\$\$', r'<div class="math-block">$$\1$$</div>', text)
+        for is_code, text in segments
+    )
+
+def render_markdown_fragment(content, renderer):
+    """
+    将 Markdown 渲染为 HTML 片段，返回 {"html": 片段, "toc": [[级别, 标题, 锚点], ...]}。
+    标题 id 按前端 generateToc 的规则生成（见 heading_slug），代码块带 language-* 类名供 highlight.js 直接高亮
+    """
+    tokens = renderer.parse(preprocess_math_content(content))
+    toc = []
+    used_slugs = set()
+    for i, token in enumerate(tokens):
+        if token.type != "heading_open":
+            continue
+        # 与浏览器中标题的 textContent 一致：只取文本和行内代码，图片和 HTML 标签不计入
+        text = "".join(child.content for child in tokens[i + 1].children or []
+                       if child.type in ("text", "code_inline"))
+        slug = heading_slug(text, len(toc), used_slugs)
+        token.attrSet("id", slug)
+        toc.append([int(token.tag[1]), text.strip(), slug])
+    return {"html": renderer.renderer.render(tokens, renderer.options, {}), "toc": toc}
+
+def source_hash(data):
+    """文档内容的 SHA-1（去除 UTF-8 BOM，与浏览器 fetch 后 response.text() 得到的文本一致）"""
+    return hashlib.sha1(data.decode('utf-8-sig', 'replace').encode('utf-8')).hexdigest()
+
+def prerender_documents(structure, config, renderer, executor=None):
+    """
+    预渲染目录中的 Markdown 文档，返回 {文件名: 内容}：
+    manifest.json 记录 {文档路径: [片段文件名, 源文件 SHA-1]}，片段文件名包含内容哈希。
+    前端用 SHA-1 确认片段与当前文档一致后才使用，否则回退到浏览器端解析
+    """
+    import markdown_it
+    field = f"prerender:{markdown_it.__version__}"
+    documents = [(path, file_path) for _, path, file_path in collect_search_documents(structure, config)
+                 if not path.lower().endswith('.html')]
+
+    def render(file_path):
+        def compute():
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            fragment = render_markdown_fragment(data.decode('utf-8-sig', 'replace'), renderer)
+            return [source_hash(data), json.dumps(fragment, ensure_ascii=False, separators=(',', ':'))]
+        with profile_phase("prerender", file_path):
+            return cache_fetch(file_path, field, compute)
+
+    rendered = list(executor.map(render, [file_path for _, file_path in documents]) if executor
+                    else map(render, [file_path for _, file_path in documents]))
+    files = {}
+    docs = {}
+    for (path, _), (digest, content) in zip(documents, rendered):
+        filename = f"{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}.json"
+        files[filename] = content
+        docs[path] = [filename, digest]
+    files["manifest.json"] = json.dumps({"version": PRERENDER_VERSION, "docs": docs}, ensure_ascii=False,
+                                        separators=(',', ':'))
+    return files
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="EasyDocument 文档路径生成工具")
+    parser.add_argument('command', nargs='?', choices=['serve'], help='serve: 构建后启动本地预览服务器，文档变化时自动更新')
     parser.add_argument('--root', default=DEFAULT_CONFIG["root_dir"], help='文档根目录')
     parser.add_argument('--output', default='path.json', help='输出的JSON文件路径')
     parser.add_argument('--search-index', default='search.json', help='搜索索引文件路径')
@@ -622,7 +2792,41 @@ def main():
     parser.add_argument('--config', default='config.js', help='配置文件路径')
     parser.add_argument('--no-git', action='store_true', help='不向 path.json 写入 git 字段')
     parser.add_argument('--no-github', action='store_true', help='禁用构建阶段 GitHub API 请求')
+    parser.add_argument('--git-sidecar', action='store_true', help='path.json 只保留标题和路径，git 字段按目录写入 git-meta/ 附属文件，由文档页按需加载')
+    parser.add_argument('--git-follow-renames', action='store_true', help='统计贡献者时跟踪文件重命名前的历史')
+    parser.add_argument('--author-map', default=None, help='邮箱到 GitHub 用户名的覆盖文件 (默认: .easydoc-authors)')
+    parser.add_argument('--github-api-url', default=None, help='GitHub API 地址 (默认: https://api.github.com)')
+    parser.add_argument('--github-concurrency', type=int, default=4, help='并发请求 GitHub API 的连接数')
+    parser.add_argument('--github-cache-ttl', type=float, default=168, help='GitHub 用户缓存有效期（小时）')
     parser.add_argument('--no-search', action='store_true', help='禁用搜索索引生成')
+    parser.add_argument('--search-inverted', action='store_true', help='额外生成倒排搜索索引 search-index.json')
+    parser.add_argument('--tokenizer', choices=sorted(SEARCH_TOKENIZERS), default=None, help='关键词分词器 (默认: bigram)')
+    parser.add_argument('--keyword-scoring', choices=['bm25', 'tfidf'], default=None, help='关键词评分方式 (默认: bm25)')
+    parser.add_argument('--search-full-text', action='store_true', help='倒排/分片搜索索引收录文档全文并记录匹配章节的锚点')
+    parser.add_argument('--search-shards', action='store_true', help='额外生成按词项前缀分片、按需加载的搜索索引 search-shards/')
+    parser.add_argument('--search-shard-size', type=int, default=64, help='单个搜索索引分片的目标大小（KB）')
+    parser.add_argument('--search-shared-corpus', action='store_true', help='各分支 search.json 的摘要去重后写入共享的 search-corpus.json，按内容哈希引用')
+    parser.add_argument('--toc', action='store_true', help='额外生成各文档标题大纲 toc.json，供目录在正文加载前显示、搜索结果定位到章节')
+    parser.add_argument('--link-graph', action='store_true', help='额外生成文档链接图 links.json（出入链接和预加载列表），并报告断开的链接')
+    parser.add_argument('--prefetch-count', type=int, default=5, help='链接图中每篇文档的预加载列表长度')
+    parser.add_argument('--service-worker', action='store_true', help='生成预缓存页面、静态资源、文档和 JSON 产物的 Service Worker sw.js')
+    parser.add_argument('--bundle', action='store_true', help='将 assets/js 下的模块打包为文件名包含内容哈希的脚本，写入 assets/dist/，并改写页面中的模块脚本标签')
+    parser.add_argument('--prerender', action='store_true', help='将 Markdown 文档预渲染为 HTML 片段和标题目录，写入 prerender/（需安装 markdown-it-py）')
+    parser.add_argument('--minify', action='store_true', help='path.json、search.json 等 JSON 产物不缩进，减小文件大小')
+    parser.add_argument('--precompress', action='store_true', help='为 JSON 产物同时生成 .gz（安装 brotli 时还有 .br）压缩文件')
+    parser.add_argument('--size-report', action='store_true', help='构建完成后打印各产物及各分支的大小报告')
+    parser.add_argument('--size-budget', action='append', metavar='NAME=KB', help='产物 gzip 后的大小预算，超出时构建失败，可重复指定（如 search.json=300、total=500）')
+    parser.add_argument('--no-cache', action='store_true', help='不读取也不写入构建缓存')
+    parser.add_argument('--rebuild', action='store_true', help='忽略已有构建缓存，重新提取所有文档')
+    parser.add_argument('--cache-dir', default='.easydoc-cache', help='构建缓存目录')
+    parser.add_argument('--jobs', type=int, default=1, help='并行处理文档的线程数，0 表示使用全部 CPU 核心')
+    parser.add_argument('--watch', action='store_true', help='构建完成后持续监听文档和配置文件变化，增量更新输出')
+    parser.add_argument('--watch-interval', type=float, default=0.5, help='监听模式的轮询间隔（秒）')
+    parser.add_argument('--profile', action='store_true', help='记录各构建阶段的耗时和次数，并列出最慢的文件')
+    parser.add_argument('--profile-top', type=int, default=10, help='性能分析中列出的最慢文件数')
+    parser.add_argument('--profile-trace', help='将性能分析结果写入 Chrome 跟踪格式的 JSON 文件（隐含 --profile）')
+    parser.add_argument('--host', default='127.0.0.1', help='预览服务器监听地址')
+    parser.add_argument('--port', type=int, default=8000, help='预览服务器端口')
     parser.add_argument('-y', '--yes', action='store_true', help='自动确认所有提示，不询问')
     parser.add_argument('--package', action='store_true', help='创建更新包，打包指定文件为zip格式')
     parser.add_argument('--package-output', default='EasyDocument-update.zip', help='更新包输出路径')
@@ -668,8 +2872,7 @@ def main():
             create_initial_package(args.initial_package_output)
             return
         elif args.package_all:
-            create_update_package(args.package_output)
-            create_initial_package(args.initial_package_output)
+            create_all_packages(args.package_output, args.initial_package_output)
             return
     
     # 检查是否有已存在的path.json文件且是否在没有使用任何参数的情况下运行
@@ -697,97 +2900,17 @@ def main():
         else:
             print("\n自动确认模式：继续执行，但不会合并现有结构...\n")
     
-    # 尝试从配置文件中提取配置
-    config = DEFAULT_CONFIG.copy()
-    if os.path.exists(args.config):
-        try:
-            with open(args.config, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # 移除注释以简化解析
-                content_no_comments = re.sub(r'//.*', '', content)
-                content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-
-                # 提取 site 对象内容
-                site_match = re.search(r'site:\s*{([^}]+)}', content_no_comments, re.DOTALL)
-                if site_match:
-                    site_config = site_match.group(1)
-                    # 提取 site 内的具体字段
-                    title_match = re.search(r'title:\s*["\'](.*?)["\']', site_config)
-                    if title_match: config["site"]["title"] = title_match.group(1)
-                    
-                    desc_match = re.search(r'description:\s*["\'](.*?)["\']', site_config)
-                    if desc_match: config["site"]["description"] = desc_match.group(1)
-                    
-                    keywords_match = re.search(r'keywords:\s*["\'](.*?)["\']', site_config)
-                    if keywords_match: config["site"]["keywords"] = keywords_match.group(1)
-                    
-                    base_url_match = re.search(r'base_url:\s*["\'](.*?)["\']', site_config)
-                    if base_url_match: config["site"]["base_url"] = base_url_match.group(1)
-
-                # 提取 appearance 对象内容
-                appearance_match = re.search(r'appearance:\s*{([^}]+)}', content_no_comments, re.DOTALL)
-                if appearance_match:
-                    appearance_config = appearance_match.group(1)
-                    # 提取 appearance 内的具体字段
-                    favicon_match = re.search(r'favicon:\s*["\'](.*?)["\']', appearance_config)
-                    if favicon_match: config["appearance"]["favicon"] = favicon_match.group(1)
-                    
-                    # 添加 logo 和 theme_color 的提取
-                    logo_match = re.search(r'logo:\s*["\'](.*?)["\']', appearance_config)
-                    if logo_match: config["appearance"]["logo"] = logo_match.group(1)
-                    
-                    theme_color_match = re.search(r'theme_color:\s*["\'](.*?)["\']', appearance_config)
-                    if theme_color_match: config["appearance"]["theme_color"] = theme_color_match.group(1)
-
-                # 提取 document 对象内容 (主要为了 root_dir)
-                document_match = re.search(r'document:\s*{([^}]+)}', content_no_comments, re.DOTALL)
-                if document_match:
-                    doc_config = document_match.group(1)
-                    root_dir_match = re.search(r'root_dir:\s*[\'"]([^\'"]+)[\'"]', doc_config)
-                    if root_dir_match:
-                        config["root_dir"] = root_dir_match.group(1)
-                    
-                    branch_support_match = re.search(r'branch_support:\s*(true|false)', doc_config, re.IGNORECASE)
-                    if branch_support_match:
-                        config["branch_support"] = branch_support_match.group(1).lower() == 'true'
-
-                git_match = re.search(r'git:\s*{([^}]+)}', content_no_comments, re.DOTALL)
-                if git_match:
-                    git_config = git_match.group(1)
-                    enable_match = re.search(r'enable:\s*(true|false)', git_config, re.IGNORECASE)
-                    if enable_match:
-                        config["git"]["enable"] = enable_match.group(1).lower() == 'true'
-                    last_modified_match = re.search(
-                        r'show_last_modified:\s*(true|false)', git_config, re.IGNORECASE
-                    )
-                    if last_modified_match:
-                        config["git"]["show_last_modified"] = (
-                            last_modified_match.group(1).lower() == 'true'
-                        )
-                    contributors_match = re.search(
-                        r'show_contributors:\s*(true|false)', git_config, re.IGNORECASE
-                    )
-                    if contributors_match:
-                        config["git"]["show_contributors"] = (
-                            contributors_match.group(1).lower() == 'true'
-                        )
-
-                github_match = re.search(r'github:\s*{([^}]+)}', content_no_comments, re.DOTALL)
-                if github_match:
-                    github_config = github_match.group(1)
-                    enable_match = re.search(r'enable:\s*(true|false)', github_config, re.IGNORECASE)
-                    if enable_match:
-                        config["github"]["enable"] = enable_match.group(1).lower() == 'true'
-                    edit_link_match = re.search(r'edit_link:\s*(true|false)', github_config, re.IGNORECASE)
-                    if edit_link_match:
-                        config["github"]["edit_link"] = edit_link_match.group(1).lower() == 'true'
-                    avatar_match = re.search(r'show_avatar:\s*(true|false)', github_config, re.IGNORECASE)
-                    if avatar_match:
-                        config["github"]["show_avatar"] = avatar_match.group(1).lower() == 'true'
+    global BUILD_PROFILER
+    if args.profile or args.profile_trace:
+        BUILD_PROFILER = BuildProfiler(trace=bool(args.profile_trace))
 
-        except Exception as e:
-            print(f"读取配置文件失败: {e}")
+    # 解析配置文件（完整配置按内容哈希缓存，构建配置为独立副本，不会修改 DEFAULT_CONFIG）
+    try:
+        site_config = load_site_config(args.config)
+    except (ValueError, UnicodeDecodeError) as e:
+        print(f"读取配置文件失败: {e}")
+        site_config = FrozenDict()
+    config = resolve_build_config(site_config)
     
     # 命令行参数覆盖配置文件
     if args.root:
@@ -797,7 +2920,25 @@ def main():
         config["git"]["enable"] = False
     if args.no_github:
         config["github"]["enable"] = False
+    if args.git_follow_renames:
+        config["git"]["follow_renames"] = True
+    if args.github_api_url:
+        config["github"]["api_base_url"] = args.github_api_url
+    if args.author_map:
+        config["github"]["author_map"] = args.author_map
+    if args.tokenizer:
+        config["search"]["tokenizer"] = args.tokenizer
+    if args.keyword_scoring:
+        config["search"]["keyword_scoring"] = args.keyword_scoring
+    # 之后各目录、各线程共享同一份不可修改的配置
+    config = freeze_config(config)
     
+    try:
+        size_budgets = parse_size_budgets(args.size_budget)
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
     root_dir = config["root_dir"]
     if not os.path.exists(root_dir):
         print(f"错误: 文档根目录 {root_dir} 不存在")
@@ -824,21 +2965,78 @@ def main():
         except Exception as e:
             print(f"Git 初始化错误: {e}")
 
+    global BUILD_CACHE
+    head = None
+    if repo:
+        try:
+            head = repo.head.commit.hexsha
+        except Exception:
+            head = None
+    # --no-cache 时只使用内存缓存，不读取也不写入缓存文件
+    BUILD_CACHE = BuildCache(None if args.no_cache else args.cache_dir, get_config_fingerprint(config), head)
+    if args.rebuild:
+        print("重建模式：忽略已有构建缓存")
+    else:
+        BUILD_CACHE.load()
+
+    global GITHUB_USER_RESOLVER
+    GITHUB_USER_RESOLVER = GitHubUserResolver(
+        config["github"].get("api_base_url", "https://api.github.com"),
+        cache_path=None if args.no_cache else os.path.join(args.cache_dir, "github-users.json"),
+        ttl=args.github_cache_ttl * 3600,
+        max_workers=args.github_concurrency,
+    ).load()
+
     def should_write_git_metadata(cfg):
         return GIT_AVAILABLE and cfg.get("git", {}).get("enable", True) and not args.no_git
 
+    server = None
+    if args.command == 'serve':
+        # 预览时 path.json 只保存在内存中，合并磁盘上已有的结构以保留手动排序和自定义字段
+        args.merge = True
+        try:
+            server = PreviewServer((args.host, args.port), os.curdir)
+        except OSError as e:
+            print(f"错误: 无法在 {args.host}:{args.port} 启动预览服务器: {e}")
+            sys.exit(1)
+
+    brotli = None
+    if args.precompress or args.size_report or size_budgets:
+        brotli = load_brotli()
+        if brotli is None and args.precompress:
+            print("未安装 brotli（pip install brotli），只生成 .gz 压缩文件")
+
+    markdown_renderer = None
+    if args.prerender:
+        markdown_renderer = load_markdown_renderer()
+        if markdown_renderer is None:
+            print("警告: 未安装 markdown-it-py（pip install markdown-it-py），跳过预渲染")
+
+    def dump_json(value):
+        """按 --minify 序列化 JSON 产物"""
+        with profile_phase("json"):
+            if args.minify:
+                return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+            return json.dumps(value, ensure_ascii=False, indent=4)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    if executor:
+        print(f"并行处理文档: {jobs} 个线程")
+
     # 处理流程
-    def process_dir(current_root, output_json, search_json):
+    def scan_dir(current_root):
+        """扫描目录结构并规范化路径"""
         print(f"处理目录: {current_root}")
-        # 扫描目录结构
-        # 需要克隆配置并临时修改 root_dir 供 build_search_tree 使用
-        local_config = config.copy()
-        local_config["root_dir"] = current_root
-        
-        structure = scan_directory(current_root, local_config, repo=repo)
+        # 需要以当前目录作为 root_dir 供 build_search_tree 使用
+        local_config = FrozenDict(config, root_dir=current_root)
+        with profile_phase("scan", root=current_root):
+            structure = scan_directory(current_root, local_config, repo=repo, executor=executor)
+        return normalize_paths(structure)
 
-        # 规范化路径
-        structure = normalize_paths(structure)
+    def finish_dir(current_root, output_json, search_json, structure):
+        """合并已有结构并写出结果，返回最终结构和写出的文件"""
+        local_config = FrozenDict(config, root_dir=current_root)
 
         if not should_write_git_metadata(local_config):
             structure = strip_git_fields(structure)
@@ -846,53 +3044,749 @@ def main():
         # 如果需要合并已有结构
         if args.merge and os.path.exists(output_json):
             print(f"合并已有的JSON文件: {output_json}")
-            existing = load_existing_structure(output_json)
-            if existing:
-                structure = merge_structures(existing, structure, local_config)
+            with profile_phase("merge", root=current_root):
+                existing = load_existing_structure(output_json)
+                if existing:
+                    structure = merge_structures(existing, structure, local_config)
 
         if not should_write_git_metadata(local_config):
             structure = strip_git_fields(structure)
-        
-        # 保存路径结构
-        with open(output_json, 'w', encoding='utf-8') as f:
-            json.dump(structure, f, ensure_ascii=False, indent=4)
-        
+
+        return structure, write_outputs(structure, local_config, output_json, search_json)
+
+    def directory_inputs(current_root, output_json, search_json):
+        """目录的构建输入指纹：文档文件的 (mtime, 大小)、HEAD 及影响输出的命令行选项（配置已包含在缓存指纹中）"""
+        digest = hashlib.sha1()
+        options = [output_json, search_json, args.merge, args.no_search, args.search_inverted, args.search_shards,
+                   args.search_shard_size, args.search_full_text, args.search_shared_corpus, args.minify,
+                   args.precompress, args.git_sidecar, args.toc, args.link_graph, args.prefetch_count,
+                   bool(markdown_renderer), BUILD_CACHE.head]
+        digest.update(json.dumps(options).encode('utf-8'))
+        snapshot = snapshot_sources(current_root, config)
+        for path in sorted(snapshot):
+            digest.update(f"{os.path.relpath(path, current_root)}\0{snapshot[path]}\0".encode('utf-8'))
+        return digest.hexdigest()
+
+    def write_search_corpus():
+        """合并各文档根目录引用的摘要，写出共享搜索语料（内容未变化时不重写）"""
+        corpus = {}
+        for part in corpus_parts.values():
+            corpus.update(part)
+        content = json.dumps(dict(sorted(corpus.items())), ensure_ascii=False, separators=(',', ':'))
+        if server:
+            server.publish({corpus_path: content.encode('utf-8')})
+            return
+        siblings = {".gz": args.precompress, ".br": args.precompress and brotli is not None}
+        if os.path.exists(corpus_path) and all(os.path.exists(corpus_path + suffix) == enabled
+                                               for suffix, enabled in siblings.items()):
+            with open(corpus_path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return
+        print(f"构建共享搜索语料: {corpus_path} (去重前 {sum(len(part) for part in corpus_parts.values())} 条摘要, 去重后 {len(corpus)} 条)")
+        write_artifact(corpus_path, content, args.precompress, brotli)
+
+    def process_dirs(dirs):
+        """
+        处理一组文档根目录 [(目录, 输出文件, 搜索索引文件), ...]，返回各目录的最终结构。
+        输入和输出都未变化的目录直接读取已有的 path.json；其余目录并行扫描，
+        共享 Git 历史索引，并统一解析所有目录中的 GitHub 头像后再并行合并、写出
+        """
+        structures = {}
+        pending = []
+        existing_corpus = None
+        for current_root, output_json, search_json in dirs:
+            # serve 模式的输出只在内存中，不能跳过
+            inputs = None if server else directory_inputs(current_root, output_json, search_json)
+            unchanged = BUILD_CACHE.unchanged_outputs(output_json, inputs) if inputs else None
+            if unchanged is not None:
+                structure = load_existing_structure(output_json)
+                if structure is not None and args.git_sidecar:
+                    # 填回 git 字段，监听模式增量更新时才能重新拆分出完整的附属文件
+                    structure = restore_git_metadata(structure, os.path.dirname(output_json))
+                if structure is not None and corpus_path:
+                    # 跳过的目录仍需把引用的摘要写入新的共享语料
+                    if existing_corpus is None:
+                        existing_corpus = load_existing_structure(corpus_path) or {}
+                    corpus_parts[current_root] = restore_search_corpus(search_json, existing_corpus)
+                    if corpus_parts[current_root] is None:
+                        structure = None
+                if structure is not None:
+                    print(f"输入未变化，跳过: {current_root}")
+                    BUILD_CACHE.retain(current_root)
+                    structures[current_root] = structure
+                    outputs[current_root] = unchanged
+                    continue
+            pending.append((current_root, output_json, search_json, inputs))
+        if not pending:
+            return structures
+
+        # 各目录的文档处理已使用 executor，目录级任务使用单独的线程池以免互相等待
+        dir_executor = ThreadPoolExecutor(max_workers=min(jobs, len(pending))) if jobs > 1 and len(pending) > 1 else None
+        run = dir_executor.map if dir_executor else map
+        try:
+            scanned = list(run(lambda item: scan_dir(item[0]), pending))
+            if repo and config.get("github", {}).get("enable", True):
+                fill_github_avatars(*scanned)
+            results = list(run(lambda item: finish_dir(item[0][0], item[0][1], item[0][2], item[1]),
+                               zip(pending, scanned)))
+        finally:
+            if dir_executor:
+                dir_executor.shutdown()
+
+        for (current_root, output_json, search_json, inputs), (structure, written) in zip(pending, results):
+            if inputs:
+                BUILD_CACHE.record_outputs(output_json, inputs, written)
+            structures[current_root] = structure
+            outputs[current_root] = written
+        return structures
+
+    def prepare_scanned(structure, local_config):
+        """对新扫描的结构做与 process_dir 相同的处理：规范化路径、填充头像、按需移除 git 字段"""
+        structure = normalize_paths(structure)
+        if repo and local_config.get("github", {}).get("enable", True):
+            fill_github_avatars(structure)
+        if not should_write_git_metadata(local_config):
+            structure = strip_git_fields(structure)
+        return structure
+
+    def write_outputs(structure, local_config, output_json, search_json):
+        """写出 path.json 和搜索索引，返回写出的文件；serve 模式下只保存在预览服务器的内存中"""
+        # 输出文件路径 -> 内容
+        files = {output_json: dump_json(structure)}
+        # 需要整体替换的输出目录（分片索引、git 附属文件、预渲染片段）
+        replace_dirs = []
+
+        if args.git_sidecar:
+            navigation, sidecar_files = split_git_metadata(structure)
+            files[output_json] = dump_json(navigation)
+            sidecar_dir = os.path.join(os.path.dirname(output_json), GIT_META_DIR)
+            if server:
+                files.update({os.path.join(sidecar_dir, filename): content for filename, content in sidecar_files.items()})
+                replace_dirs.append(sidecar_dir)
+            elif sidecar_files or os.path.isdir(sidecar_dir):
+                write_hashed_files(sidecar_dir, sidecar_files, args.precompress, brotli)
+
         # 构建搜索索引
         if not args.no_search:
             print(f"构建搜索索引: {search_json}")
-            search_tree = build_search_tree(structure, local_config)
-            with open(search_json, 'w', encoding='utf-8') as f:
-                json.dump(search_tree, f, ensure_ascii=False, indent=4)
-        
+            with profile_phase("search", root=local_config["root_dir"]):
+                search_tree = build_search_tree(structure, local_config, executor=executor)
+
+                if args.search_inverted or args.search_shards:
+                    inverted_index = build_inverted_index(search_tree, local_config, executor=executor,
+                                                          full_text=args.search_full_text)
+
+            if args.search_inverted:
+                inverted_json = os.path.join(os.path.dirname(search_json), 'search-index.json')
+                print(f"构建倒排搜索索引: {inverted_json}")
+                with profile_phase("json", output=inverted_json):
+                    files[inverted_json] = json.dumps(inverted_index, ensure_ascii=False, separators=(',', ':'))
+
+            if args.search_shards:
+                shards_dir = os.path.join(os.path.dirname(search_json), 'search-shards')
+                manifest, shard_files = render_search_shards(inverted_index, max(1, args.search_shard_size) * 1024,
+                                                             minify=args.minify)
+                if server:
+                    files.update({os.path.join(shards_dir, filename): content for filename, content in shard_files.items()})
+                    replace_dirs.append(shards_dir)
+                else:
+                    write_hashed_files(shards_dir, shard_files, args.precompress, brotli)
+                print(f"构建分片搜索索引: {shards_dir} ({len(manifest['terms'])} 个词项分片, {len(manifest['docs'])} 个文档分片)")
+
+            if corpus_path:
+                search_tree, corpus_parts[local_config["root_dir"]] = split_search_corpus(search_tree)
+            files[search_json] = dump_json(search_tree)
+
+        if args.toc:
+            toc_json = os.path.join(os.path.dirname(output_json), 'toc.json')
+            print(f"构建标题大纲: {toc_json}")
+            toc_index = build_toc_index(structure, local_config)
+            with profile_phase("json", output=toc_json):
+                files[toc_json] = json.dumps(toc_index, ensure_ascii=False, separators=(',', ':'))
+
+        if args.link_graph:
+            links_json = os.path.join(os.path.dirname(output_json), 'links.json')
+            print(f"构建链接图: {links_json}")
+            link_graph, broken_links = build_link_graph(structure, local_config, max(0, args.prefetch_count))
+            files[links_json] = json.dumps(link_graph, ensure_ascii=False, separators=(',', ':'))
+            if broken_links:
+                print(f"警告: {local_config['root_dir']} 中有 {len(broken_links)} 个断开的链接:")
+                for source, href, reason in broken_links:
+                    print(f"  {source}: {href} ({reason})")
+
+        if markdown_renderer:
+            prerender_dir = os.path.join(os.path.dirname(output_json), PRERENDER_DIR)
+            prerender_files = prerender_documents(structure, local_config, markdown_renderer, executor=executor)
+            if server:
+                files.update({os.path.join(prerender_dir, filename): content for filename, content in prerender_files.items()})
+                replace_dirs.append(prerender_dir)
+            else:
+                write_hashed_files(prerender_dir, prerender_files, args.precompress, brotli)
+            print(f"预渲染文档: {prerender_dir} ({len(prerender_files) - 1} 个 HTML 片段)")
+
+        if server:
+            server.publish({path: content.encode('utf-8') for path, content in files.items()}, replace_dirs)
+            return []
+        for path, content in files.items():
+            write_artifact(path, content, args.precompress, brotli)
+        written = list(files)
+        if args.git_sidecar:
+            written.extend(os.path.join(sidecar_dir, filename) for filename in sidecar_files)
+        if not args.no_search and args.search_shards:
+            written.extend(os.path.join(shards_dir, filename) for filename in shard_files)
+        if markdown_renderer:
+            written.extend(os.path.join(prerender_dir, filename) for filename in prerender_files)
+        return written
+
+    def refresh_dir(current_root, output_json, search_json, structure, changed_paths):
+        """监听模式下文档变化后，只重新扫描受影响的目录并写出结果"""
+        local_config = FrozenDict(config, root_dir=current_root)
+        for rel_dir in affected_directories(current_root, changed_paths):
+            structure = patch_structure(
+                structure, rel_dir, local_config, repo, args.merge,
+                lambda scanned: prepare_scanned(scanned, local_config),
+            )
+        write_outputs(structure, local_config, output_json, search_json)
         return structure
 
     # 根据是否启用分支支持来执行
     total_files = 0
     total_dirs = 0
+    # 各文档根目录的 (输出文件, 搜索索引文件, 当前结构)，供监听模式增量更新
+    targets = {}
     
     if branches_to_process:
         print(f"将为 {len(branches_to_process)} 个分支生成数据文件...")
+        dirs = []
         for branch in branches_to_process:
             branch_dir = os.path.join(root_dir, branch)
-            branch_output = os.path.join(branch_dir, 'path.json')
-            branch_search = os.path.join(branch_dir, 'search.json')
-            
-            structure = process_dir(branch_dir, branch_output, branch_search)
-            total_files += count_files(structure)
-            total_dirs += count_dirs(structure)
+            dirs.append((branch_dir, os.path.join(branch_dir, 'path.json'), os.path.join(branch_dir, 'search.json')))
     else:
         # 单根目录模式
-        structure = process_dir(root_dir, args.output, args.search_index)
-        total_files = count_files(structure)
-        total_dirs = count_dirs(structure)
-    
+        dirs = [(root_dir, args.output, args.search_index)]
+
+    # 共享搜索语料：各分支 search.json 中的摘要去重后统一保存，条目按内容哈希引用
+    corpus_path = None
+    if args.search_shared_corpus and not args.no_search:
+        corpus_path = os.path.join(root_dir if branches_to_process else os.path.dirname(args.search_index),
+                                   'search-corpus.json')
+    # 文档根目录 -> 该目录 search.json 引用的 {哈希: 摘要}
+    corpus_parts = {}
+    # 文档根目录 -> 本次构建写出（或跳过时上次写出）的产物文件
+    outputs = {}
+
+    structures = process_dirs(dirs)
+    if corpus_path:
+        write_search_corpus()
+    for current_root, output_json, search_json in dirs:
+        structure = structures[current_root]
+        targets[current_root] = [output_json, search_json, structure]
+        total_files += count_files(structure)
+        total_dirs += count_dirs(structure)
+
     # 更新HTML元数据
     html_files_to_update = glob.glob('*.html')
     html_files_to_update.extend(glob.glob('main/*.html'))
-    update_html_metadata(html_files_to_update, config)
+    # 入口模块 -> 打包后的文件名；打包的源模块不再由页面直接加载，不需要预缓存
+    bundles = {}
+    bundled_modules = set()
+    if args.bundle:
+        if server:
+            # 预览页面注入的热更新脚本需要与页面共享同一份未打包的模块
+            print("预览模式不打包脚本")
+        else:
+            with profile_phase("bundle"):
+                bundles, bundled_modules = bundle_scripts(html_files_to_update, args.precompress, brotli)
+    with profile_phase("html"):
+        update_html_metadata(html_files_to_update, config, bundles)
+
+    def write_service_worker():
+        """按当前文件内容重新生成 sw.js（预览服务器不使用 Service Worker，避免页面读取缓存的旧文件）"""
+        if not os.path.exists(SERVICE_WORKER_TEMPLATE):
+            print(f"警告: 未找到 Service Worker 模板 {SERVICE_WORKER_TEMPLATE}，跳过生成 {SERVICE_WORKER_OUTPUT}")
+            return
+        with open(SERVICE_WORKER_TEMPLATE, 'r', encoding='utf-8') as f:
+            template = f.read()
+        content, count = render_service_worker(template, collect_precache_files(root_dir, config, bundles, bundled_modules))
+        write_artifact(SERVICE_WORKER_OUTPUT, content, args.precompress, brotli)
+        print(f"生成 Service Worker: {SERVICE_WORKER_OUTPUT} (预缓存 {count} 个文件)")
+
+    if args.service_worker:
+        if server:
+            print("预览模式不生成 Service Worker")
+        else:
+            write_service_worker()
+
+    GITHUB_USER_RESOLVER.save()
+
+    if not args.no_cache:
+        BUILD_CACHE.save()
+        duplicates = BUILD_CACHE.count_duplicates()
+        print(f"构建缓存: 命中 {BUILD_CACHE.hits} 项, 重新计算 {BUILD_CACHE.misses} 项"
+              + (f", {duplicates} 个文件与其他文件内容相同" if duplicates else ""))
     
     print(f"文档扫描完成: 共 {total_files} 个文件, {total_dirs} 个目录")
 
+    if BUILD_PROFILER:
+        BUILD_PROFILER.report(args.profile_top)
+        if args.profile_trace:
+            BUILD_PROFILER.write_trace(args.profile_trace)
+
+    # serve 模式的产物只在内存中，不生成大小报告
+    if (args.size_report or size_budgets) and not server:
+        groups = []
+        for current_root, _, _ in dirs:
+            artifacts = []
+            # 搜索索引分片、git 附属文件和预渲染片段按目录合并为一行
+            hashed = {}
+            for path in outputs.get(current_root, []):
+                parent = os.path.dirname(path)
+                if os.path.basename(parent) in ('search-shards', GIT_META_DIR, PRERENDER_DIR) and os.path.basename(path) != 'manifest.json':
+                    hashed.setdefault(parent, []).append(path)
+                else:
+                    artifacts.append((os.path.basename(path), path.replace(os.sep, '/'), [path]))
+            for parent, paths in hashed.items():
+                artifacts.append((os.path.basename(parent), parent.replace(os.sep, '/') + '/*', paths))
+            groups.append((current_root.replace(os.sep, '/'), artifacts))
+        if corpus_path and os.path.exists(corpus_path):
+            groups.append((root_dir, [('search-corpus.json', corpus_path.replace(os.sep, '/'), [corpus_path])]))
+
+        violations = report_artifact_sizes(groups, size_budgets, brotli)
+        if violations:
+            print("错误: 构建产物超出大小预算:")
+            for violation in violations:
+                print(f"  {violation}")
+            if not args.watch:
+                sys.exit(1)
+
+    if server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"预览服务器已启动: http://{args.host}:{server.server_address[1]}/ "
+              f"(压缩: {'brotli, gzip' if server.brotli else 'gzip'})")
+
+    if args.watch or server:
+        def on_change(changed_paths):
+            if os.path.abspath(args.config) in changed_paths:
+                # 配置变化可能影响所有输出，重新启动完整构建
+                print(f"检测到 {args.config} 变化，重新构建...")
+                GITHUB_USER_RESOLVER.save()
+                if not args.no_cache:
+                    BUILD_CACHE.save()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+
+            start = time.perf_counter()
+            BUILD_CACHE.revalidate()
+            for current_root, target in targets.items():
+                prefix = os.path.join(os.path.abspath(current_root), "")
+                root_changes = {path for path in changed_paths if path.startswith(prefix)}
+                if root_changes:
+                    target[2] = refresh_dir(current_root, target[0], target[1], target[2], root_changes)
+                    if server:
+                        # 通知页面清除变化文档的缓存（前端以相对文档根目录的路径作为缓存键）
+                        server.notify(sorted(os.path.relpath(path, current_root).replace(os.sep, '/')
+                                             for path in root_changes))
+            if corpus_path:
+                write_search_corpus()
+            if args.service_worker and not server:
+                write_service_worker()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"已更新 {len(changed_paths)} 个变化的文件 ({elapsed:.0f} ms)")
+
+        print(f"监听文档变化: {root_dir}（按 Ctrl+C 退出）")
+        watch_sources(root_dir, config, [args.config], args.watch_interval, on_change)
+        GITHUB_USER_RESOLVER.save()
+        if not args.no_cache:
+            BUILD_CACHE.save()
+
+    if server:
+        server.shutdown()
+        server.server_close()
+
+    if executor:
+        executor.shutdown()
+
+def snapshot_sources(root_dir, config, extra_files=()):
+    """记录文档目录中所有受支持文件及额外文件的 (mtime, 大小)，用于轮询检测变化"""
+    paths = list(extra_files)
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        # 与 scan_directory 一致，跳过隐藏目录
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        paths.extend(os.path.join(dirpath, filename) for filename in filenames if is_supported_file(filename, config))
+
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        snapshot[os.path.abspath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def watch_sources(root_dir, config, extra_files, interval, on_change):
+    """轮询文档目录，检测到新增、修改或删除的文件时以变化文件的绝对路径集合调用 on_change，按 Ctrl+C 退出"""
+    snapshot = snapshot_sources(root_dir, config, extra_files)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_sources(root_dir, config, extra_files)
+            if current == snapshot:
+                continue
+            changed = {path for path in set(snapshot) | set(current) if snapshot.get(path) != current.get(path)}
+            snapshot = current
+            try:
+                on_change(changed)
+            except Exception as e:
+                print(f"增量更新失败: {e}")
+    except KeyboardInterrupt:
+        print("\n停止监听")
+
+def affected_directories(current_root, changed_paths):
+    """根据变化的文件计算需要重新扫描的目录（相对路径），已被上级目录覆盖的子目录不重复扫描"""
+    dirs = set()
+    for path in changed_paths:
+        rel_dir = os.path.relpath(os.path.dirname(path), os.path.abspath(current_root))
+        dirs.add("" if rel_dir == "." else rel_dir.replace("\\", "/"))
+    result = []
+    for rel_dir in sorted(dirs, key=lambda d: (d.count("/"), d)):
+        if not any(rel_dir == parent or rel_dir.startswith(parent + "/") or parent == "" for parent in result):
+            result.append(rel_dir)
+    return result
+
+def find_directory_node(structure, rel_dir):
+    """按相对路径在结构中查找目录节点，不存在时返回 None"""
+    node = structure
+    parts = rel_dir.split("/")
+    for depth in range(1, len(parts) + 1):
+        prefix = "/".join(parts[:depth])
+        node = next((child for child in node.get("children", [])
+                     if child.get("path") == prefix and "index" in child), None)
+        if node is None:
+            return None
+    return node
+
+def patch_structure(structure, rel_dir, config, repo, merge, prepare):
+    """
+    重新扫描 rel_dir 目录子树并替换到结构中对应的节点，merge 为 True 时与已有节点合并，
+    保留手动排序和标题（与 --merge 相同）。目录在结构中尚不存在（新目录）或扫描结果为空
+    （目录被删除或清空）时改为处理上级目录。prepare 对新扫描的子树做规范化等处理
+    """
+    while True:
+        node = find_directory_node(structure, rel_dir) if rel_dir else structure
+        directory = os.path.join(config["root_dir"], rel_dir)
+        scanned = None
+        if node is not None and os.path.isdir(directory):
+            scanned = scan_directory(directory, config, rel_dir.replace("/", os.sep), repo)
+        if rel_dir and (scanned is None or not (scanned["children"] or scanned["index"])):
+            rel_dir = rel_dir.rsplit("/", 1)[0] if "/" in rel_dir else ""
+            continue
+        scanned = prepare(scanned)
+        patched = merge_structures(node, scanned, config) if merge else scanned
+        if not rel_dir:
+            return patched
+        node.clear()
+        node.update(patched)
+        return structure
+
+# 本地预览服务器（build.py serve）
+PREVIEW_EVENTS_PATH = "/__easydoc/events"
+# 注入到预览页面的热更新脚本
+PREVIEW_CLIENT_SCRIPT = b'<script type="module" src="/assets/js/live-reload.js"></script>'
+PREVIEW_CONTENT_TYPES = {
+    ".html": "text/html",
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".json": "application/json",
+    ".css": "text/css",
+    ".md": "text/markdown",
+    ".svg": "image/svg+xml",
+}
+# 启用压缩的 MIME 类型前缀及最小大小（字节）
+PREVIEW_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+PREVIEW_COMPRESS_MIN_SIZE = 256
+# 超过该大小的文件不缓存在内存中
+PREVIEW_CACHE_MAX_SIZE = 8 * 1024 * 1024
+# SSE 连接的心跳间隔（秒）
+PREVIEW_PING_INTERVAL = 15
+
+def load_brotli():
+    """导入可选依赖 brotli（pip install brotli），未安装时返回 None"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+def preview_content_type(path):
+    """根据扩展名返回 Content-Type，文本类型附带 utf-8 编码"""
+    extension = os.path.splitext(path)[1].lower()
+    content_type = PREVIEW_CONTENT_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith(PREVIEW_COMPRESSIBLE_TYPES) and content_type != "image/svg+xml":
+        content_type += "; charset=utf-8"
+    return content_type
+
+def inject_preview_client(body):
+    """在 HTML 的 </body> 前插入热更新脚本，没有 </body> 时追加到末尾"""
+    position = body.lower().rfind(b"</body>")
+    if position == -1:
+        return body + PREVIEW_CLIENT_SCRIPT
+    return body[:position] + PREVIEW_CLIENT_SCRIPT + body[position:]
+
+class PreviewResource:
+    """预览服务器返回的资源：内容、ETag、修改时间，以及按需生成并缓存的压缩版本"""
+
+    def __init__(self, body, mtime, content_type, key=None):
+        self.body = body
+        self.mtime = mtime
+        self.content_type = content_type
+        # 磁盘文件的 (mtime_ns, 大小)，用于判断缓存是否过期
+        self.key = key
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        self.encoded = {}
+        self.lock = threading.Lock()
+
+    def compressible(self):
+        return len(self.body) >= PREVIEW_COMPRESS_MIN_SIZE and self.content_type.startswith(PREVIEW_COMPRESSIBLE_TYPES)
+
+    def encoded_etag(self, encoding):
+        """不同编码的内容使用不同的 ETag"""
+        return self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+
+    def encode(self, encoding, brotli=None):
+        """返回指定编码（identity、gzip 或 br）的内容"""
+        if encoding == "identity":
+            return self.body
+        with self.lock:
+            if encoding not in self.encoded:
+                if encoding == "br":
+                    self.encoded[encoding] = brotli.compress(self.body)
+                else:
+                    self.encoded[encoding] = gzip.compress(self.body, mtime=0)
+            return self.encoded[encoding]
+
+class PreviewServer(ThreadingHTTPServer):
+    """
+    本地预览服务器：以 directory 为站点根目录提供静态文件，支持 ETag/Last-Modified 条件请求和
+    gzip/brotli 压缩协商，文件内容及压缩结果按 (mtime, 大小) 缓存在内存中。
+    构建生成的 path.json 和搜索索引不写入磁盘，而是通过 publish 保存在内存中；
+    文档变化后通过 notify 以 SSE 推送给页面
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, directory):
+        super().__init__(address, PreviewRequestHandler)
+        self.directory = os.path.abspath(directory)
+        self.brotli = load_brotli()
+        # 每次启动不同，页面重新连接后据此判断服务器是否已重启（如 config.js 变化）
+        self.build_id = f"{os.getpid()}-{time.time_ns()}"
+        self.lock = threading.Lock()
+        # 绝对路径 -> PreviewResource：构建输出和磁盘文件缓存
+        self.generated = {}
+        self.files = {}
+        # 已连接页面的消息队列
+        self.clients = set()
+
+    def publish(self, files, replace_dirs=()):
+        """用新生成的内容替换内存中的构建输出，replace_dirs 下未出现在 files 中的旧输出一并移除"""
+        now = time.time()
+        with self.lock:
+            generated = dict(self.generated)
+            for directory in replace_dirs:
+                prefix = os.path.join(os.path.abspath(directory), "")
+                for path in [path for path in generated if path.startswith(prefix)]:
+                    del generated[path]
+            for path, body in files.items():
+                path = os.path.abspath(path)
+                resource = PreviewResource(body, now, preview_content_type(path))
+                current = self.generated.get(path)
+                # 内容未变化时保留原资源，页面的条件请求仍然命中
+                generated[path] = current if current and current.etag == resource.etag else resource
+            self.generated = generated
+
+    def resource(self, path):
+        """返回路径对应的资源，优先使用内存中的构建输出；文件不存在时返回 None"""
+        with self.lock:
+            resource = self.generated.get(path) or self.files.get(path)
+        try:
+            info = os.stat(path)
+        except OSError:
+            return resource if resource is not None and resource.key is None else None
+        if resource is not None and (resource.key is None or resource.key == (info.st_mtime_ns, info.st_size)):
+            return resource
+        if not os.path.isfile(path):
+            return None
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type = preview_content_type(path)
+        if content_type.startswith("text/html"):
+            body = inject_preview_client(body)
+        resource = PreviewResource(body, info.st_mtime, content_type, (info.st_mtime_ns, info.st_size))
+        if info.st_size <= PREVIEW_CACHE_MAX_SIZE:
+            with self.lock:
+                self.files[path] = resource
+        return resource
+
+    def subscribe(self):
+        events = queue.Queue()
+        with self.lock:
+            self.clients.add(events)
+        return events
+
+    def unsubscribe(self, events):
+        with self.lock:
+            self.clients.discard(events)
+
+    def notify(self, docs):
+        """通知所有页面文档已变化，docs 为变化文档相对文档根目录的路径"""
+        message = f"event: change\ndata: {json.dumps({'docs': docs}, ensure_ascii=False)}\n\n"
+        with self.lock:
+            for events in self.clients:
+                events.put(message)
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    """预览服务器的请求处理：静态文件、条件请求、压缩协商和 SSE 变化通知"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "EasyDocument"
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def log_request(self, code='-', size='-'):
+        # 只输出失败的请求
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+    def translate_path(self, url_path):
+        """将 URL 路径转换为站点根目录下的文件路径，包含隐藏文件或目录时返回 None"""
+        path = self.server.directory
+        for part in url_path.split('/'):
+            if not part:
+                continue
+            if part.startswith('.') or os.path.dirname(part) or (os.path.altsep and os.path.altsep in part):
+                return None
+            path = os.path.join(path, part)
+        return path
+
+    def handle_request(self, send_body):
+        url = urllib.parse.urlsplit(self.path)
+        url_path = urllib.parse.unquote(url.path)
+        if url_path == PREVIEW_EVENTS_PATH:
+            self.stream_events()
+            return
+
+        file_path = self.translate_path(url_path)
+        if file_path and os.path.isdir(file_path):
+            if not url_path.endswith('/'):
+                self.send_response(301)
+                self.send_header('Location', url.path + '/' + (f'?{url.query}' if url.query else ''))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            file_path = os.path.join(file_path, 'index.html')
+
+        status = 200
+        resource = self.server.resource(file_path) if file_path else None
+        if resource is None:
+            status = 404
+            resource = self.server.resource(os.path.join(self.server.directory, '404.html'))
+            if resource is None:
+                self.send_error(404)
+                return
+
+        encoding = self.negotiate(resource)
+        etag = resource.encoded_etag(encoding)
+        if status == 200 and self.not_modified(resource, etag):
+            self.send_response(304)
+            self.send_cache_headers(resource, etag)
+            self.end_headers()
+            return
+
+        body = resource.encode(encoding, self.server.brotli)
+        self.send_response(status)
+        self.send_header('Content-Type', resource.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != "identity":
+            self.send_header('Content-Encoding', encoding)
+        self.send_cache_headers(resource, etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_cache_headers(self, resource, etag):
+        # no-cache：浏览器可以缓存，但每次使用前都通过 ETag 向服务器确认
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', email.utils.formatdate(resource.mtime, usegmt=True))
+        self.send_header('Cache-Control', 'no-cache')
+        if resource.compressible():
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def negotiate(self, resource):
+        """根据 Accept-Encoding 选择编码，优先使用 brotli"""
+        if not resource.compressible():
+            return "identity"
+        accepted = {}
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.partition(';')
+            quality = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        for encoding in ("br", "gzip"):
+            if encoding == "br" and not self.server.brotli:
+                continue
+            if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+                return encoding
+        return "identity"
+
+    def not_modified(self, resource, etag):
+        """检查 If-None-Match / If-Modified-Since，资源未变化时返回 True"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(resource.mtime) <= since
+        return False
+
+    def stream_events(self):
+        """SSE 连接：先发送服务器的 build_id，之后推送文档变化通知，空闲时定期发送心跳"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        events = self.server.subscribe()
+        try:
+            message = f"retry: 1000\nevent: hello\ndata: {json.dumps({'build': self.server.build_id})}\n\n"
+            while True:
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+                try:
+                    message = events.get(timeout=PREVIEW_PING_INTERVAL)
+                except queue.Empty:
+                    message = ": ping\n\n"
+        except OSError:
+            # 页面关闭或刷新
+            pass
+        finally:
+            self.server.unsubscribe(events)
+
 def count_files(structure):
     """计算结构中的文件总数"""
     count = 0
@@ -930,9 +3824,10 @@ def count_dirs(structure):
     
     return count
 
-def update_html_metadata(html_files, config):
+def update_html_metadata(html_files, config, bundles=None):
     """
-    根据 config.js 中的 site 和 appearance 设置更新 HTML 文件中的元数据。
+    根据 config.js 中的 site 和 appearance 设置更新 HTML 文件中的元数据，
+    并按 bundles（{入口模块: 打包后的文件名}）改写模块脚本标签（见 rewrite_module_scripts）。
     """
     site_config = config.get("site", {})
     appearance_config = config.get("appearance", {})
@@ -960,6 +3855,7 @@ def update_html_metadata(html_files, config):
                 content = re.sub(r'(<meta\s+name=["\']keywords["\']\s+content=["\'])(.*?)(["\'])', r'\g<1>' + keywords + r'\g<3>', content, flags=re.IGNORECASE | re.DOTALL)
             if favicon:
                 content = re.sub(r'(<link\s+rel=["\']icon["\']\s+href=["\'])(.*?)(["\'])', r'\g<1>' + favicon + r'\g<3>', content, flags=re.IGNORECASE | re.DOTALL)
+            content = rewrite_module_scripts(content, filepath, bundles or {})
 
             with io.open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
@@ -969,9 +3865,402 @@ def update_html_metadata(html_files, config):
         except Exception as e:
             print(f"更新HTML文件 {filepath} 时出错: {e}")
 
-def create_update_package(output_file='EasyDocument-update.zip'):
+# 页面中的模块脚本标签，以及标签的 src 属性和记录原始入口模块的 data-entry 属性
+MODULE_SCRIPT_PATTERN = re.compile(r'<script\b[^>]*\btype=["\']module["\'][^>]*>', re.IGNORECASE)
+SCRIPT_SRC_PATTERN = re.compile(r'(\ssrc=)(["\'])(.*?)\2', re.IGNORECASE)
+SCRIPT_ENTRY_PATTERN = re.compile(r'\sdata-entry=(["\'])(.*?)\1', re.IGNORECASE)
+# 模块顶层（行首）的 import / export 语句
+JS_IMPORT_PATTERN = re.compile(r'^import\s*(?:([^\'";]+?)\s*from\s*)?([\'"])([^\'"\n]+)\2[ \t]*;?', re.MULTILINE)
+JS_EXPORT_LIST_PATTERN = re.compile(r'^export\s*\{([^}]*)\}(?:\s*from\s*([\'"])([^\'"\n]+)\2)?[ \t]*;?', re.MULTILINE)
+JS_EXPORT_DEFAULT_PATTERN = re.compile(r'^export\s+default\s+(?:(?=(?:async\s+)?function\b\s*\*?\s*([\w$]+))|(?=class\s+([\w$]+)))?', re.MULTILINE)
+JS_EXPORT_DECLARATION_PATTERN = re.compile(r'^export\s+(?=(?:async\s+)?function\b\s*\*?\s*([\w$]+)|class\s+([\w$]+)|(const|let|var)\s+([\w$]+)?)', re.MULTILINE)
+JS_DYNAMIC_IMPORT_PATTERN = re.compile(r'\bimport\(\s*([\'"])([^\'"\n]+)\1\s*\)')
+JS_COMMENT_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+def parse_js_bindings(text):
+    """解析 import / export 列表 {a, b as c}，返回 [(原名, 别名)]"""
+    bindings = []
+    for item in JS_COMMENT_PATTERN.sub('', text).split(','):
+        parts = item.split()
+        if not parts:
+            continue
+        if len(parts) == 3 and parts[1] == 'as':
+            bindings.append((parts[0], parts[2]))
+        elif len(parts) == 1:
+            bindings.append((parts[0], parts[0]))
+        else:
+            raise ValueError(f"无法解析的导入导出列表: {item.strip()}")
+    return bindings
+
+def resolve_module_specifier(importer, specifier):
+    """
+    解析模块说明符：打包目录下存在的模块返回 (模块路径, None)；
+    其他模块保持外部引用，返回 (None, 从打包输出目录引用它的说明符)
+    """
+    if specifier.startswith(('./', '../')):
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+        if path.startswith(BUNDLE_SOURCE_DIR + '/') and os.path.isfile(path):
+            return path, None
+        relative = posixpath.relpath(path, BUNDLE_OUTPUT_DIR)
+        return None, relative if relative.startswith('../') else './' + relative
+    # 站点根目录的绝对路径（如 /config.js）和完整地址与脚本位置无关，保持不变
+    return None, specifier
+
+def parse_js_module(path):
+    """
+    解析打包目录下的 ES 模块，返回 {"body", "imports", "exports", "dynamic"}：
+    imports 为 [(说明符, [(导入名, 本地名)], 命名空间本地名)]，导入名为 None 表示只执行模块；
+    exports 为 [(导出名, 本地名 或 (说明符, 导入名))]；body 为去掉 import 语句和 export 关键字后的代码。
+    只支持写在行首的顶层 import / export 语句，遇到无法安全转换的写法时抛出 ValueError
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    imports = []
+    exports = []
+
+    def take_import(match):
+        clause, specifier = match.group(1), match.group(3)
+        bindings = []
+        namespace = None
+        if clause:
+            clause_match = re.fullmatch(r'(?:([\w$]+)\s*(?:,\s*|$))?(?:\*\s*as\s+([\w$]+)|\{([^}]*)\})?', clause.strip(), re.DOTALL)
+            if not clause_match:
+                raise ValueError(f"{path}: 无法解析的 import 语句: {match.group(0)}")
+            if clause_match.group(1):
+                bindings.append(('default', clause_match.group(1)))
+            namespace = clause_match.group(2)
+            if clause_match.group(3) is not None:
+                bindings.extend(parse_js_bindings(clause_match.group(3)))
+        imports.append((specifier, bindings, namespace))
+        return ''
+
+    def take_export_list(match):
+        specifier = match.group(3)
+        for local, exported in parse_js_bindings(match.group(1)):
+            exports.append((exported, (specifier, local) if specifier else local))
+        if specifier:
+            imports.append((specifier, [], None))
+        return ''
+
+    def take_export_default(match):
+        name = match.group(1) or match.group(2)
+        if name:
+            exports.append(('default', name))
+            return ''
+        exports.append(('default', '__default'))
+        return 'const __default = '
+
+    def take_export_declaration(match):
+        if match.group(3):
+            if match.group(3) != 'const' or not match.group(4):
+                # 导出的 let/var 可能被重新赋值，打包后导入方无法看到新值
+                raise ValueError(f"{path}: 不支持导出 let/var 变量或解构声明: {source[match.start():source.find(chr(10), match.start())]}")
+            exports.append((match.group(4), match.group(4)))
+        else:
+            name = match.group(1) or match.group(2)
+            exports.append((name, name))
+        return ''
+
+    body = JS_IMPORT_PATTERN.sub(take_import, source)
+    body = JS_EXPORT_LIST_PATTERN.sub(take_export_list, body)
+    body = JS_EXPORT_DEFAULT_PATTERN.sub(take_export_default, body)
+    body = JS_EXPORT_DECLARATION_PATTERN.sub(take_export_declaration, body)
+    remaining = re.search(r'(?:^|[;}])[ \t]*(?:import\s*[\w$*{\'"]|export\s*[\w$*{])[^\n]*', body, re.MULTILINE)
+    if remaining:
+        raise ValueError(f"{path}: 不支持的 import/export 语句: {remaining.group(0)}")
+    dynamic = [match.group(2) for match in JS_DYNAMIC_IMPORT_PATTERN.finditer(body)]
+    return {"body": body, "imports": imports, "exports": exports, "dynamic": dynamic}
+
+def collect_module_entries(html_files):
+    """收集页面中 src 指向打包目录的模块脚本（已打包的标签取 data-entry 记录的原始入口），按出现顺序返回模块路径"""
+    entries = []
+    for filepath in html_files:
+        if not os.path.exists(filepath):
+            continue
+        with io.open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        for tag in MODULE_SCRIPT_PATTERN.findall(content):
+            path = script_site_path(tag, filepath)
+            if path and path.startswith(BUNDLE_SOURCE_DIR + '/') and os.path.isfile(path) and path not in entries:
+                entries.append(path)
+    return entries
+
+def script_site_path(tag, html_path):
+    """返回模块脚本标签原始入口（data-entry 或 src）相对站点根目录的路径，外部地址返回 None"""
+    entry = SCRIPT_ENTRY_PATTERN.search(tag) or SCRIPT_SRC_PATTERN.search(tag)
+    if not entry:
+        return None
+    src = entry.group(entry.lastindex)
+    if '://' in src or src.startswith('//'):
+        return None
+    src = src.split('?', 1)[0].split('#', 1)[0]
+    if src.startswith('/'):
+        return posixpath.normpath(src.lstrip('/'))
+    base = posixpath.dirname(html_path.replace(os.sep, '/'))
+    return posixpath.normpath(posixpath.join(base, src))
+
+def bundle_modules(entries):
+    """
+    从入口模块出发解析 import 关系，将模块按引用它们的入口集合分组打包：只被一个入口使用的模块打包进该入口的脚本，
+    被多个入口共同使用的模块打包进共享脚本，同一页面加载多个入口时共享的模块仍只执行一次。
+    每个模块包在独立的函数作用域中，模块之间通过导出对象传递绑定，不需要重命名变量。
+    返回 ({文件名: 内容}, {入口模块: 文件名}, 打包的模块路径列表)，文件名包含内容哈希
+    """
+    modules = {}
+    # 模块按依赖在前的顺序排列，与浏览器执行模块的顺序一致
+    order = []
+    visiting = set()
+
+    def visit(path):
+        if path in modules:
+            return
+        if path in visiting:
+            raise ValueError(f"模块之间存在循环引用: {path}")
+        visiting.add(path)
+        module = parse_js_module(path)
+        module["deps"] = []
+        for specifier in [item[0] for item in module["imports"]] + module["dynamic"]:
+            target, _ = resolve_module_specifier(path, specifier)
+            if target:
+                visit(target)
+                if target not in module["deps"]:
+                    module["deps"].append(target)
+        visiting.discard(path)
+        modules[path] = module
+        order.append(path)
+
+    for entry in entries:
+        visit(entry)
+    names = {path: f"__module_{index}" for index, path in enumerate(order)}
+
+    # 每个模块被哪些入口使用，依赖的入口集合总是包含使用它的模块的入口集合，分组之间不会循环引用
+    owners = {path: set() for path in order}
+    for entry in entries:
+        stack = [entry]
+        while stack:
+            path = stack.pop()
+            if entry not in owners[path]:
+                owners[path].add(entry)
+                stack.extend(modules[path]["deps"])
+    chunks = {}
+    for path in order:
+        chunks.setdefault(frozenset(owners[path]), []).append(path)
+    chunk_of = {path: key for key, paths in chunks.items() for path in paths}
+
+    def module_code(path):
+        module = modules[path]
+        lines = [f"// {path}", f"const {names[path]} = (() => {{"]
+        externals = {}
+        for specifier, bindings, namespace in module["imports"]:
+            target, external = resolve_module_specifier(path, specifier)
+            if target:
+                target_exports = {name for name, _ in modules[target]["exports"]}
+                for imported, local in bindings:
+                    if imported not in target_exports:
+                        raise ValueError(f"{path}: {target} 没有导出 {imported}")
+                source = names[target]
+            else:
+                source = externals[external] = f"__external_{external_index(external)}"
+            if namespace:
+                lines.append(f"const {namespace} = {source};")
+            for imported, local in bindings:
+                lines.append(f"const {local} = {source}.{imported};")
+        body = module["body"]
+
+        def replace_dynamic(match):
+            target, external = resolve_module_specifier(path, match.group(2))
+            if target:
+                return f"Promise.resolve({names[target]})"
+            return f"import({json.dumps(external)})"
+
+        body = JS_DYNAMIC_IMPORT_PATTERN.sub(replace_dynamic, body)
+        # import.meta.url 保持为原模块的地址，依赖它计算的相对地址不受打包位置影响
+        original = posixpath.relpath(path, BUNDLE_OUTPUT_DIR)
+        body = body.replace('import.meta.url', f"new URL({json.dumps(original)}, import.meta.url).href")
+        lines.append(body.rstrip('\n'))
+        getters = []
+        for name, local in module["exports"]:
+            if isinstance(local, tuple):
+                target, _ = resolve_module_specifier(path, local[0])
+                if not target:
+                    raise ValueError(f"{path}: 不支持从外部模块重新导出: {local[0]}")
+                local = f"{names[target]}.{local[1]}"
+            getters.append(f"    get {name}() {{ return {local}; }},")
+        lines.append("return {\n" + "\n".join(getters) + "\n};" if getters else "return {};")
+        lines.append("})();")
+        return "\n".join(lines), externals
+
+    external_names = {}
+
+    def external_index(specifier):
+        return external_names.setdefault(specifier, len(external_names))
+
+    files = {}
+    filenames = {}
+    # 被依赖的分组先生成，引用它们的分组才能写入包含哈希的文件名
+    for key in sorted(chunks, key=len, reverse=True):
+        paths = chunks[key]
+        codes = []
+        externals = {}
+        for path in paths:
+            code, used = module_code(path)
+            codes.append(code)
+            externals.update(used)
+        imported = {}
+        for path in paths:
+            for dep in modules[path]["deps"]:
+                if chunk_of[dep] != key:
+                    imported.setdefault(chunk_of[dep], []).append(names[dep])
+        # 其他分组使用的本组模块
+        exported = sorted({names[dep] for other, other_paths in chunks.items() if other != key
+                           for path in other_paths for dep in modules[path]["deps"] if chunk_of[dep] == key},
+                          key=lambda name: int(name.rsplit('_', 1)[1]))
+        header = [f"/* 由 build.py --bundle 生成，请勿直接修改。包含模块: {', '.join(posixpath.basename(path) for path in paths)} */"]
+        for specifier, name in sorted(externals.items(), key=lambda item: item[1]):
+            header.append(f"import * as {name} from {json.dumps(specifier)};")
+        for other in sorted(imported, key=lambda other: filenames[other]):
+            header.append(f"import {{ {', '.join(sorted(set(imported[other]), key=lambda name: int(name.rsplit('_', 1)[1])))} }} from './{filenames[other]}';")
+        content = "\n".join(header) + "\n\n" + "\n\n".join(codes) + "\n"
+        if exported:
+            content += f"\nexport {{ {', '.join(exported)} }};\n"
+        stem = posixpath.splitext(posixpath.basename(next(iter(key))))[0] if len(key) == 1 else "shared"
+        filenames[key] = f"{stem}.{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}.js"
+        files[filenames[key]] = content
+    return files, {entry: filenames[chunk_of[entry]] for entry in entries}, order
+
+def rewrite_module_scripts(content, html_path, bundles):
+    """
+    改写页面中的模块脚本标签：入口已打包时 src 指向打包后的脚本，并在 data-entry 中记录原始地址；
+    未打包时恢复为 data-entry 记录的原始地址
+    """
+    base = posixpath.dirname(html_path.replace(os.sep, '/'))
+
+    def replace(match):
+        tag = match.group(0)
+        src_match = SCRIPT_SRC_PATTERN.search(tag)
+        if not src_match:
+            return tag
+        entry_match = SCRIPT_ENTRY_PATTERN.search(tag)
+        original = entry_match.group(2) if entry_match else src_match.group(3)
+        bundle = bundles.get(script_site_path(tag, html_path))
+        tag = SCRIPT_ENTRY_PATTERN.sub('', tag)
+        src_match = SCRIPT_SRC_PATTERN.search(tag)
+        if bundle:
+            bundle_path = f"{BUNDLE_OUTPUT_DIR}/{bundle}"
+            src = '/' + bundle_path if original.startswith('/') else posixpath.relpath(bundle_path, base or '.')
+            attributes = f'{src_match.group(1)}"{src}" data-entry="{original}"'
+        else:
+            attributes = f'{src_match.group(1)}{src_match.group(2)}{original}{src_match.group(2)}'
+        return tag[:src_match.start()] + attributes + tag[src_match.end():]
+
+    return MODULE_SCRIPT_PATTERN.sub(replace, content)
+
+def bundle_scripts(html_files, precompress=False, brotli=None):
+    """
+    打包页面引用的 assets/js 入口模块，写入 assets/dist/（删除不再引用的旧脚本）。
+    返回 ({入口模块: 打包后的文件名}, 打包的模块路径集合)，无法打包时给出警告并返回空结果，页面继续使用原模块
+    """
+    entries = collect_module_entries(html_files)
+    if not entries:
+        print(f"警告: 页面中没有引用 {BUNDLE_SOURCE_DIR} 下的模块脚本，跳过打包")
+        return {}, set()
+    try:
+        files, bundles, modules = bundle_modules(entries)
+    except (OSError, ValueError) as e:
+        print(f"警告: 无法打包脚本，页面继续使用原模块: {e}")
+        return {}, set()
+    write_hashed_files(BUNDLE_OUTPUT_DIR, files, precompress, brotli, extension=".js")
+    size = sum(len(content.encode('utf-8')) for content in files.values())
+    print(f"已打包脚本: {len(modules)} 个模块 -> {len(files)} 个文件 ({size / 1024:.1f} KB)")
+    return bundles, set(modules)
+
+def collect_precache_files(root_dir, config, bundles=None, bundled_modules=()):
+    """
+    收集 Service Worker 预缓存的文件（相对站点根目录的路径）：根目录和 main/ 下的页面、config.js、
+    assets/ 下的静态资源，以及文档根目录中的文档和生成的 JSON。
+    打包脚本时（bundles）不包含已打包的源模块；未打包时不包含 assets/dist/ 中遗留的脚本
+    """
+    paths = set(glob.glob('*.html')) | set(glob.glob('main/*.html'))
+    if os.path.exists('config.js'):
+        paths.add('config.js')
+    document_extensions = set(config.get("supported_extensions", DEFAULT_CONFIG["supported_extensions"])) | {".json"}
+    for top, extensions in (('assets', None), (root_dir, document_extensions)):
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                # 跳过隐藏文件和 --precompress 生成的压缩文件（浏览器请求的是原文件）
+                if filename.startswith('.') or filename.endswith(('.gz', '.br')):
+                    continue
+                if extensions is not None and os.path.splitext(filename)[1].lower() not in extensions:
+                    continue
+                paths.add(os.path.relpath(os.path.join(dirpath, filename)))
+    paths = {path.replace(os.sep, '/') for path in paths}
+    if bundles:
+        excludes = set(bundled_modules)
+    else:
+        excludes = {path for path in paths if path.startswith(BUNDLE_OUTPUT_DIR + '/')}
+    return sorted(path for path in paths
+                  if not path.startswith('../') and path not in SERVICE_WORKER_EXCLUDES and path not in excludes)
+
+def render_service_worker(template, paths):
+    """
+    生成 sw.js：在模板开头写入预缓存清单 {version, files: {路径: 内容哈希}}。
+    版本由全部内容哈希决定，任一文件变化时 sw.js 随之变化，浏览器据此安装新版本
+    """
+    files = {}
+    for path in paths:
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(PACKAGE_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        files[path] = digest.hexdigest()[:12]
+    version = hashlib.sha1(json.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    manifest = json.dumps({"version": version, "files": files}, ensure_ascii=False, separators=(',', ':'))
+    return f"self.__PRECACHE = {manifest};\n{template}", len(files)
+
+def package_date_time():
+    """
+    打包时写入每个条目的时间戳：设置了 SOURCE_DATE_EPOCH 时使用该时间，否则固定为 1980-01-01，
+    使相同的源文件总能生成逐字节相同的压缩包
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        moment = datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc)
+        if moment.year >= 1980:
+            return moment.timetuple()[:6]
+    return PACKAGE_DATE_TIME
+
+def add_package_path(entries, path, arcname=None):
+    """
+    将文件或目录加入打包清单，目录按排序后的顺序递归展开
+    
+    Args:
+        entries: 打包清单，元素为 (压缩包内路径, 源文件路径或 bytes 内容)
+        path: 源文件或目录路径
+        arcname: 压缩包内路径，默认与 path 相同
+    """
+    arcname = arcname or path
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, path)
+                entries.append((f"{arcname}/{rel_path}".replace(os.sep, '/'), file_path))
+    elif os.path.isfile(path):
+        entries.append((arcname, path))
+    else:
+        print(f"警告: {path} 不存在，将被跳过")
+        return
+    if arcname != path:
+        print(f"已添加并重命名: {path} -> {arcname}")
+    else:
+        print(f"已添加: {path}")
+
+def update_package_manifest():
     """
-    创建更新包，包含指定的文件和目录，用于覆盖更新旧项目的代码
+    更新包清单，用于覆盖更新旧项目的代码
     
     打包内容包括：
     - assets 文件夹
@@ -980,77 +4269,19 @@ def create_update_package(output_file='EasyDocument-update.zip'):
     - 根目录 HTML：index.html, 404.html, header.html, footer.html
     - meta.json, requirements.txt, build.py
     """
-    print(f"开始创建更新包: {output_file}")
-    
-    # 创建临时目录存放待打包文件
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"创建临时目录: {temp_dir}")
-        
-        # 复制assets文件夹
-        assets_path = 'assets'
-        if os.path.exists(assets_path) and os.path.isdir(assets_path):
-            assets_temp_path = os.path.join(temp_dir, 'assets')
-            shutil.copytree(assets_path, assets_temp_path)
-            print(f"已复制: {assets_path}")
-        else:
-            print(f"警告: {assets_path} 目录不存在，将被跳过")
-        
-        # 复制config.js并改名为default.config.js
-        config_path = 'config.js'
-        if os.path.exists(config_path):
-            default_config_path = os.path.join(temp_dir, 'default.config.js')
-            shutil.copy2(config_path, default_config_path)
-            print(f"已复制并重命名: {config_path} -> default.config.js")
-        else:
-            print(f"警告: {config_path} 文件不存在，将被跳过")
-        
-        # 复制main目录
-        main_path = 'main'
-        if os.path.exists(main_path) and os.path.isdir(main_path):
-            main_temp_path = os.path.join(temp_dir, 'main')
-            shutil.copytree(main_path, main_temp_path)
-            print(f"已复制: {main_path}")
-        else:
-            print(f"警告: {main_path} 目录不存在，将被跳过")
-        
-        # 复制根目录下的 HTML 文件（入口、布局、错误页等）
-        root_html_files = ['index.html', '404.html', 'header.html', 'footer.html']
-        for html_file in root_html_files:
-            if os.path.exists(html_file):
-                html_temp_path = os.path.join(temp_dir, html_file)
-                shutil.copy2(html_file, html_temp_path)
-                print(f"已复制: {html_file}")
-            else:
-                print(f"警告: {html_file} 文件不存在，将被跳过")
-        
-        # 复制其他文件
-        other_files = ['meta.json', 'requirements.txt','build.py']
-        for file in other_files:
-            if os.path.exists(file):
-                file_temp_path = os.path.join(temp_dir, file)
-                shutil.copy2(file, file_temp_path)
-                print(f"已复制: {file}")
-            else:
-                print(f"警告: {file} 文件不存在，将被跳过")
-        
-        # 创建ZIP文件
-        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # 遍历临时目录中的所有文件和子目录
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # 计算相对于临时目录的路径，作为zip内的路径
-                    arc_path = os.path.relpath(file_path, temp_dir)
-                    zipf.write(file_path, arc_path)
-        
-        print(f"更新包创建完成: {output_file}")
-        # 显示ZIP文件大小
-        zip_size = os.path.getsize(output_file)
-        print(f"更新包大小: {zip_size / 1024:.2f} KB")
+    entries = []
+    add_package_path(entries, 'assets')
+    add_package_path(entries, 'config.js', 'default.config.js')
+    add_package_path(entries, 'main')
+    for html_file in ['index.html', '404.html', 'header.html', 'footer.html']:
+        add_package_path(entries, html_file)
+    for file in ['meta.json', 'requirements.txt', 'build.py']:
+        add_package_path(entries, file)
+    return entries
 
-def create_initial_package(output_file='EasyDocument-initial.zip'):
+def initial_package_manifest():
     """
-    创建初始包，包含完整的项目文件
+    初始包清单，包含完整的项目文件
     
     打包内容包括：
     - assets 文件夹
@@ -1060,81 +4291,101 @@ def create_initial_package(output_file='EasyDocument-initial.zip'):
     - 根目录下所有 .html 文件
     - LICENSE, README.md, build.py, meta.json, requirements.txt
     """
-    print(f"开始创建初始包: {output_file}")
+    entries = []
+    add_package_path(entries, 'assets')
+    entries.append(('data/README.md', INITIAL_DATA_README.encode('utf-8')))
+    print("已创建: data/README.md")
+    add_package_path(entries, 'config.js')
+    add_package_path(entries, 'main')
+    for html_file in sorted(glob.glob('*.html')):
+        add_package_path(entries, html_file)
+    for file in ['LICENSE', 'README.md', 'build.py', 'meta.json', 'requirements.txt']:
+        add_package_path(entries, file)
+    return entries
+
+def package_zip_info(arcname, date_time):
+    """根据压缩包内路径生成条目信息：固定时间戳和权限，已压缩的图片等文件直接存储"""
+    info = zipfile.ZipInfo(arcname, date_time)
+    info.external_attr = 0o644 << 16
+    if os.path.splitext(arcname)[1].lower() in PACKAGE_STORED_EXTENSIONS:
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+def write_packages(packages):
+    """
+    按清单写入一个或多个压缩包：每个源文件只读取一次，分块直接写入所有包含它的压缩包，
+    不再复制到临时目录。压缩包先写入临时文件，成功后再替换目标文件
     
-    # 创建临时目录存放待打包文件
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"创建临时目录: {temp_dir}")
-        
-        # 复制assets文件夹
-        assets_path = 'assets'
-        if os.path.exists(assets_path) and os.path.isdir(assets_path):
-            assets_temp_path = os.path.join(temp_dir, 'assets')
-            shutil.copytree(assets_path, assets_temp_path)
-            print(f"已复制: {assets_path}")
-        else:
-            print(f"警告: {assets_path} 目录不存在，将被跳过")
-        
-        # 创建data目录和README.md空文件
-        data_dir = os.path.join(temp_dir, 'data')
-        os.makedirs(data_dir, exist_ok=True)
-        data_readme = os.path.join(data_dir, 'README.md')
-        with open(data_readme, 'w', encoding='utf-8') as f:
-            f.write('# EasyDocument\n\n这是您的文档目录，请在此处添加Markdown或HTML文档。')
-        print(f"已创建: data/README.md")
-        
-        # 复制config.js (不改名)
-        config_path = 'config.js'
-        if os.path.exists(config_path):
-            config_temp_path = os.path.join(temp_dir, 'config.js')
-            shutil.copy2(config_path, config_temp_path)
-            print(f"已复制: {config_path}")
-        else:
-            print(f"警告: {config_path} 文件不存在，将被跳过")
-        
-        # 复制main目录
-        main_path = 'main'
-        if os.path.exists(main_path) and os.path.isdir(main_path):
-            main_temp_path = os.path.join(temp_dir, 'main')
-            shutil.copytree(main_path, main_temp_path)
-            print(f"已复制: {main_path}")
-        else:
-            print(f"警告: {main_path} 目录不存在，将被跳过")
-        
-        # 复制根目录下的 HTML 文件
-        html_files = glob.glob('*.html')
-        for html_file in html_files:
-            if os.path.exists(html_file):
-                html_temp_path = os.path.join(temp_dir, html_file)
-                shutil.copy2(html_file, html_temp_path)
-                print(f"已复制: {html_file}")
-            else:
-                print(f"警告: {html_file} 文件不存在，将被跳过")
-        
-        # 复制其他文件
-        other_files = ['LICENSE', 'README.md', 'build.py', 'meta.json', 'requirements.txt']
-        for file in other_files:
-            if os.path.exists(file):
-                file_temp_path = os.path.join(temp_dir, file)
-                shutil.copy2(file, file_temp_path)
-                print(f"已复制: {file}")
-            else:
-                print(f"警告: {file} 文件不存在，将被跳过")
-        
-        # 创建ZIP文件
-        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # 遍历临时目录中的所有文件和子目录
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # 计算相对于临时目录的路径，作为zip内的路径
-                    arc_path = os.path.relpath(file_path, temp_dir)
-                    zipf.write(file_path, arc_path)
-        
-        print(f"初始包创建完成: {output_file}")
+    Args:
+        packages: [(名称, 输出路径, 打包清单)]
+    """
+    date_time = package_date_time()
+    # 源文件 -> [(压缩包序号, 压缩包内路径)]，同一源文件在不同压缩包中可以有不同名称
+    sources = {}
+    for index, (_, _, entries) in enumerate(packages):
+        for arcname, source in entries:
+            key = source if isinstance(source, str) else (index, arcname)
+            sources.setdefault(key, []).append((index, arcname))
+    
+    temp_files = [f"{output_file}.tmp" for _, output_file, _ in packages]
+    archives = [zipfile.ZipFile(temp_file, 'w') for temp_file in temp_files]
+    try:
+        for (_, _, entries), archive in zip(packages, archives):
+            for arcname, source in entries:
+                if not isinstance(source, str):
+                    archive.writestr(package_zip_info(arcname, date_time), source)
+        for source in sorted(key for key in sources if isinstance(key, str)):
+            targets = [archives[index].open(package_zip_info(arcname, date_time), 'w')
+                       for index, arcname in sources[source]]
+            try:
+                with open(source, 'rb') as f:
+                    while True:
+                        chunk = f.read(PACKAGE_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        for target in targets:
+                            target.write(chunk)
+            finally:
+                for target in targets:
+                    target.close()
+        for archive in archives:
+            archive.close()
+    except BaseException:
+        for archive, temp_file in zip(archives, temp_files):
+            archive.close()
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        raise
+    
+    for (name, output_file, _), temp_file in zip(packages, temp_files):
+        os.replace(temp_file, output_file)
+        print(f"{name}创建完成: {output_file}")
         # 显示ZIP文件大小
         zip_size = os.path.getsize(output_file)
-        print(f"初始包大小: {zip_size / 1024:.2f} KB")
+        print(f"{name}大小: {zip_size / 1024:.2f} KB")
+
+def create_update_package(output_file='EasyDocument-update.zip'):
+    """创建更新包，包含指定的文件和目录，用于覆盖更新旧项目的代码"""
+    print(f"开始创建更新包: {output_file}")
+    write_packages([('更新包', output_file, update_package_manifest())])
+
+def create_initial_package(output_file='EasyDocument-initial.zip'):
+    """创建初始包，包含完整的项目文件"""
+    print(f"开始创建初始包: {output_file}")
+    write_packages([('初始包', output_file, initial_package_manifest())])
+
+def create_all_packages(update_output='EasyDocument-update.zip', initial_output='EasyDocument-initial.zip'):
+    """同时创建更新包和初始包，两个包共有的文件只读取一次"""
+    print(f"开始创建更新包: {update_output}")
+    update_entries = update_package_manifest()
+    print(f"开始创建初始包: {initial_output}")
+    initial_entries = initial_package_manifest()
+    write_packages([
+        ('更新包', update_output, update_entries),
+        ('初始包', initial_output, initial_entries),
+    ])
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
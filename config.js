@@ -175,10 +175,13 @@ const config = {
     default_page: "README.md", // 默认文档
     index_pages: ["README.md", "README.html", "index.md", "index.html"], // 索引页文件名
     supported_extensions: [".md", ".html"], // 支持的文档扩展名
+    link_graph: false, // 是否按 build.py --link-graph 生成的 links.json 预加载接下来可能打开的文档（否则预加载同级文档）
+    prerender: false, // 是否使用 build.py --prerender 生成的预渲染 HTML 片段（文档已修改或片段加载失败时回退到浏览器端解析 Markdown）
     toc_depth: 3, // 目录深度，显示到几级（h1~hx）标题
     toc_numbering: true, // 目录是否显示编号（如1，2.3，5.1.3）
     toc_ignore_h1: true, // 生成目录编号时是否忽略h1标题，避免所有标题都以1开头
     toc_dynamic_expand: true, // 是否启用动态展开功能
+    toc_data: false, // 是否加载 build.py --toc 生成的 toc.json：目录在正文下载前显示，搜索结果链接到标题匹配的章节
     code_copy_button: true, // 代码块是否显示复制按钮
     code_block: {
       line_numbers: true, // 是否显示行号
@@ -217,7 +220,8 @@ const config = {
     placeholder: "搜索文档...", // 搜索框占位符文本
     search_cached: true, // 是否搜索缓存的文档内容
     search_on_type: true, // 是否在输入时自动搜索
-    match_distance: 50 // 搜索结果中多个匹配项之间的最小字符距离
+    match_distance: 50, // 搜索结果中多个匹配项之间的最小字符距离
+    index_format: "list" // 搜索索引格式："list" 使用 search.json；"inverted" 使用 build.py --search-inverted 生成的 search-index.json；"sharded" 使用 build.py --search-shards 生成的分片索引，按需下载（加载失败时均回退到 search.json）
   },
 
   // 插件与扩展
@@ -246,6 +250,11 @@ const config = {
     // 缓存菜单显示控制
     cache_menu: {
       enable: true // 是否显示右下角的缓存菜单按钮，设置为false时隐藏缓存管理入口但不影响缓存功能本身
+    },
+
+    // Service Worker 离线缓存
+    service_worker: {
+      enable: false // 是否注册 build.py --service-worker 生成的 sw.js：页面、脚本、文档和索引按缓存优先加载，部署后只重新下载内容变化的文件
     }
   },
 
@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EasyDocument 构建性能基准测试
+
+生成确定性的合成文档树（可配置目录深度与宽度、Markdown/HTML 比例、中英文比例）
+以及带有 N 个提交、M 个作者的本地 Git 仓库，在多个规模下测量 build.py 中
+scan_directory、get_git_info、merge_structures、build_search_tree 和打包函数的
+耗时、吞吐量与峰值内存。相同参数（包括随机种子）生成的输入完全相同，
+结果保存为 JSON 后可以在不同提交之间比较。
+
+用法示例：
+    python tool/benchmark.py --scales 100,1000 --output bench-before.json
+    python tool/benchmark.py --scales 100,1000 --compare bench-before.json
+    python tool/benchmark.py --build /tmp/old-build.py --scales 1000
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+import importlib.util
+
+# 结果文件格式版本，结构变化时递增
+RESULT_VERSION = 1
+
+# 基准测试的操作及显示名称（按执行顺序排列）
+OPERATIONS = {
+    "scan": "scan_directory",
+    "git": "get_git_info",
+    "merge": "merge_structures",
+    "search": "build_search_tree",
+    "package": "write_packages",
+}
+
+CJK_TEXT = (
+    "文档系统通过目录结构组织内容每个分类都可以包含索引页和若干篇文章构建工具会扫描这些文件"
+    "提取标题与摘要生成导航和搜索索引页面在浏览器中按需加载文档并渲染目录代码高亮数学公式"
+    "和图表搜索功能支持关键词匹配与倒排索引分支功能允许同时维护多个版本的文档配置文件用于"
+    "设置网站标题外观布局导航链接以及插件选项提交历史用于显示最后修改时间和参与编辑的作者"
+)
+EN_WORDS = (
+    "document build search index cache branch render config theme layout markdown table image "
+    "link anchor heading section content author commit history version release deploy server "
+    "client module parser token keyword score shard manifest preview navigation sidebar footer"
+).split()
+CODE_SAMPLE = "```python\ndef build(root):\n    return scan(root, cache=True)\n```"
+
+
+def load_build_module(path):
+    """按文件路径导入 build.py，便于测量其他提交中的版本"""
+    spec = importlib.util.spec_from_file_location("easydoc_build", path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class DocumentGenerator:
+    """根据随机种子生成确定性的 Markdown/HTML 文档内容"""
+
+    def __init__(self, rng, cjk_ratio):
+        self.rng = rng
+        self.cjk_ratio = cjk_ratio
+
+    def phrase(self, cjk):
+        rng = self.rng
+        if cjk:
+            start = rng.randrange(len(CJK_TEXT) - 30)
+            return CJK_TEXT[start:start + rng.randint(4, 10)]
+        return " ".join(rng.choice(EN_WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+
+    def sentence(self, cjk):
+        rng = self.rng
+        if cjk:
+            start = rng.randrange(len(CJK_TEXT) - 40)
+            return CJK_TEXT[start:start + rng.randint(12, 36)] + "。"
+        return " ".join(rng.choice(EN_WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+
+    def paragraph(self):
+        cjk = self.rng.random() < self.cjk_ratio
+        return ("" if cjk else " ").join(self.sentence(cjk) for _ in range(self.rng.randint(2, 6)))
+
+    def sections(self):
+        """生成 (标题级别, 标题, [段落或代码块, ...]) 列表"""
+        rng = self.rng
+        result = []
+        for _ in range(rng.randint(2, 7)):
+            blocks = [self.paragraph() for _ in range(rng.randint(1, 4))]
+            if rng.random() < 0.2:
+                blocks.append(CODE_SAMPLE)
+            level = 3 if result and rng.random() < 0.3 else 2
+            result.append((level, self.phrase(rng.random() < self.cjk_ratio), blocks))
+        return result
+
+    def markdown(self, title):
+        lines = [f"# {title}", "", self.paragraph(), ""]
+        for level, heading, blocks in self.sections():
+            lines.extend(["#" * level + " " + heading, ""])
+            for block in blocks:
+                lines.extend([block, ""])
+            if self.rng.random() < 0.2:
+                lines.extend(["| 名称 | name |", "| --- | --- |", f"| {heading} | {self.phrase(False)} |", ""])
+        return "\n".join(lines)
+
+    def html(self, title):
+        parts = [f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"UTF-8\">\n<title>{title}</title>\n</head>\n<body>",
+                 f"<h1>{title}</h1>", f"<p>{self.paragraph()}</p>"]
+        for level, heading, blocks in self.sections():
+            parts.append(f"<h{level}>{heading}</h{level}>")
+            for block in blocks:
+                if block == CODE_SAMPLE:
+                    parts.append("<pre><code>def build(root):\n    return scan(root)</code></pre>")
+                else:
+                    parts.append(f"<p>{block}</p>")
+        parts.append("</body>\n</html>\n")
+        return "\n".join(parts)
+
+
+def directory_layout(rng, depth, breadth, cjk_ratio, limit):
+    """按广度优先生成最多 limit 个目录（相对路径，根目录为空字符串）"""
+    dirs = [""]
+    frontier = [""]
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for parent in frontier:
+            for index in range(breadth):
+                if len(dirs) >= limit:
+                    return dirs
+                name = f"分类{level}-{index}" if rng.random() < cjk_ratio else f"section-{level}-{index}"
+                path = f"{parent}/{name}" if parent else name
+                dirs.append(path)
+                next_frontier.append(path)
+        frontier = next_frontier
+    return dirs
+
+
+def generate_tree(data_dir, docs, args, rng):
+    """
+    生成合成文档树，返回 {相对路径: 内容}
+    每个目录的第一篇文档为 README.md（索引页），其余文档轮流分配到各目录
+    """
+    generator = DocumentGenerator(rng, args.cjk_ratio)
+    dirs = directory_layout(rng, args.depth, args.breadth, args.cjk_ratio, max(1, docs // 4))
+    files = {}
+    for index in range(docs):
+        directory = dirs[index % len(dirs)]
+        cjk = rng.random() < args.cjk_ratio
+        title = generator.phrase(cjk)
+        if index < len(dirs):
+            name, content = "README.md", generator.markdown(title)
+        elif rng.random() < args.html_ratio:
+            name, content = f"doc-{index:05d}.html", generator.html(title)
+        else:
+            name, content = f"doc-{index:05d}.md", generator.markdown(title)
+        files[f"{directory}/{name}" if directory else name] = content
+
+    for rel_path, content in files.items():
+        path = os.path.join(data_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+    return files
+
+
+def generate_git_history(work_dir, files, args, rng):
+    """
+    用 git fast-import 生成 N 个提交、M 个作者的历史：首个提交添加全部文档，
+    之后每个提交修改若干篇文档。提交时间固定，工作区与最后一个提交一致
+    """
+    authors = []
+    for index in range(args.authors):
+        if index % 3 == 0:
+            # 部分作者使用 GitHub noreply 邮箱，覆盖用户名解析路径
+            authors.append((f"user{index}", f"{10000 + index}+user{index}@users.noreply.github.com"))
+        elif index % 3 == 1:
+            authors.append((f"作者{index}", f"author{index}@example.com"))
+        else:
+            authors.append((f"Author {index}", f"author{index}@example.org"))
+
+    paths = sorted(files)
+    contents = {f"data/{path}": content for path, content in files.items()}
+    stream = io.BytesIO()
+
+    def data(text):
+        encoded = text.encode("utf-8")
+        stream.write(f"data {len(encoded)}\n".encode("ascii"))
+        stream.write(encoded)
+        stream.write(b"\n")
+
+    base_time = 1700000000
+    for commit in range(max(1, args.commits)):
+        name, email = authors[rng.randrange(len(authors))]
+        stamp = f"{name} <{email}> {base_time + commit * 3600} +0800"
+        stream.write(f"commit refs/heads/main\nmark :{commit + 1}\nauthor {stamp}\ncommitter {stamp}\n".encode("utf-8"))
+        if commit == 0:
+            data("添加文档")
+            changed = list(contents)
+        else:
+            changed = [f"data/{path}" for path in rng.sample(paths, min(len(paths), rng.randint(1, 5)))]
+            data(f"更新文档 {commit}")
+            stream.write(f"from :{commit}\n".encode("ascii"))
+            for path in changed:
+                contents[path] += f"\n<!-- 修订 {commit} -->\n"
+        for path in changed:
+            stream.write(f"M 100644 inline {path}\n".encode("utf-8"))
+            data(contents[path])
+
+    def git(*command, **kwargs):
+        subprocess.run(["git", *command], cwd=work_dir, check=True, **kwargs)
+
+    git("init", "-q", "-b", "main")
+    git("fast-import", "--quiet", input=stream.getvalue())
+    for path, content in contents.items():
+        with open(os.path.join(work_dir, path), "w", encoding="utf-8") as f:
+            f.write(content)
+    git("reset", "-q")
+
+
+def reset_build_state(build):
+    """
+    清除 build.py 的模块级缓存，使每次测量都从冷状态开始。
+    与 --no-cache 构建相同，使用空的内存构建缓存（同一文档在一次构建中只读取一次）
+    """
+    build.BUILD_CACHE = build.BuildCache(None, "benchmark") if hasattr(build, "BuildCache") else None
+    for name in ("GIT_HISTORY_INDEXES", "GIT_AUTHOR_INDEXES", "EMAIL_TO_USERNAME_MAP"):
+        if hasattr(build, name):
+            getattr(build, name).clear()
+
+
+def default_config(build, data_dir):
+    """生成以 data_dir 为文档根目录的默认构建配置（兼容没有 resolve_build_config 的旧版本）"""
+    if hasattr(build, "resolve_build_config"):
+        config = build.resolve_build_config({})
+    else:
+        config = json.loads(json.dumps(build.DEFAULT_CONFIG))
+    config["root_dir"] = data_dir
+    if hasattr(build, "freeze_config"):
+        config = build.freeze_config(config)
+    return config
+
+
+def collect_documents(structure, root_dir, result=None):
+    """收集结构中全部文档的绝对路径"""
+    if result is None:
+        result = []
+    if structure.get("index"):
+        result.append(os.path.join(root_dir, structure["index"]["path"]))
+    for child in structure.get("children", []):
+        if child.get("children"):
+            collect_documents(child, root_dir, result)
+        else:
+            result.append(os.path.join(root_dir, child["path"]))
+    return result
+
+
+def measure(setup, repeat):
+    """
+    执行 repeat 次计时，再在 tracemalloc 下执行一次统计峰值内存（tracemalloc 会拖慢执行，不参与计时）。
+    setup 在计时之外完成准备工作，返回需要计时的函数
+    """
+    timings = []
+    for _ in range(repeat):
+        task = setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            task()
+        timings.append(time.perf_counter() - start)
+
+    task = setup()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            task()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def benchmark_scale(build, docs, args, executor):
+    """在一个规模下生成输入并测量各项操作"""
+    rng = random.Random(f"{args.seed}-{docs}")
+    with tempfile.TemporaryDirectory(prefix="easydoc-bench-", dir=args.workdir) as work_dir:
+        # get_git_info 按仓库路径前缀计算相对路径，需要使用解析符号链接后的路径
+        work_dir = os.path.realpath(work_dir)
+        data_dir = os.path.join(work_dir, "data")
+        start = time.perf_counter()
+        files = generate_tree(data_dir, docs, args, rng)
+        if args.commits > 0:
+            generate_git_history(work_dir, files, args, rng)
+        total_bytes = sum(len(content.encode("utf-8")) for content in files.values())
+        print(f"  生成 {docs} 篇文档 ({total_bytes / 1024:.0f} KB, {args.commits} 个提交): "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+        config = default_config(build, data_dir)
+        # 旧版本的 build.py 不支持 executor 参数，串行测量时不传入
+        parallel = {"executor": executor} if executor else {}
+
+        repo = None
+        if args.commits > 0 and getattr(build, "GIT_AVAILABLE", False):
+            repo = build.git.Repo(work_dir)
+
+        reset_build_state(build)
+        structure = build.scan_directory(data_dir, config, **parallel)
+        documents = collect_documents(structure, data_dir)
+
+        def scan():
+            reset_build_state(build)
+            return lambda: build.scan_directory(data_dir, config, **parallel)
+
+        def git_info():
+            reset_build_state(build)
+
+            def run():
+                for path in documents:
+                    build.get_git_info(repo, path, config, allow_github_api=False)
+            return run
+
+        def merge():
+            # 与 --merge 读取已有 path.json 相同，已有结构是一份独立的副本
+            existing = json.loads(json.dumps(structure))
+            return lambda: build.merge_structures(existing, structure, config)
+
+        def search():
+            reset_build_state(build)
+            return lambda: build.build_search_tree(structure, config, **parallel)
+
+        def package():
+            entries = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                build.add_package_path(entries, data_dir, "data")
+            output = os.path.join(work_dir, "bench.zip")
+            return lambda: build.write_packages([("基准测试包", output, entries)])
+
+        operations = {"scan": scan, "git": git_info, "merge": merge, "search": search, "package": package}
+        available = {
+            "git": repo is not None,
+            "package": hasattr(build, "write_packages"),
+        }
+
+        results = {}
+        for name, label in OPERATIONS.items():
+            if not available.get(name, True):
+                print(f"  {label:<18} 跳过（{'未生成 Git 历史或未安装 GitPython' if name == 'git' else '该版本没有此函数'}）")
+                continue
+            result = measure(operations[name], args.repeat)
+            result["docs_per_sec"] = round(len(documents) / result["median"], 1) if result["median"] else None
+            results[name] = result
+            print(f"  {label:<18} {result['median'] * 1000:>10.1f} ms {result['docs_per_sec'] or 0:>10.0f} 篇/秒 "
+                  f"{result['peak_kb'] / 1024:>8.1f} MB")
+
+    return {
+        "docs": len(documents),
+        "bytes": total_bytes,
+        "operations": results,
+    }
+
+
+def git_revision(path):
+    """返回 build.py 所在仓库的当前提交（有未提交修改时附加 -dirty）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory, capture_output=True,
+                              text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", os.path.abspath(path)], cwd=directory,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ("-dirty" if dirty else "")
+
+
+def compare_results(baseline, current):
+    """打印与基准结果的对比（中位数耗时之比，小于 1 表示更快）"""
+    if baseline.get("params") != current["params"]:
+        print("警告: 基准结果的生成参数不同，输入文档不一致，对比仅供参考")
+    print(f"与基准结果对比 ({baseline.get('environment', {}).get('revision') or '未知版本'}):")
+    # 中文表头每个字符占两列
+    print(f"  {'规模':<8}{'操作':<18}{'基准 (ms)':>10}{'当前 (ms)':>10}{'比值':>8}")
+    for scale, result in current["results"].items():
+        base_ops = baseline.get("results", {}).get(scale, {}).get("operations", {})
+        for name, op in result["operations"].items():
+            base = base_ops.get(name)
+            if not base:
+                continue
+            ratio = op["median"] / base["median"] if base["median"] else float("inf")
+            print(f"  {scale:<10}{OPERATIONS[name]:<20}{base['median'] * 1000:>12.1f}"
+                  f"{op['median'] * 1000:>12.1f}{ratio:>9.2f}x")
+
+
+def main():
+    """主函数"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="EasyDocument 构建性能基准测试")
+    parser.add_argument('--build', default=os.path.join(root, 'build.py'), help='要测量的 build.py 路径')
+    parser.add_argument('--scales', default='100,1000,10000', help='文档数量，逗号分隔')
+    parser.add_argument('--depth', type=int, default=3, help='目录深度')
+    parser.add_argument('--breadth', type=int, default=5, help='每个目录的子目录数')
+    parser.add_argument('--html-ratio', type=float, default=0.2, help='HTML 文档所占比例')
+    parser.add_argument('--cjk-ratio', type=float, default=0.5, help='中文内容所占比例')
+    parser.add_argument('--commits', type=int, default=200, help='Git 提交数，0 表示不生成 Git 仓库')
+    parser.add_argument('--authors', type=int, default=10, help='Git 作者数')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--repeat', type=int, default=3, help='每项操作的计时次数（取中位数）')
+    parser.add_argument('--jobs', type=int, default=1, help='传给 scan_directory、build_search_tree 的线程数')
+    parser.add_argument('--workdir', help='生成合成文档的目录（默认使用系统临时目录）')
+    parser.add_argument('--output', help='将结果写入 JSON 文件')
+    parser.add_argument('--compare', help='与之前保存的结果 JSON 对比')
+    args = parser.parse_args()
+
+    try:
+        scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    except ValueError:
+        print(f"错误: 无效的规模列表: {args.scales}")
+        sys.exit(1)
+    args.authors = max(1, args.authors)
+    args.repeat = max(1, args.repeat)
+
+    build = load_build_module(args.build)
+    executor = None
+    if args.jobs > 1:
+        executor = build.ThreadPoolExecutor(max_workers=args.jobs)
+
+    params = {
+        "depth": args.depth,
+        "breadth": args.breadth,
+        "html_ratio": args.html_ratio,
+        "cjk_ratio": args.cjk_ratio,
+        "commits": args.commits,
+        "authors": args.authors,
+        "seed": args.seed,
+        "jobs": args.jobs,
+    }
+    report = {
+        "version": RESULT_VERSION,
+        "params": params,
+        "environment": {
+            "revision": git_revision(args.build),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": {},
+    }
+
+    print(f"测量: {args.build} ({report['environment']['revision'] or '未知版本'})")
+    try:
+        for docs in scales:
+            print(f"规模 {docs} 篇文档:")
+            report["results"][str(docs)] = benchmark_scale(build, docs, args, executor)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EasyDocument Git 历史索引检查
+
+在临时目录中生成包含合并提交的小型 Git 仓库（以 ours 策略丢弃分支修改的合并、先 cherry-pick 再合并、
+合并时采用分支版本等），分别用 build.py 构建时读取 Git 信息的 get_git_info（Git 历史索引，必要时回退到逐文件遍历）
+和逐文件遍历（与 git log -- 文件 的历史简化规则一致）读取每个文件的最后修改提交和贡献者，
+两者不一致时列出差异并以非零状态退出。需要安装 git 和 GitPython。
+
+用法示例：
+    python tool/check_git_history.py
+    python tool/check_git_history.py --build /tmp/old-build.py
+"""
+
+import os
+import io
+import sys
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import importlib.util
+
+
+def load_build_module(path):
+    """按文件路径导入 build.py"""
+    spec = importlib.util.spec_from_file_location("easydoc_build", path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class ScenarioRepo:
+    """在临时目录中按步骤生成仓库，每个提交使用递增的时间戳，保证提交顺序确定"""
+
+    def __init__(self, path):
+        self.path = path
+        self.clock = 1700000000
+        self.git("init", "-q", "-b", "main")
+
+    def git(self, *args, author="A"):
+        self.clock += 60
+        env = dict(os.environ)
+        env.update({
+            "GIT_AUTHOR_NAME": author, "GIT_AUTHOR_EMAIL": f"{author.lower()}@example.com",
+            "GIT_COMMITTER_NAME": author, "GIT_COMMITTER_EMAIL": f"{author.lower()}@example.com",
+            "GIT_AUTHOR_DATE": f"{self.clock} +0000", "GIT_COMMITTER_DATE": f"{self.clock} +0000",
+        })
+        subprocess.run(["git", *args], cwd=self.path, env=env, check=True,
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def write(self, name, text, append=True):
+        with open(os.path.join(self.path, name), "a" if append else "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    def commit(self, message, author="A", **files):
+        for name, text in files.items():
+            self.write(name.replace("_", "."), text)
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message, author=author)
+
+
+def scenario_merge_ours(repo):
+    """分支修改 f.md，合并时以 ours 策略丢弃该修改：f.md 的历史不应包含分支提交"""
+    repo.commit("init", f_md="a", g_md="a")
+    repo.git("checkout", "-q", "-b", "side")
+    repo.commit("side change", author="B", f_md="b")
+    repo.git("checkout", "-q", "main")
+    repo.commit("main change", g_md="c")
+    repo.git("merge", "-q", "-s", "ours", "side", "-m", "merge side")
+
+
+def scenario_cherry_pick(repo):
+    """分支提交先被 cherry-pick 到主分支再合并：同一修改只应计一次"""
+    repo.commit("init", f_md="a", g_md="a")
+    repo.git("checkout", "-q", "-b", "side")
+    repo.commit("fix typo", author="B", f_md="b")
+    repo.git("checkout", "-q", "main")
+    repo.commit("main change", g_md="c")
+    repo.git("cherry-pick", "side", author="B")
+    repo.git("merge", "-q", "--no-ff", "side", "-m", "merge side")
+
+
+def scenario_merge_side(repo):
+    """普通合并：分支对 f.md 的修改被保留，分支提交应计入 f.md 的历史"""
+    repo.commit("init", f_md="a", g_md="a")
+    repo.git("checkout", "-q", "-b", "side")
+    repo.commit("side change", author="B", f_md="b")
+    repo.commit("side change 2", author="C", g_md="d")
+    repo.git("checkout", "-q", "main")
+    repo.commit("main change", g_md="c")
+    repo.git("merge", "-q", "--no-ff", "-X", "ours", "side", "-m", "merge side")
+
+
+def scenario_take_side_version(repo):
+    """主分支修改 f.md 后合并未修改 f.md 的分支，但合并结果采用分支（即合并基础）的版本"""
+    repo.commit("init", f_md="a", g_md="a")
+    repo.git("checkout", "-q", "-b", "side")
+    repo.commit("side change", author="B", g_md="b")
+    repo.git("checkout", "-q", "main")
+    repo.commit("main change", author="C", f_md="c")
+    repo.git("merge", "-q", "--no-ff", "--no-commit", "side")
+    repo.git("checkout", "side", "--", "f.md")
+    repo.git("commit", "-q", "-m", "merge side")
+
+
+SCENARIOS = {
+    "merge-ours": scenario_merge_ours,
+    "cherry-pick": scenario_cherry_pick,
+    "merge-side": scenario_merge_side,
+    "take-side-version": scenario_take_side_version,
+}
+
+
+def summarize(last_commit, authors):
+    """将最后一次提交和贡献者统计转换为便于比较的形式"""
+    last = (last_commit["author"], last_commit["message"], last_commit["timestamp"]) if last_commit else None
+    return last, sorted((author["name"], author["commits"], author["last_commit_timestamp"]) for author in authors)
+
+
+def check_scenario(build, name, scenario, work_dir):
+    """生成一个场景的仓库，返回 [(文件, 构建读取的结果, 逐文件遍历的结果)] 中不一致的项"""
+    path = os.path.join(work_dir, name)
+    os.makedirs(path)
+    repo_builder = ScenarioRepo(path)
+    scenario(repo_builder)
+
+    repo = build.git.Repo(path)
+    config = build.resolve_build_config({})
+    config["github"]["enable"] = False
+    config = build.freeze_config(config)
+    build.GIT_HISTORY_INDEXES.clear()
+
+    mismatches = []
+    for filename in sorted(os.listdir(path)):
+        file_path = os.path.join(path, filename)
+        if not os.path.isfile(file_path):
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            git_info = build.get_git_info(repo, file_path, config, allow_github_api=False)
+            actual = summarize(git_info["last_modified"], git_info["contributors"])
+            expected = summarize(*build.get_file_history(repo, filename, config))
+        if actual != expected:
+            mismatches.append((filename, actual, expected))
+    return mismatches
+
+
+def main():
+    """主函数"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="EasyDocument Git 历史索引检查")
+    parser.add_argument('--build', default=os.path.join(root, 'build.py'), help='要检查的 build.py 路径')
+    args = parser.parse_args()
+
+    build = load_build_module(args.build)
+    if not build.GIT_AVAILABLE:
+        print("错误: 检查需要安装 GitPython（pip install GitPython）")
+        sys.exit(2)
+
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="easydoc-git-") as work_dir:
+        for name, scenario in SCENARIOS.items():
+            mismatches = check_scenario(build, name, scenario, os.path.realpath(work_dir))
+            print(f"{name}: {'通过' if not mismatches else '不一致'}")
+            for filename, actual, expected in mismatches:
+                print(f"  {filename}: 构建结果 {actual}")
+                print(f"  {' ' * len(filename)}  逐文件遍历 {expected}")
+            failed = failed or bool(mismatches)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
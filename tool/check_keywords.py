@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+EasyDocument 搜索关键词检查
+
+用默认的 bigram 分词器为文档目录（启用分支支持时为每个分支）生成 search.json 中的关键词，
+再以 jieba 的词典分词作为参照，检查中文关键词是否跨越了词边界：关键词的第一个字是一个多字词的结尾、
+第二个字是另一个多字词的开头（如"任何支持"中的"何支"、"支持静态"中的"持静"）。
+关键词在文档中多数出现位置都跨越词边界时视为片段，存在片段时以非零状态退出。
+jieba 只用于检查（pip install jieba），构建本身不依赖它。
+
+用法示例：
+    python tool/check_keywords.py
+    python tool/check_keywords.py --config config.js --root data
+"""
+
+import os
+import io
+import sys
+import argparse
+import contextlib
+import importlib.util
+
+
+def load_build_module(path):
+    """按文件路径导入 build.py"""
+    spec = importlib.util.spec_from_file_location("easydoc_build", path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def document_roots(build, config):
+    """返回需要检查的文档根目录：启用分支支持时为各分支目录，否则为文档根目录本身"""
+    root_dir = config["root_dir"]
+    if not config.get("branch_support"):
+        return [root_dir]
+    return [os.path.join(root_dir, item) for item in sorted(os.listdir(root_dir))
+            if os.path.isdir(os.path.join(root_dir, item)) and not item.startswith('.')]
+
+
+def word_boundaries(jieba, text, cjk_pattern, token_pattern):
+    """用 jieba 切分文档中的连续中文，返回 [(连续中文, 多字词的结尾位置集合, 多字词的开头位置集合)]"""
+    result = []
+    for run in token_pattern.findall(text.lower()):
+        if not cjk_pattern.match(run):
+            continue
+        ends, starts = set(), set()
+        position = 0
+        for word in jieba.cut(run, HMM=False):
+            if len(word) > 1:
+                starts.add(position)
+                ends.add(position + len(word) - 1)
+            position += len(word)
+        result.append((run, ends, starts))
+    return result
+
+
+def straddles(keyword, runs):
+    """关键词在文档中多数出现位置都是前一个多字词的结尾加后一个多字词的开头时返回 True"""
+    crossing = total = 0
+    for run, ends, starts in runs:
+        index = run.find(keyword)
+        while index != -1:
+            total += 1
+            if index in ends and index + 1 in starts:
+                crossing += 1
+            index = run.find(keyword, index + 1)
+    return total > 0 and crossing * 2 > total
+
+
+def check_root(build, jieba, config, directory):
+    """检查一个文档根目录，返回 [(文档路径, 跨越词边界的关键词)]"""
+    local_config = build.FrozenDict(config, root_dir=directory)
+    with contextlib.redirect_stdout(io.StringIO()):
+        structure = build.scan_directory(directory, local_config)
+        search_tree = build.build_search_tree(structure, local_config)
+
+    problems = []
+    for item in search_tree:
+        keywords = [keyword for keyword in item["keywords"] if build.CJK_PATTERN.match(keyword)]
+        if not keywords:
+            continue
+        file_path = os.path.join(directory, item["path"])
+        text = " ".join(f"{title} {body}" for _, title, body in build.extract_sections(file_path))
+        runs = word_boundaries(jieba, text, build.CJK_PATTERN, build.TOKEN_PATTERN)
+        bad = [keyword for keyword in keywords if straddles(keyword, runs)]
+        if bad:
+            problems.append((item["path"], bad))
+    return len(search_tree), problems
+
+
+def main():
+    """主函数"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="EasyDocument 搜索关键词检查")
+    parser.add_argument('--build', default=os.path.join(root, 'build.py'), help='要检查的 build.py 路径')
+    parser.add_argument('--config', default=os.path.join(root, 'config.js'), help='配置文件路径')
+    parser.add_argument('--root', help='文档根目录（默认与 build.py 相同，为项目下的 data）')
+    args = parser.parse_args()
+
+    try:
+        import jieba
+    except ImportError:
+        print("错误: 检查需要 jieba 作为分词参照，请先执行 pip install jieba")
+        sys.exit(2)
+    jieba.setLogLevel(60)
+
+    build = load_build_module(args.build)
+    build.BUILD_CACHE = build.BuildCache(None, "check")
+    config = build.resolve_build_config(build.load_site_config(args.config))
+    config["root_dir"] = args.root or os.path.join(root, build.DEFAULT_CONFIG["root_dir"])
+    config["git"]["enable"] = False
+    config["github"]["enable"] = False
+    config["search"]["tokenizer"] = "bigram"
+    config = build.freeze_config(config)
+
+    failed = False
+    for directory in document_roots(build, config):
+        count, problems = check_root(build, jieba, config, directory)
+        print(f"{directory}: {count} 篇文档, {len(problems)} 篇含有跨越词边界的关键词")
+        for path, keywords in problems:
+            print(f"  {path}: {', '.join(keywords)}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()